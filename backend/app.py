@@ -19,7 +19,22 @@ CORS(app,
      supports_credentials=True,
      origins=['http://localhost:5173', 'http://127.0.0.1:5173'],
      methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-     allow_headers=['Content-Type', 'Authorization'])
+     allow_headers=['Content-Type', 'Authorization', 'If-Match', 'Idempotency-Key'],
+     expose_headers=['Server-Timing', 'ETag', 'Idempotent-Replayed'])
+
+from database import db
+from database.migrations import ensure_current as ensure_schema_current
+
+# Las consultas usan columnas y triggers de migrations/: con migraciones
+# pendientes la API no arranca (SQLite las aplica solo al conectar)
+ensure_schema_current(db)
+
+from database.models import Producto
+from database.instrumentation import init_app as init_query_instrumentation
+from utils.decorators import login_required, roles_required
+
+# Registrar consultas por petición (Server-Timing, consultas lentas y N+1)
+init_query_instrumentation(app)
 
 # Importar blueprints de rutas
 from routes.auth import auth_bp
@@ -28,7 +43,7 @@ from routes.products import products_bp
 from routes.categories import categories_bp
 from routes.providers import providers_bp
 from routes.dashboard import dashboard_bp
-from routes.sales import sales_bp
+from routes.sales import sales_bp, idempotency
 from routes.customers import customers_bp
 
 # Registrar blueprints
@@ -51,6 +66,21 @@ def health_check():
         'environment': 'development' if Config.DEBUG else 'production'
     })
 
+@app.route('/api/health/db', methods=['GET'])
+@login_required
+@roles_required('ADMIN')
+def db_health_check():
+    """Devuelve las estadísticas de los pools de conexiones y de las cachés (solo administradores)."""
+    return jsonify({
+        'status': 'ok',
+        'pool': db.pool_stats(),
+        'replicas': db.replica_stats(),
+        'statement_cache': db.statement_cache_stats(),
+        'product_cache': Producto.cache.stats(),
+        'product_search': Producto.search_index.stats(),
+        'sales_idempotency': idempotency.stats()
+    })
+
 # Manejo de errores
 @app.errorhandler(404)
 def not_found(error):
@@ -10,6 +10,10 @@ class Config:
     DEBUG = os.getenv('DEBUG', 'True') == 'True'
     
     # Configuración de la base de datos
+    # DB_BACKEND=sqlite permite correr la API sin servidor MySQL
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+    SQLITE_PATH = os.getenv('SQLITE_PATH', ':memory:')
+    
     DB_CONFIG = {
         'host': os.getenv('DB_HOST', 'localhost'),
         'database': os.getenv('DB_NAME', 'ferreteria_db'),
@@ -18,5 +22,81 @@ class Config:
         'port': os.getenv('DB_PORT', '3307')
     }
     
+    # Configuración del pool de conexiones
+    DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+    DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    DB_POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+    DB_POOL_PING_INTERVAL = float(os.getenv('DB_POOL_PING_INTERVAL', '5'))
+    
+    # Hilos que ejecutan las consultas bloqueantes de las vistas async (siempre menos que DB_POOL_MAX_SIZE)
+    DB_OFFLOAD_WORKERS = int(os.getenv('DB_OFFLOAD_WORKERS', '4'))
+    
+    # Réplicas de solo lectura: lista separada por comas de host[:puerto]
+    # (rutas de archivo con SQLite). Usan el mismo usuario y base que el primario
+    DB_REPLICAS = [r.strip() for r in os.getenv('DB_REPLICAS', '').split(',') if r.strip()]
+    DB_REPLICA_RETRY_SECONDS = float(os.getenv('DB_REPLICA_RETRY_SECONDS', '30'))
+    
+    # Sentencias preparadas que se reutilizan por conexión (0 desactiva la caché)
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '64'))
+    
+    # Instrumentación de consultas: se registran las que superen SLOW_QUERY_MS
+    # y las sentencias repetidas N_PLUS_ONE_THRESHOLD veces en una petición (0 lo desactiva)
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '5'))
+    
+    # Agrega el SQL de las consultas más lentas a la cabecera Server-Timing;
+    # expone el texto de las consultas a los clientes, solo para desarrollo
+    SERVER_TIMING_SQL = os.getenv('SERVER_TIMING_SQL', 'False') == 'True'
+    
+    @classmethod
+    def backend_config(cls):
+        """Devuelve los parámetros de conexión del backend configurado."""
+        if cls.DB_BACKEND == 'sqlite':
+            return {'path': cls.SQLITE_PATH, 'cached_statements': cls.DB_STATEMENT_CACHE_SIZE}
+        return cls.DB_CONFIG
+    
+    @classmethod
+    def replica_configs(cls):
+        """Devuelve los parámetros de conexión de cada réplica de lectura."""
+        configs = []
+        for replica in cls.DB_REPLICAS:
+            if cls.DB_BACKEND == 'sqlite':
+                configs.append({
+                    'path': replica,
+                    'cached_statements': cls.DB_STATEMENT_CACHE_SIZE,
+                    'read_only': True
+                })
+            else:
+                host, _, port = replica.partition(':')
+                configs.append({**cls.DB_CONFIG, 'host': host, 'port': port or cls.DB_CONFIG['port']})
+        return configs
+    
+    # Caché de lectura de productos: entradas máximas y segundos de validez (0 la desactiva)
+    PRODUCT_CACHE_SIZE = int(os.getenv('PRODUCT_CACHE_SIZE', '2000'))
+    PRODUCT_CACHE_TTL = float(os.getenv('PRODUCT_CACHE_TTL', '60'))
+    
+    # Segundos entre sincronizaciones del índice de búsqueda con los cambios de otros procesos
+    SEARCH_SYNC_SECONDS = float(os.getenv('SEARCH_SYNC_SECONDS', '30'))
+    
+    # Filas por lote en la importación masiva de productos
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+    
+    # Serie de los comprobantes (F001-..., B001-...) y números que reserva cada
+    # proceso a la vez; con 1 la numeración no tiene huecos
+    COMPROBANTE_SERIE = os.getenv('COMPROBANTE_SERIE', '001')
+    COMPROBANTE_BLOCK_SIZE = int(os.getenv('COMPROBANTE_BLOCK_SIZE', '1'))
+    
+    # Ventas por petición en POST /api/sales/batch
+    SALES_BATCH_MAX = int(os.getenv('SALES_BATCH_MAX', '500'))
+    
+    # Respuestas guardadas para repetir las ventas enviadas con Idempotency-Key
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '10000'))
+    IDEMPOTENCY_TTL = float(os.getenv('IDEMPOTENCY_TTL', '86400'))
+    
+    # Paginación de listados: tamaño por defecto y máximo del parámetro limit
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', '50'))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '500'))
+    
     # Configuración de la API
     API_PREFIX = '/api/v1'
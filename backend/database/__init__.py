@@ -1,3 +1,5 @@
 from .database import Database
+from .thread_offload import ThreadOffloadDatabase
 
 db = Database()
+db_offload = ThreadOffloadDatabase(db)
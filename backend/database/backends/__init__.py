@@ -0,0 +1,25 @@
+from .base import Backend
+
+def create_backend(name, config):
+    """
+    Crea el driver de base de datos indicado.
+
+    Los drivers se importan solo cuando se usan, así el modo SQLite no
+    necesita mysql-connector instalado.
+
+    Args:
+        name (str): 'mysql' o 'sqlite'
+        config (dict): Parámetros de conexión del driver
+
+    Returns:
+        Backend: Driver listo para abrir conexiones
+    """
+    if name == 'mysql':
+        from .mysql import MySQLBackend
+        return MySQLBackend(config)
+    if name == 'sqlite':
+        from .sqlite import SQLiteBackend
+        return SQLiteBackend(config)
+    raise ValueError(f'Backend de base de datos desconocido: {name}')
+
+__all__ = ['Backend', 'create_backend']
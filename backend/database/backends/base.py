@@ -0,0 +1,181 @@
+import re
+
+def split_script(script):
+    """
+    Divide un script SQL en sentencias individuales.
+
+    Quita los comentarios de línea (--) y respeta los ';' dentro de cadenas.
+
+    Args:
+        script (str): Contenido del archivo .sql
+
+    Returns:
+        list: Sentencias sin el ';' final
+    """
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    while i < len(script):
+        char = script[i]
+        if quote:
+            current.append(char)
+            if char == '\\' and i + 1 < len(script):
+                current.append(script[i + 1])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"', '`'):
+            quote = char
+            current.append(char)
+        elif script.startswith('--', i):
+            end = script.find('\n', i)
+            i = len(script) if end == -1 else end
+            continue
+        elif char == ';':
+            statements.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+class Backend:
+    """
+    Interfaz común de los drivers de base de datos.
+
+    Database trabaja siempre con SQL escrito para MySQL (placeholders %s);
+    cada driver se encarga de abrir conexiones y de adaptar ese SQL.
+    """
+
+    name = None
+    # Excepción base del driver y las que indican una conexión perdida
+    Error = Exception
+    disconnect_errors = ()
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        """Abre una conexión nueva."""
+        raise NotImplementedError
+
+    def is_alive(self, connection):
+        """Devuelve True si la conexión sigue disponible."""
+        return True
+
+    def reset(self, connection):
+        """Deshace cualquier transacción pendiente antes de reutilizar la conexión."""
+        if self.in_transaction(connection):
+            connection.rollback()
+
+    def in_transaction(self, connection):
+        """Indica si la conexión tiene una transacción abierta."""
+        return connection.in_transaction
+
+    def begin(self, connection):
+        """Inicia una transacción explícita."""
+        raise NotImplementedError
+
+    def cursor(self, connection, buffered=True):
+        """Abre un cursor que devuelve las filas como diccionarios."""
+        raise NotImplementedError
+
+    def prepare(self, connection):
+        """
+        Abre un cursor pensado para ejecutar siempre la misma sentencia.
+
+        Database guarda estos cursores en su caché de sentencias preparadas.
+        """
+        return self.cursor(connection)
+
+    def execute(self, cursor, query, params=None):
+        """Ejecuta una sentencia escrita para MySQL en un cursor de este driver."""
+        if params is None:
+            cursor.execute(self.translate(query))
+        else:
+            cursor.execute(self.translate(query), params)
+
+    def translate(self, query):
+        """Adapta una sentencia escrita para MySQL al dialecto del driver."""
+        return query
+
+    def upsert_clause(self, conflict_columns, update_columns):
+        """
+        Cláusula que convierte un INSERT ... VALUES en una inserción o actualización.
+
+        Args:
+            conflict_columns (list): Columnas de la clave única que detecta el duplicado
+            update_columns (list): Columnas que toman el valor de la fila insertada;
+                una tupla (destino, origen) copia el valor insertado en otra columna
+
+        Returns:
+            str: Texto para agregar al final del INSERT
+        """
+        raise NotImplementedError
+
+    def ignore_duplicate_clause(self, conflict_columns):
+        """
+        Cláusula que hace que un INSERT ... VALUES no haga nada si la fila ya existe.
+
+        A diferencia de INSERT IGNORE, los demás errores se siguen lanzando.
+
+        Args:
+            conflict_columns (list): Columnas de la clave única que detecta el duplicado
+
+        Returns:
+            str: Texto para agregar al final del INSERT
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _upsert_pairs(update_columns):
+        return [column if isinstance(column, tuple) else (column, column) for column in update_columns]
+
+    def column_exists(self, connection, table, column):
+        """
+        Indica si una tabla ya tiene la columna indicada.
+
+        Lo usan las migraciones para no volver a agregar columnas que la base
+        ya tiene.
+
+        Args:
+            connection: Conexión del driver
+            table (str): Nombre de la tabla
+            column (str): Nombre de la columna
+
+        Returns:
+            bool: True si la columna existe
+        """
+        raise NotImplementedError
+
+    def explain(self, connection, query, params=None):
+        """
+        Devuelve el plan de ejecución de una sentencia.
+
+        Args:
+            connection: Conexión del driver
+            query (str): Sentencia escrita para MySQL
+            params (tuple, optional): Parámetros de la sentencia
+
+        Returns:
+            list: Pasos del plan; cada uno es un diccionario con 'table',
+                'detail' e 'issues' (full_scan, filesort, temporary)
+        """
+        raise NotImplementedError
+
+    def prepare_script(self, script):
+        """
+        Convierte un script .sql en la lista de sentencias a ejecutar.
+
+        Args:
+            script (str): Script escrito para MySQL
+
+        Returns:
+            list: Sentencias listas para el driver
+        """
+        return [
+            statement for statement in split_script(script)
+            if not re.match(r'USE\s', statement, re.IGNORECASE)
+        ]
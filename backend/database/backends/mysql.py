@@ -0,0 +1,112 @@
+import mysql.connector
+from mysql.connector import errors
+from .base import Backend
+
+class _PreparedDictCursor:
+    """Cursor preparado que devuelve las filas como diccionarios."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._operation = None
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, query, params=()):
+        # MySQLCursorPrepared compara la sentencia por identidad: se le pasa
+        # siempre el mismo objeto para que no la vuelva a preparar
+        if query != self._operation:
+            self._operation = query
+        self._cursor.execute(self._operation, params or ())
+
+    def _to_dict(self, row):
+        return {
+            name: value.decode('utf-8') if isinstance(value, (bytes, bytearray)) else value
+            for name, value in zip(self._cursor.column_names, row)
+        }
+
+    def fetchall(self):
+        return [self._to_dict(row) for row in self._cursor.fetchall()]
+
+    def fetchmany(self, size):
+        return [self._to_dict(row) for row in self._cursor.fetchmany(size)]
+
+    def close(self):
+        self._cursor.close()
+
+class MySQLBackend(Backend):
+    """Driver para MySQL usando mysql-connector-python."""
+
+    name = 'mysql'
+    Error = mysql.connector.Error
+    disconnect_errors = (errors.InterfaceError, errors.OperationalError)
+
+    def connect(self):
+        """Abre una conexión nueva a MySQL en modo autocommit."""
+        return mysql.connector.connect(autocommit=True, **self.config)
+
+    def is_alive(self, connection):
+        return connection.is_connected()
+
+    def begin(self, connection):
+        connection.start_transaction()
+
+    def cursor(self, connection, buffered=True):
+        return connection.cursor(dictionary=True, buffered=buffered)
+
+    def prepare(self, connection):
+        return _PreparedDictCursor(connection.cursor(prepared=True))
+
+    def upsert_clause(self, conflict_columns, update_columns):
+        # MySQL detecta el duplicado con cualquier clave única de la tabla
+        updates = [f'{target} = VALUES({source})' for target, source in self._upsert_pairs(update_columns)]
+        return ' ON DUPLICATE KEY UPDATE ' + ', '.join(updates)
+
+    def ignore_duplicate_clause(self, conflict_columns):
+        # Asignar una columna a sí misma no cambia la fila existente
+        column = conflict_columns[0]
+        return f' ON DUPLICATE KEY UPDATE {column} = {column}'
+
+    def column_exists(self, connection, table, column):
+        cursor = self.cursor(connection)
+        try:
+            cursor.execute(
+                "SELECT COUNT(*) as total FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+                (table, column)
+            )
+            return cursor.fetchone()['total'] > 0
+        finally:
+            cursor.close()
+
+    def explain(self, connection, query, params=None):
+        cursor = self.cursor(connection)
+        try:
+            self.execute(cursor, 'EXPLAIN ' + query, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        steps = []
+        for row in rows:
+            extra = row.get('Extra') or ''
+            issues = []
+            if row.get('type') == 'ALL':
+                issues.append('full_scan')
+            if 'Using filesort' in extra:
+                issues.append('filesort')
+            if 'Using temporary' in extra:
+                issues.append('temporary')
+            # Se omite la estimación de filas para que el plan no cambie con los datos
+            steps.append({
+                'table': row.get('table'),
+                'detail': f"{row.get('select_type')} type={row.get('type')} "
+                          f"key={row.get('key')} {extra}".strip(),
+                'issues': issues
+            })
+        return steps
@@ -0,0 +1,270 @@
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from .base import Backend
+
+# Los parámetros de Python se guardan en el mismo formato que devuelve MySQL
+sqlite3.register_adapter(datetime, lambda value: value.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, str)
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+def _concat(*args):
+    if any(arg is None for arg in args):
+        return None
+    return ''.join(str(arg) for arg in args)
+
+def _lpad(value, length, pad):
+    if value is None or length is None or pad is None:
+        return None
+    value = str(value)
+    if len(value) >= length:
+        return value[:length]
+    fill = (str(pad) * length)[:length - len(value)]
+    return fill + value
+
+# Funciones de MySQL usadas en las consultas que SQLite no trae
+_FUNCTIONS = {
+    'CONCAT': (-1, _concat),
+    'LPAD': (3, _lpad),
+    'CURDATE': (0, lambda: date.today().isoformat()),
+    'NOW': (0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+}
+
+_PLACEHOLDER_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|%%|%s")
+_REWRITES = [
+    (re.compile(r'\s+FOR\s+UPDATE\b', re.IGNORECASE), ''),
+    (re.compile(r'^\s*TRUNCATE\s+TABLE\s+', re.IGNORECASE), 'DELETE FROM '),
+    (re.compile(r'^\s*SET\s+FOREIGN_KEY_CHECKS\s*=\s*0\s*$', re.IGNORECASE), 'PRAGMA foreign_keys = OFF'),
+    (re.compile(r'^\s*SET\s+FOREIGN_KEY_CHECKS\s*=\s*1\s*$', re.IGNORECASE), 'PRAGMA foreign_keys = ON')
+]
+
+_COLUMN_REWRITES = [
+    (re.compile(r'\b(?:BIG)?INT\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b', re.IGNORECASE),
+     'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    (re.compile(r'(\w+)\s+ENUM\s*\(([^)]*)\)', re.IGNORECASE), r'\1 TEXT CHECK (\1 IN (\2))'),
+    (re.compile(r'\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b', re.IGNORECASE), ''),
+    (re.compile(r'\bDEFAULT\s+CURRENT_TIMESTAMP\b', re.IGNORECASE), "DEFAULT (datetime('now', 'localtime'))"),
+    (re.compile(r'\s+UNSIGNED\b', re.IGNORECASE), ''),
+    (re.compile(r'\s+AUTO_INCREMENT\b', re.IGNORECASE), ''),
+    (re.compile(r'\s+AFTER\s+\w+\s*$', re.IGNORECASE), '')
+]
+
+_INDEX_ITEM_RE = re.compile(r'^(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*\((.*)\)$', re.IGNORECASE | re.DOTALL)
+_CREATE_TABLE_RE = re.compile(r'^CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\(', re.IGNORECASE)
+_ALTER_ADD_INDEX_RE = re.compile(
+    r'^ALTER\s+TABLE\s+(\w+)\s+ADD\s+(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*\((.*)\)$',
+    re.IGNORECASE | re.DOTALL
+)
+_CREATE_INDEX_RE = re.compile(r'^CREATE\s+(UNIQUE\s+)?INDEX\s+(?!IF\s)', re.IGNORECASE)
+# Trigger de MySQL con una sola sentencia como cuerpo (sin BEGIN ... END)
+_CREATE_TRIGGER_RE = re.compile(r'^(CREATE\s+TRIGGER\s.+?\sFOR\s+EACH\s+ROW)\s+(?!BEGIN\b)(.+)$', re.IGNORECASE | re.DOTALL)
+_PLAN_TABLE_RE = re.compile(r'^(SCAN|SEARCH)\s+(?:TABLE\s+)?(\w+)')
+
+def _split_top_level(body):
+    """Divide por comas que no estén dentro de paréntesis."""
+    items, depth, current = [], 0, []
+    for char in body:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            items.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    items.append(''.join(current).strip())
+    return [item for item in items if item]
+
+def _rewrite_column(definition):
+    for pattern, replacement in _COLUMN_REWRITES:
+        definition = pattern.sub(replacement, definition)
+    return definition
+
+def _index_statement(unique, name, table, columns):
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    return f'CREATE {kind} IF NOT EXISTS {name} ON {table} ({columns})'
+
+def convert_ddl(statement):
+    """
+    Convierte una sentencia DDL de MySQL a SQLite.
+
+    Los índices declarados dentro de CREATE TABLE se devuelven como
+    sentencias CREATE INDEX aparte.
+
+    Args:
+        statement (str): Sentencia escrita para MySQL
+
+    Returns:
+        list: Una o más sentencias para SQLite
+    """
+    match = _CREATE_TABLE_RE.match(statement)
+    if match:
+        table = match.group(2)
+        start = match.end() - 1
+        end = statement.rindex(')')
+        columns, indexes = [], []
+        for item in _split_top_level(statement[start + 1:end]):
+            index = _INDEX_ITEM_RE.match(item)
+            if index and index.group(1):
+                columns.append(f'UNIQUE ({index.group(3)})')
+            elif index:
+                indexes.append(_index_statement(False, index.group(2), table, index.group(3)))
+            else:
+                columns.append(_rewrite_column(item))
+        create = f'CREATE TABLE IF NOT EXISTS {table} (\n    ' + ',\n    '.join(columns) + '\n)'
+        return [create] + indexes
+
+    match = _ALTER_ADD_INDEX_RE.match(statement)
+    if match:
+        return [_index_statement(match.group(2), match.group(3), match.group(1), match.group(4))]
+
+    if _CREATE_INDEX_RE.match(statement):
+        return [_CREATE_INDEX_RE.sub(lambda m: f"CREATE {m.group(1) or ''}INDEX IF NOT EXISTS ", statement)]
+
+    if re.match(r'^ALTER\s+TABLE\s', statement, re.IGNORECASE):
+        return [_rewrite_column(statement)]
+
+    # SQLite exige BEGIN ... END alrededor del cuerpo del trigger
+    match = _CREATE_TRIGGER_RE.match(statement)
+    if match:
+        return [f'{match.group(1)} BEGIN {match.group(2)}; END']
+
+    return [statement]
+
+class SQLiteBackend(Backend):
+    """
+    Driver para SQLite, en archivo o en memoria.
+
+    Permite levantar la API y correr pruebas de carga sin un servidor
+    MySQL. Con ':memory:' todas las conexiones comparten la misma base
+    mediante la caché compartida de SQLite, por lo que el pool se limita a
+    una conexión. SQLite borra esa base al cerrarse su última conexión, así
+    que el driver mantiene una abierta aparte mientras exista.
+    """
+
+    name = 'sqlite'
+    Error = sqlite3.Error
+    disconnect_errors = (sqlite3.ProgrammingError,)
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.path = config.get('path') or ':memory:'
+        self.in_memory = self.path == ':memory:'
+        self.max_connections = 1 if self.in_memory else None
+        self._keeper = None
+
+    def connect(self):
+        read_only = self.config.get('read_only', False)
+        if self.in_memory:
+            target = f"file:{self.config.get('name', 'ferreteria')}?mode=memory&cache=shared"
+            if self._keeper is None:
+                # Conserva la base aunque el pool descarte todas sus conexiones
+                self._keeper = sqlite3.connect(target, uri=True, check_same_thread=False)
+        elif read_only:
+            # Las réplicas de lectura se abren sin permiso de escritura
+            target = f"file:{self.path}?mode=ro"
+        else:
+            target = self.path
+        connection = sqlite3.connect(
+            target,
+            uri=self.in_memory or read_only,
+            timeout=self.config.get('timeout', 30),
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=self.config.get('cached_statements', 128)
+        )
+        connection.row_factory = _dict_row
+        for name, (num_args, function) in _FUNCTIONS.items():
+            connection.create_function(name, num_args, function)
+        connection.execute('PRAGMA foreign_keys = ON')
+        if not self.in_memory and not read_only:
+            connection.execute('PRAGMA journal_mode = WAL')
+        return connection
+
+    def is_alive(self, connection):
+        connection.execute('SELECT 1').fetchone()
+        return True
+
+    def begin(self, connection):
+        # IMMEDIATE toma el bloqueo de escritura al empezar y evita que dos
+        # transacciones lectoras choquen al intentar escribir después
+        connection.execute('BEGIN IMMEDIATE')
+
+    def cursor(self, connection, buffered=True):
+        return connection.cursor()
+
+    def prepare(self, connection):
+        # sqlite3 ya guarda las sentencias compiladas por conexión
+        # (cached_statements); basta con reutilizar el cursor
+        return connection.cursor()
+
+    def translate(self, query):
+        return _translate(query)
+
+    def upsert_clause(self, conflict_columns, update_columns):
+        updates = [f'{target} = excluded.{source}' for target, source in self._upsert_pairs(update_columns)]
+        return f" ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET " + ', '.join(updates)
+
+    def ignore_duplicate_clause(self, conflict_columns):
+        return f" ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+
+    def column_exists(self, connection, table, column):
+        row = connection.execute(
+            "SELECT COUNT(*) as total FROM pragma_table_info(?) WHERE name = ? COLLATE NOCASE",
+            (table, column)
+        ).fetchone()
+        return row['total'] > 0
+
+    def explain(self, connection, query, params=None):
+        cursor = connection.cursor()
+        try:
+            self.execute(cursor, 'EXPLAIN QUERY PLAN ' + query, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        steps = []
+        for row in rows:
+            detail = row['detail']
+            match = _PLAN_TABLE_RE.match(detail)
+            issues = []
+            if detail.startswith('SCAN ') and 'INDEX' not in detail and 'CONSTANT ROW' not in detail:
+                issues.append('full_scan')
+            if 'TEMP B-TREE FOR ORDER BY' in detail:
+                issues.append('filesort')
+            elif 'TEMP B-TREE' in detail:
+                issues.append('temporary')
+            steps.append({
+                'table': match.group(2) if match else None,
+                'detail': detail,
+                'issues': issues
+            })
+        return steps
+
+    def prepare_script(self, script):
+        statements = []
+        for statement in super().prepare_script(script):
+            statements.extend(convert_ddl(statement))
+        return statements
+
+@lru_cache(maxsize=1024)
+def _translate(query):
+    """Cambia los placeholders %s por ? y reescribe las sentencias propias de MySQL."""
+    def placeholder(match):
+        token = match.group(0)
+        if token == '%s':
+            return '?'
+        if token == '%%':
+            return '%'
+        return token
+
+    query = _PLACEHOLDER_RE.sub(placeholder, query)
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+    return query
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    Caché en memoria con vencimiento por tiempo y desalojo LRU.
+
+    Es compartida por todos los hilos del proceso. Cada proceso tiene la
+    suya, así que entre procesos un valor puede quedar desactualizado como
+    máximo `ttl` segundos.
+
+    Args:
+        maxsize (int): Número máximo de entradas (0 desactiva la caché)
+        ttl (float): Segundos que una entrada se considera válida
+        name (str): Nombre para las estadísticas
+    """
+
+    def __init__(self, maxsize, ttl, name='cache'):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._entries = OrderedDict()  # clave -> (vence, valor)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        """Devuelve el valor guardado para `key`, o None si no está o venció."""
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[1]
+
+    def set(self, key, value, generation=None):
+        """
+        Guarda un valor.
+
+        Args:
+            key: Clave de la entrada
+            value: Valor a guardar
+            generation (int, optional): Valor de generation() leído antes de
+                consultar la base; si hubo invalidaciones desde entonces el
+                valor puede estar desactualizado y no se guarda
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def generation(self):
+        """Contador que cambia con cada invalidación."""
+        with self._lock:
+            return self._generation
+
+    def get_or_load(self, key, loader):
+        """
+        Devuelve el valor de la caché o lo obtiene con loader() y lo guarda.
+
+        Los resultados None no se guardan, así un registro que se crea
+        después se ve de inmediato.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        generation = self.generation()
+        value = loader()
+        if value is not None:
+            self.set(key, value, generation)
+        return value
+
+    def delete(self, *keys):
+        """Invalida las claves indicadas."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._counters['invalidations'] += 1
+
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Devuelve el uso de la caché.
+
+        Returns:
+            dict: Tamaño, aciertos, fallos, desalojos, vencimientos e invalidaciones
+        """
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hit_ratio': round(self._counters['hits'] / lookups, 4) if lookups else None,
+                **self._counters
+            }
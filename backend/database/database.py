@@ -1,81 +1,392 @@
-import mysql.connector
-from mysql.connector import Error
+import threading
+import time
+from contextlib import contextmanager
 from config import Config
+from database.backends import create_backend
+from database.instrumentation import record_query
+from database.pool import ConnectionPool, PoolTimeoutError
+from database.replicas import ReplicaSet, _is_read_only, stick_to_primary, sticky_primary
+from database.statement_cache import StatementCacheRegistry
+
+def _query_result(cursor, query, fetch=True):
+    """Arma el resultado de execute_query a partir de un cursor ya ejecutado."""
+    if fetch and query.strip().upper().startswith('SELECT'):
+        return cursor.fetchall()
+    elif not fetch and (query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))):
+        return {
+            'affected_rows': cursor.rowcount,
+            'lastrowid': cursor.lastrowid
+        }
+
+    return None
+
+class Transaction:
+    """Sentencias que comparten una conexión y se confirman juntas."""
+
+    def __init__(self, connection, database):
+        self.connection = connection
+        self.database = database
+        self.backend = database.backend
+
+    def execute(self, query, params=None, fetch=None):
+        """
+        Ejecuta una sentencia dentro de la transacción.
+
+        Args:
+            query (str): Consulta SQL a ejecutar
+            params (tuple, optional): Parámetros para la consulta. Defaults to None.
+            fetch (bool, optional): Igual que en Database.execute_query. Por defecto
+                devuelve filas para los SELECT y el resultado de la operación para
+                INSERT/UPDATE/DELETE.
+
+        Returns:
+            list/dict: Resultados de la consulta o información de la operación
+        """
+        if fetch is None:
+            fetch = query.strip().upper().startswith('SELECT')
+        return self.database._run(self.connection, query, params, fetch)
+
+    def executemany(self, query, seq_params):
+        """
+        Ejecuta la misma sentencia para varias filas de parámetros.
+
+        Los INSERT ... VALUES se envían como un único INSERT de varias filas.
+
+        Args:
+            query (str): Sentencia SQL a ejecutar
+            seq_params (list): Lista de tuplas de parámetros
+
+        Returns:
+            dict: Número de filas afectadas
+        """
+        seq_params = list(seq_params)
+        if not seq_params:
+            return {'affected_rows': 0}
+        cursor = self.backend.cursor(self.connection)
+        started = time.perf_counter()
+        try:
+            cursor.executemany(self.backend.translate(query), seq_params)
+            return {'affected_rows': cursor.rowcount}
+        except self.backend.Error as e:
+            print(f"Error en la consulta: {e}")
+            raise
+        finally:
+            record_query(query, seq_params[0], started)
+            cursor.close()
 
 class Database:
     _instance = None
-    
+    _lock = threading.Lock()
+
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(Database, cls).__new__(cls)
-            cls._instance.connection = None
-            cls._instance.connect()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(Database, cls).__new__(cls)
+                    instance.backend = None
+                    instance.pool = None
+                    instance.replicas = ReplicaSet([])
+                    instance.statement_caches = StatementCacheRegistry(Config.DB_STATEMENT_CACHE_SIZE)
+                    instance.connect()
+                    cls._instance = instance
         return cls._instance
-    
+
+    def _create_pool(self, backend, name, min_size):
+        """Crea un pool de conexiones para el driver indicado."""
+        max_size = Config.DB_POOL_MAX_SIZE
+        if getattr(backend, 'max_connections', None):
+            max_size = min(max_size, backend.max_connections)
+        min_size = min(min_size, max_size)
+
+        pool = ConnectionPool(
+            backend.connect,
+            validate=backend.is_alive,
+            reset=backend.reset,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=Config.DB_POOL_TIMEOUT,
+            idle_timeout=Config.DB_POOL_IDLE_TIMEOUT,
+            ping_interval=Config.DB_POOL_PING_INTERVAL,
+            name=name,
+            on_close=self.statement_caches.forget
+        )
+        print(f"Pool de conexiones {name} a {backend.name} listo "
+              f"({min_size}-{max_size} conexiones)")
+        return pool
+
     def connect(self):
-        """Establece la conexión a la base de datos."""
+        """Crea el driver configurado y los pools del primario y de las réplicas."""
+        self.backend = create_backend(Config.DB_BACKEND, Config.backend_config())
+
         try:
-            self.connection = mysql.connector.connect(**Config.DB_CONFIG)
-            if self.connection.is_connected():
-                print("Conexión exitosa a la base de datos MySQL")
-        except Error as e:
-            print(f"Error al conectar a MySQL: {e}")
+            self.pool = self._create_pool(self.backend, 'primary', Config.DB_POOL_MIN_SIZE)
+        except self.backend.Error as e:
+            print(f"Error al conectar a {self.backend.name}: {e}")
             raise
-    
+
+        # Las réplicas abren sus conexiones al primer uso: una réplica caída
+        # no debe impedir que la API arranque con el primario
+        self.replicas = ReplicaSet(
+            [
+                self._create_pool(create_backend(Config.DB_BACKEND, config), f'replica-{number}', 0)
+                for number, config in enumerate(Config.replica_configs(), start=1)
+            ],
+            retry_after=Config.DB_REPLICA_RETRY_SECONDS
+        )
+
+        if self.backend.name == 'sqlite':
+            # SQLite arranca vacío: se crean las tablas de Ferreteria_Base.sql
+            # y se aplican las migraciones pendientes
+            from database.schema import load_schema
+            from database.migrations import upgrade
+            load_schema(self)
+            upgrade(self)
+
     def disconnect(self):
-        """Cierra la conexión a la base de datos."""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("Conexión a MySQL cerrada")
-    
+        """Cierra todas las conexiones del primario y de las réplicas."""
+        if self.pool:
+            self.pool.close_all()
+            self.replicas.close_all()
+            print(f"Conexiones a {self.backend.name} cerradas")
+
+    @contextmanager
+    def connection(self):
+        """
+        Presta una conexión del pool durante el bloque `with`.
+
+        Si la conexión se pierde durante su uso se descarta en lugar de
+        devolverse al pool.
+        """
+        connection = self.pool.acquire()
+        discard = False
+        try:
+            yield connection
+        except self.backend.disconnect_errors:
+            discard = True
+            raise
+        finally:
+            self.pool.release(connection, discard=discard)
+
+    def _acquire_read(self, query):
+        """
+        Toma una conexión para ejecutar `query`, de una réplica si es posible.
+
+        Van a una réplica los SELECT sin bloqueo, mientras la petición no haya
+        escrito en el primario. Si la réplica no responde se marca como caída
+        y se usa el primario.
+
+        Returns:
+            tuple: (pool, conexión)
+        """
+        if self.replicas and _is_read_only(query) and not sticky_primary():
+            pool = self.replicas.choose()
+            if pool is not None:
+                try:
+                    return pool, pool.acquire()
+                except PoolTimeoutError:
+                    # Réplica saturada pero viva: esta lectura la atiende el primario
+                    pass
+                except self.backend.Error as e:
+                    self.replicas.mark_down(pool, e)
+        return self.pool, self.pool.acquire()
+
+    @contextmanager
+    def _read_connection(self, query):
+        """Como connection(), pero la conexión puede venir de una réplica."""
+        pool, connection = self._acquire_read(query)
+        discard = False
+        try:
+            yield connection
+        except self.backend.disconnect_errors as e:
+            discard = True
+            if pool is not self.pool:
+                self.replicas.mark_down(pool, e)
+            raise
+        finally:
+            pool.release(connection, discard=discard)
+
+    def _cacheable(self, query, fetch):
+        """Indica si la sentencia puede ejecutarse con un cursor preparado de la caché."""
+        if self.statement_caches.capacity <= 0:
+            return False
+        keyword = query.lstrip()[:6].upper()
+        if keyword == 'SELECT':
+            # Un cursor preparado debe leerse completo antes de reutilizarse
+            return fetch
+        return keyword in ('INSERT', 'UPDATE', 'DELETE')
+
+    def _run(self, connection, query, params, fetch):
+        """
+        Ejecuta una sentencia en una conexión ya tomada del pool.
+
+        Las sentencias DML frecuentes reutilizan un cursor preparado de la
+        caché de la conexión en lugar de volver a analizarse.
+        """
+        cache = None
+        if self._cacheable(query, fetch):
+            cache = self.statement_caches.for_connection(connection)
+
+        cursor = None
+        started = time.perf_counter()
+        try:
+            if cache is not None:
+                cursor = cache.get(query, lambda: self.backend.prepare(connection))
+            else:
+                cursor = self.backend.cursor(connection)
+            self.backend.execute(cursor, query, params)
+            return _query_result(cursor, query, fetch)
+        except self.backend.Error as e:
+            if cache is not None:
+                cache.discard(query)
+                cursor = None
+            print(f"Error en la consulta: {e}")
+            raise
+        finally:
+            record_query(query, params, started)
+            if cursor is not None and cache is None:
+                cursor.close()
+
     def execute_query(self, query, params=None, fetch=True, commit=False):
         """
         Ejecuta una consulta SQL.
-        
+
+        Cada llamada toma su propia conexión del pool, por lo que es seguro
+        usarla desde varios hilos. Las conexiones trabajan en autocommit.
+        Los SELECT pueden atenderse en una réplica; después de una escritura
+        el resto de la petición lee del primario.
+
         Args:
             query (str): Consulta SQL a ejecutar
             params (tuple, optional): Parámetros para la consulta. Defaults to None.
             fetch (bool, optional): Si es True, devuelve los resultados. Defaults to True.
             commit (bool, optional): Si es True, hace commit de la transacción. Defaults to False.
-            
+
         Returns:
             list/dict: Resultados de la consulta o información de la operación
         """
+        if not _is_read_only(query):
+            stick_to_primary()
+
+        with self._read_connection(query) as connection:
+            result = self._run(connection, query, params, fetch)
+
+            if commit and self.backend.in_transaction(connection):
+                connection.commit()
+
+            return result
+
+    @contextmanager
+    def transaction(self):
+        """
+        Abre una unidad de trabajo sobre una sola conexión.
+
+        Todas las sentencias ejecutadas con el objeto Transaction se confirman
+        juntas al salir del bloque, o se deshacen si ocurre una excepción.
+
+            with db.transaction() as tx:
+                tx.execute(query, params)
+                tx.executemany(query, filas)
+
+        Yields:
+            Transaction: Objeto para ejecutar sentencias dentro de la transacción
+        """
+        stick_to_primary()
+        with self.connection() as connection:
+            # Si el bloque falla, el pool deshace la transacción al recibir la conexión
+            self.backend.begin(connection)
+            yield Transaction(connection, self)
+            connection.commit()
+
+    def execute_stream(self, query, params=None, chunk_size=500):
+        """
+        Ejecuta un SELECT y devuelve sus filas por bloques, sin cargarlas todas en memoria.
+
+        Usa un cursor sin buffer, así que la conexión queda ocupada hasta que
+        el generador se agota o se cierra. Si el pool tiene una sola conexión
+        (SQLite en memoria) un cliente lento bloquearía todas las demás
+        peticiones: en ese caso las filas se leen completas, la conexión se
+        libera y después se entregan por bloques.
+
+        Args:
+            query (str): Consulta SELECT a ejecutar
+            params (tuple, optional): Parámetros para la consulta. Defaults to None.
+            chunk_size (int, optional): Filas por bloque. Defaults to 500.
+
+        Yields:
+            list: Bloques de hasta `chunk_size` filas (diccionarios)
+        """
+        pool, connection = self._acquire_read(query)
+        buffered = pool.max_size == 1
+        rows = None
         cursor = None
+        finished = False
         try:
-            if not self.connection or not self.connection.is_connected():
-                self.connect()
-            
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute(query, params)
-            
-            if commit:
-                self.connection.commit()
-            
-            if fetch and query.strip().upper().startswith('SELECT'):
-                return cursor.fetchall()
-            elif not fetch and (query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))):
-                return {
-                    'affected_rows': cursor.rowcount,
-                    'lastrowid': cursor.lastrowid
-                }
-            
-            return None
-            
-        except Error as e:
-            if self.connection:
-                self.connection.rollback()
+            cursor = self.backend.cursor(connection, buffered=buffered)
+            started = time.perf_counter()
+            try:
+                self.backend.execute(cursor, query, params)
+            finally:
+                # Solo se mide la ejecución; la lectura depende del consumidor
+                record_query(query, params, started)
+            if buffered:
+                rows = cursor.fetchall()
+            else:
+                while True:
+                    chunk = cursor.fetchmany(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finished = True
+        except self.backend.Error as e:
+            if pool is not self.pool and isinstance(e, self.backend.disconnect_errors):
+                self.replicas.mark_down(pool, e)
             print(f"Error en la consulta: {e}")
             raise
         finally:
-            if cursor:
+            if finished and cursor:
                 cursor.close()
-    
+            # Si el consumidor abandonó el generador quedan filas sin leer en
+            # la conexión; es más barato descartarla que vaciar el resultado.
+            pool.release(connection, discard=not finished)
+
+        if buffered:
+            for start in range(0, len(rows), chunk_size):
+                yield rows[start:start + chunk_size]
+
+    def iter_query(self, query, params=None, chunk_size=500):
+        """
+        Igual que execute_stream() pero devuelve las filas de una en una.
+
+        Yields:
+            dict: Cada fila del resultado
+        """
+        for rows in self.execute_stream(query, params, chunk_size):
+            yield from rows
+
     def get_connection(self):
-        """Obtiene la conexión actual a la base de datos."""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
-        return self.connection
+        """
+        Toma una conexión del pool.
+
+        La conexión debe devolverse con release_connection(); para uso normal
+        es preferible `with db.connection() as conn:`.
+        """
+        return self.pool.acquire()
+
+    def release_connection(self, connection):
+        """Devuelve al pool una conexión obtenida con get_connection()."""
+        self.pool.release(connection)
+
+    def pool_stats(self):
+        """Devuelve las estadísticas del pool de conexiones."""
+        return self.pool.stats()
+
+    def replica_stats(self):
+        """Devuelve las estadísticas de los pools de réplicas."""
+        return self.replicas.stats()
+
+    def statement_cache_stats(self):
+        """Devuelve los aciertos y fallos de la caché de sentencias preparadas."""
+        return self.statement_caches.stats()
 
 # Instancia global de la base de datos
 db = Database()
@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from config import Config
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_sql(query):
+    """Compacta los espacios de una sentencia para compararla y mostrarla en los logs."""
+    return _WHITESPACE_RE.sub(' ', query).strip()
+
+class QueryStats:
+    """Consultas ejecutadas durante una petición HTTP."""
+
+    def __init__(self, keep_slowest=5):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = []
+        self.statements = Counter()
+        self._keep_slowest = keep_slowest
+        self._lock = threading.Lock()
+
+    def record(self, query, elapsed_ms):
+        """Registra una sentencia y su duración en milisegundos."""
+        sql = normalize_sql(query)
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.statements[sql] += 1
+            self.slowest.append((elapsed_ms, sql))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[self._keep_slowest:]
+
+    def repeated(self, threshold):
+        """
+        Devuelve las sentencias repetidas al menos `threshold` veces.
+
+        La misma sentencia ejecutada muchas veces con distintos parámetros en
+        una sola petición suele ser un patrón N+1 (una consulta por fila).
+
+        Args:
+            threshold (int): Repeticiones mínimas; 0 o menos desactiva la detección
+
+        Returns:
+            list: Tuplas (sentencia, veces)
+        """
+        if threshold <= 0:
+            return []
+        return [(sql, times) for sql, times in self.statements.most_common() if times >= threshold]
+
+    def server_timing(self, include_slowest=False):
+        """
+        Valor para la cabecera Server-Timing.
+
+        Args:
+            include_slowest (bool): Agrega las sentencias más lentas; solo
+                conviene en desarrollo porque expone el SQL
+        """
+        metrics = [f'db;dur={self.total_ms:.2f};desc="{self.count} consultas"']
+        if include_slowest:
+            for position, (elapsed_ms, sql) in enumerate(self.slowest, start=1):
+                desc = sql[:120].replace('\\', '').replace('"', "'")
+                desc = desc.encode('ascii', 'replace').decode('ascii')
+                metrics.append(f'db-{position};dur={elapsed_ms:.2f};desc="{desc}"')
+        return ', '.join(metrics)
+
+# Funciones que reciben cada sentencia ejecutada, fuera del ciclo de una petición
+_listeners = []
+
+def add_listener(listener):
+    """
+    Registra una función que recibe (query, params, elapsed_ms) por cada sentencia.
+
+    La usan herramientas como el analizador de planes para capturar el SQL
+    que emiten las rutas.
+    """
+    _listeners.append(listener)
+
+def remove_listener(listener):
+    """Quita una función registrada con add_listener()."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def current_stats():
+    """Devuelve las estadísticas de la petición en curso, o None fuera de una petición."""
+    if not has_request_context():
+        return None
+    return g.get('query_stats')
+
+def record_query(query, params, started):
+    """
+    Registra una sentencia ejecutada por Database.
+
+    Args:
+        query (str): Sentencia tal como la escribió la ruta
+        params (tuple): Parámetros usados
+        started (float): Valor de time.perf_counter() antes de ejecutarla
+    """
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    stats = current_stats()
+    if stats is not None:
+        stats.record(query, elapsed_ms)
+
+    if Config.SLOW_QUERY_MS and elapsed_ms >= Config.SLOW_QUERY_MS:
+        print(f"Consulta lenta ({elapsed_ms:.1f} ms): {normalize_sql(query)[:500]}")
+
+    for listener in list(_listeners):
+        listener(query, params, elapsed_ms)
+
+def init_app(app):
+    """Activa el registro de consultas por petición en la aplicación Flask."""
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+
+        response.headers['Server-Timing'] = stats.server_timing(include_slowest=Config.SERVER_TIMING_SQL)
+
+        for sql, times in stats.repeated(Config.N_PLUS_ONE_THRESHOLD):
+            print(f"Posible N+1 en {request.method} {request.path}: "
+                  f"{times} ejecuciones de: {sql[:300]}")
+        return response
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import re
+from database.schema import BASE_DIR
+
+MIGRATIONS_DIR = os.path.join(BASE_DIR, 'migrations')
+
+# Archivos con el formato 0001_descripcion.sql
+_FILENAME_RE = re.compile(r'^(\d+)_(\w+)\.sql$')
+_ADD_COLUMN_RE = re.compile(r'^ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(\w+)\s', re.IGNORECASE)
+
+TRACKING_TABLE = """
+CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATION (
+    version INT PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    fecha_aplicacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+class SchemaOutdatedError(RuntimeError):
+    """Se lanza al arrancar si la base no tiene aplicadas todas las migraciones."""
+
+class Migration:
+    """
+    Archivo .sql numerado que cambia el esquema.
+
+    Args:
+        version (int): Número de la migración
+        name (str): Descripción tomada del nombre del archivo
+        path (str): Ruta del archivo
+    """
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, encoding='utf-8') as script_file:
+            self.script = script_file.read()
+        self.checksum = hashlib.sha256(self.script.encode('utf-8')).hexdigest()
+
+    def statements(self, backend):
+        """Devuelve las sentencias del archivo en el dialecto del backend."""
+        return backend.prepare_script(self.script)
+
+def discover(directory=MIGRATIONS_DIR):
+    """
+    Lee las migraciones disponibles ordenadas por versión.
+
+    Returns:
+        list: Objetos Migration
+
+    Raises:
+        ValueError: Si dos archivos usan el mismo número de versión
+    """
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f'Versión de migración repetida: {version}')
+        migrations[version] = Migration(version, match.group(2), os.path.join(directory, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+def ensure_tracking_table(db):
+    """Crea la tabla SCHEMA_MIGRATION si no existe."""
+    with db.transaction() as tx:
+        for statement in db.backend.prepare_script(TRACKING_TABLE):
+            tx.execute(statement, fetch=False)
+
+def applied_migrations(db):
+    """
+    Devuelve las migraciones registradas en la base de datos.
+
+    Returns:
+        dict: Filas de SCHEMA_MIGRATION indexadas por versión
+    """
+    ensure_tracking_table(db)
+    # Se lee dentro de una transacción para consultar siempre el primario
+    with db.transaction() as tx:
+        rows = tx.execute("SELECT * FROM SCHEMA_MIGRATION ORDER BY version")
+    return {row['version']: row for row in rows}
+
+def upgrade(db, target=None, directory=MIGRATIONS_DIR):
+    """
+    Aplica en orden las migraciones pendientes.
+
+    Cada migración y su registro en SCHEMA_MIGRATION se ejecutan en una
+    transacción. MySQL confirma el DDL de forma implícita, así que si una
+    migración falla a medias hay que revisar el esquema antes de reintentar.
+
+    Args:
+        db (Database): Base de datos a migrar
+        target (int, optional): Última versión a aplicar. Por defecto todas.
+        directory (str, optional): Carpeta con los archivos de migración
+
+    Returns:
+        list: Migraciones aplicadas
+    """
+    applied = applied_migrations(db)
+    done = []
+    for migration in discover(directory):
+        if migration.version in applied:
+            continue
+        if target is not None and migration.version > target:
+            break
+
+        with db.transaction() as tx:
+            for statement in migration.statements(db.backend):
+                # Las bases en producción pueden tener ya columnas que se crearon
+                # a mano; volver a agregarlas fallaría y bloquearía las siguientes
+                match = _ADD_COLUMN_RE.match(statement)
+                if match and db.backend.column_exists(tx.connection, match.group(1), match.group(2)):
+                    print(f"Migración {migration.version:04d}: la columna "
+                          f"{match.group(1)}.{match.group(2)} ya existe, se omite")
+                    continue
+                tx.execute(statement, fetch=False)
+            tx.execute(
+                "INSERT INTO SCHEMA_MIGRATION (version, nombre, checksum) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, migration.checksum)
+            )
+        print(f"Migración {migration.version:04d} aplicada: {migration.name}")
+        done.append(migration)
+    return done
+
+def status(db, directory=MIGRATIONS_DIR):
+    """
+    Devuelve el estado de cada migración.
+
+    Una migración aplicada cuyo archivo cambió después se informa como
+    'modificada'.
+
+    Returns:
+        list: Diccionarios con version, nombre, estado y fecha_aplicacion
+    """
+    applied = applied_migrations(db)
+    result = []
+    for migration in discover(directory):
+        row = applied.get(migration.version)
+        if row is None:
+            state = 'pendiente'
+        elif row['checksum'] != migration.checksum:
+            state = 'modificada'
+        else:
+            state = 'aplicada'
+        result.append({
+            'version': migration.version,
+            'nombre': migration.name,
+            'estado': state,
+            'fecha_aplicacion': row['fecha_aplicacion'] if row else None
+        })
+    return result
+
+def ensure_current(db, directory=MIGRATIONS_DIR):
+    """
+    Comprueba que la base tenga aplicadas todas las migraciones.
+
+    El código depende de las columnas, índices y triggers que agregan las
+    migraciones; sin ellos la API fallaría en la primera consulta.
+
+    Raises:
+        SchemaOutdatedError: Si hay migraciones pendientes
+    """
+    pending = [row for row in status(db, directory) if row['estado'] == 'pendiente']
+    if pending:
+        versions = ', '.join(f"{row['version']:04d}_{row['nombre']}" for row in pending)
+        raise SchemaOutdatedError(
+            f'La base de datos tiene migraciones pendientes ({versions}). '
+            f'Ejecute "python migrate.py upgrade" antes de iniciar la API.'
+        )
@@ -1,9 +1,23 @@
 from datetime import datetime
+from config import Config
+from database.cache import TTLCache
 from database.database import db
+from database.search import ProductSearch
+from utils.fieldsets import select_list
+
+class _RejectedUpdate(Exception):
+    """Deshace una transacción cuyo resultado viola una regla de negocio."""
+    
+    def __init__(self, codigos):
+        super().__init__('El precio de venta no puede ser menor al precio de compra')
+        self.codigos = codigos
 
 class BaseModel:
     """Clase base para todos los modelos."""
     
+    # Acceso a la base de datos desde los modelos y rutas (Producto.db)
+    db = db
+    
     @classmethod
     def get_by_id(cls, id):
         """Obtiene un registro por su ID."""
@@ -88,6 +102,115 @@ class Producto(BaseModel):
     """Modelo para la tabla PRODUCTO."""
     TABLE_NAME = 'PRODUCTO'
     
+    # Expresiones que copian los nombres de la categoría y el proveedor de la fila
+    CATEGORY_NAME_SQL = "(SELECT c.nombre_categoria FROM CATEGORIA c WHERE c.id_categoria = {})"
+    PROVIDER_NAME_SQL = "(SELECT pr.nombre_comercial FROM PROVEEDOR pr WHERE pr.id_proveedor = {})"
+    
+    # Nombres copiados en PRODUCTO (migraciones 0004 y 0008); si un producto se
+    # insertó con SQL directo y todavía no los tiene, se leen de la tabla
+    # relacionada. COALESCE solo ejecuta la subconsulta en ese caso.
+    CATEGORY_NAME_COLUMN = f"COALESCE(p.nombre_categoria, {CATEGORY_NAME_SQL.format('p.id_categoria')})"
+    PROVIDER_NAME_COLUMN = f"COALESCE(p.nombre_proveedor, {PROVIDER_NAME_SQL.format('p.id_proveedor')})"
+    
+    # Campos que se pueden pedir con ?fields= y su expresión SQL
+    FIELDS = {
+        'id_producto': 'p.id_producto',
+        'codigo_producto': 'p.codigo_producto',
+        'nombre_producto': 'p.nombre_producto',
+        'descripcion': 'p.descripcion',
+        'precio_compra_ref': 'p.precio_compra_ref',
+        'precio_venta': 'p.precio_venta',
+        'stock_actual': 'p.stock_actual',
+        'stock_minimo': 'p.stock_minimo',
+        'unidad_medida': 'p.unidad_medida',
+        'estado': 'p.estado',
+        'id_categoria': 'p.id_categoria',
+        'id_proveedor': 'p.id_proveedor',
+        'version': 'p.version',
+        'bajo_stock': 'p.bajo_stock',
+        'fecha_creacion': 'p.fecha_creacion',
+        'fecha_actualizacion': 'p.fecha_actualizacion',
+        'nombre_categoria': CATEGORY_NAME_COLUMN,
+        'nombre_proveedor': PROVIDER_NAME_COLUMN,
+        'proveedor': PROVIDER_NAME_COLUMN
+    }
+    
+    # Producto completo con los nombres de su categoría y proveedor, sin JOIN;
+    # `proveedor` se mantiene como alias por compatibilidad con la API
+    DETAIL_QUERY = f"SELECT {select_list(FIELDS, FIELDS)} FROM PRODUCTO p"
+    
+    @classmethod
+    def select_query(cls, fields=None):
+        """
+        Devuelve el SELECT ... FROM para los campos pedidos, sin WHERE.
+        
+        Args:
+            fields (list, optional): Campos de FIELDS; None para DETAIL_QUERY completo
+            
+        Returns:
+            str: Consulta a la que se agregan los filtros (alias p)
+        """
+        if fields is None:
+            return cls.DETAIL_QUERY
+        return f"SELECT {select_list(fields, cls.FIELDS)} FROM PRODUCTO p"
+    
+    # Caché de lectura por id y por código, invalidada en cada escritura
+    cache = TTLCache(Config.PRODUCT_CACHE_SIZE, Config.PRODUCT_CACHE_TTL, name='productos')
+    
+    # Índice de búsqueda por nombre, código y descripción
+    search_index = ProductSearch(db, sync_interval=Config.SEARCH_SYNC_SECONDS)
+    
+    # Funciones que reciben los ids de los productos modificados
+    _change_listeners = []
+    
+    @classmethod
+    def on_change(cls, listener):
+        """
+        Registra una función que se llama cada vez que se crean, modifican o
+        cambian de stock productos, con los argumentos (product_ids, columns).
+        """
+        cls._change_listeners.append(listener)
+        return listener
+    
+    @classmethod
+    def notify_changed(cls, product_ids, columns=None):
+        """
+        Avisa que los productos indicados cambiaron en la base de datos.
+        
+        Debe llamarse después de confirmar la escritura, fuera de la transacción.
+        
+        Args:
+            product_ids (list): IDs de los productos modificados
+            columns (set, optional): Columnas modificadas; None si pudo cambiar cualquiera
+        """
+        product_ids = list(product_ids)
+        for listener in list(cls._change_listeners):
+            listener(product_ids, columns)
+    
+    @classmethod
+    def invalidate_cache(cls, product_ids, columns=None):
+        """Quita de la caché los productos indicados."""
+        cls.cache.delete(*[('id', product_id) for product_id in product_ids])
+    
+    @classmethod
+    def get_detail(cls, product_id):
+        """
+        Obtiene un producto con los nombres de su categoría y proveedor.
+        
+        El resultado se guarda en caché; incluye productos inactivos, así que
+        quien lo use debe revisar `estado`.
+        
+        Args:
+            product_id (int): ID del producto
+            
+        Returns:
+            dict: Producto, o None si no existe
+        """
+        def load():
+            result = db.execute_query(cls.DETAIL_QUERY + " WHERE p.id_producto = %s", (product_id,))
+            return result[0] if result else None
+        return cls.cache.get_or_load(('id', product_id), load)
+    
     @classmethod
     def create(cls, data):
         """
@@ -109,12 +232,16 @@ class Producto(BaseModel):
         Returns:
             dict: Resultado de la operación con el ID del producto creado
         """
-        query = """
+        query = f"""
             INSERT INTO PRODUCTO (
                 codigo_producto, nombre_producto, descripcion, precio_compra_ref,
                 precio_venta, stock_actual, stock_minimo, unidad_medida,
-                id_categoria, id_proveedor, estado, fecha_creacion
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'ACTIVO', %s)
+                id_categoria, id_proveedor, estado, fecha_creacion,
+                nombre_categoria, nombre_proveedor
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'ACTIVO', %s,
+                {cls.CATEGORY_NAME_SQL.format('%s')}, {cls.PROVIDER_NAME_SQL.format('%s')}
+            )
         """
         params = (
             data['codigo_producto'],
@@ -127,74 +254,347 @@ class Producto(BaseModel):
             data.get('unidad_medida', 'UNIDAD'),
             data['id_categoria'],
             data['id_proveedor'],
-            datetime.now()
+            datetime.now(),
+            data['id_categoria'],
+            data['id_proveedor']
         )
-        return db.execute_query(query, params, fetch=False, commit=True)
+        result = db.execute_query(query, params, fetch=False, commit=True)
+        cls.notify_changed([result['lastrowid']])
+        return result
+    
+    # Columnas que se pueden modificar con update()
+    UPDATABLE_COLUMNS = [
+        'codigo_producto', 'nombre_producto', 'descripcion', 'precio_compra_ref',
+        'precio_venta', 'stock_actual', 'stock_minimo', 'unidad_medida',
+        'id_categoria', 'id_proveedor'
+    ]
     
     @classmethod
-    def update(cls, product_id, data):
+    def update(cls, product_id, data, version=None):
         """
-        Actualiza un producto existente.
+        Actualiza solo los campos indicados de un producto, en una sola sentencia.
+        
+        Cada actualización incrementa la columna `version`. Si se indica la
+        versión esperada y otra escritura la cambió antes (por ejemplo una venta
+        que descontó stock), no se modifica nada y se devuelve un conflicto.
+        
+        La regla de precio de venta >= precio de compra se comprueba en el
+        mismo UPDATE, contra los valores actuales de los campos no enviados.
         
         Args:
             product_id (int): ID del producto a actualizar
             data (dict): Diccionario con los campos a actualizar
+            version (int, optional): Versión que el cliente leyó
                 
         Returns:
-            dict: Resultado de la operación
+            dict: Resultado de la operación, o {'error', 'status'} con 404, 409 o 400
+        """
+        columns = [column for column in cls.UPDATABLE_COLUMNS if column in data]
+        if not columns:
+            return {'error': 'No se realizaron cambios en el producto', 'status': 400}
+        
+        assignments = [f"{column} = %s" for column in columns]
+        params = [data[column] for column in columns]
+        
+        # Los nombres copiados se actualizan en el mismo UPDATE
+        if 'id_categoria' in data:
+            assignments.append("nombre_categoria = " + cls.CATEGORY_NAME_SQL.format('%s'))
+            params.append(data['id_categoria'])
+        if 'id_proveedor' in data:
+            assignments.append("nombre_proveedor = " + cls.PROVIDER_NAME_SQL.format('%s'))
+            params.append(data['id_proveedor'])
+        conditions = ["id_producto = %s"]
+        where_params = [product_id]
+        
+        if 'precio_venta' in data or 'precio_compra_ref' in data:
+            venta = '%s' if 'precio_venta' in data else 'precio_venta'
+            compra = '%s' if 'precio_compra_ref' in data else 'precio_compra_ref'
+            conditions.append(f"{venta} >= {compra}")
+            where_params.extend(data[column] for column in ('precio_venta', 'precio_compra_ref') if column in data)
+        
+        if version is not None:
+            conditions.append("version = %s")
+            where_params.append(version)
+        
+        query = f"""
+            UPDATE PRODUCTO
+            SET {', '.join(assignments)}, version = version + 1, fecha_actualizacion = %s
+            WHERE {' AND '.join(conditions)}
         """
+        result = db.execute_query(
+            query, tuple(params + [datetime.now()] + where_params), fetch=False, commit=True
+        )
+        
+        if not result or result.get('affected_rows', 0) == 0:
+            # Solo cuando falla se lee la fila para saber por qué
+            current = db.execute_query(
+                "SELECT version FROM PRODUCTO WHERE id_producto = %s", (product_id,)
+            )
+            if not current:
+                return {'error': 'Producto no encontrado', 'status': 404}
+            if version is not None and current[0]['version'] != version:
+                return {
+                    'error': 'El producto fue modificado por otra operación; vuelva a cargarlo',
+                    'status': 409,
+                    'version': current[0]['version']
+                }
+            return {'error': 'El precio de venta no puede ser menor al precio de compra', 'status': 400}
+        
+        cls.notify_changed([product_id], columns=set(columns))
+        return result
+    
+    @classmethod
+    def delete(cls, id):
+        """Elimina lógicamente un producto."""
         query = """
             UPDATE PRODUCTO 
-            SET nombre_producto = %s,
-                descripcion = %s,
-                precio_compra_ref = %s,
-                precio_venta = %s,
-                stock_actual = %s,
-                stock_minimo = %s,
-                unidad_medida = %s,
-                id_categoria = %s,
-                id_proveedor = %s,
-                fecha_actualizacion = %s
+            SET estado = 'INACTIVO', version = version + 1, fecha_actualizacion = %s 
             WHERE id_producto = %s
         """
-        # Obtener el producto actual para valores por defecto
-        current = cls.get_by_id(product_id)
-        if not current:
-            return {'error': 'Producto no encontrado', 'status': 404}
+        result = db.execute_query(query, (datetime.now(), id), fetch=False, commit=True)
+        cls.notify_changed([id])
+        return result
+    
+    # Columnas que la importación masiva actualiza en productos que ya existen.
+    # El stock no se toca: solo cambia con ventas y compras.
+    IMPORT_UPDATE_COLUMNS = [
+        'nombre_producto', 'descripcion', 'precio_compra_ref', 'precio_venta',
+        'stock_minimo', 'unidad_medida', 'id_categoria', 'id_proveedor', 'estado',
+        ('fecha_actualizacion', 'fecha_creacion')
+    ]
+    
+    @classmethod
+    def existing_codes(cls, codes):
+        """
+        Busca varios códigos con una sola consulta.
+        
+        Args:
+            codes (list): Códigos de producto
             
-        params = (
-            data.get('nombre_producto', current['nombre_producto']),
-            data.get('descripcion', current.get('descripcion', '')),
-            data.get('precio_compra_ref', current['precio_compra_ref']),
-            data.get('precio_venta', current['precio_venta']),
-            data.get('stock_actual', current.get('stock_actual', 0)),
-            data.get('stock_minimo', current.get('stock_minimo', 5)),
-            data.get('unidad_medida', current.get('unidad_medida', 'UNIDAD')),
-            data.get('id_categoria', current['id_categoria']),
-            data.get('id_proveedor', current['id_proveedor']),
-            datetime.now(),
-            product_id
+        Returns:
+            dict: {codigo_producto: id_producto} de los que ya existen, activos o no
+        """
+        if not codes:
+            return {}
+        placeholders = ', '.join(['%s'] * len(codes))
+        rows = db.execute_query(
+            f"SELECT id_producto, codigo_producto FROM PRODUCTO WHERE codigo_producto IN ({placeholders})",
+            tuple(codes)
         )
-        return db.execute_query(query, params, fetch=False, commit=True)
+        return {row['codigo_producto']: row['id_producto'] for row in rows}
+    
+    @classmethod
+    def import_batch(cls, products, update_existing=False):
+        """
+        Inserta un lote de productos ya validados en una sola transacción.
+        
+        Args:
+            products (list): Diccionarios como los que devuelve validate_product()
+            update_existing (bool): Si es True, los códigos existentes se
+                actualizan (upsert) en lugar de fallar
+                
+        Returns:
+            list: IDs de los productos creados o actualizados
+        """
+        if not products:
+            return []
+        now = datetime.now()
+        query = """
+            INSERT INTO PRODUCTO (
+                codigo_producto, nombre_producto, descripcion, precio_compra_ref,
+                precio_venta, stock_actual, stock_minimo, unidad_medida,
+                id_categoria, id_proveedor, estado, fecha_creacion
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'ACTIVO', %s)
+        """
+        if update_existing:
+            query += db.backend.upsert_clause(['codigo_producto'], cls.IMPORT_UPDATE_COLUMNS)
+            query += ", version = version + 1"
+        
+        codes = [product['codigo_producto'] for product in products]
+        placeholders = ', '.join(['%s'] * len(codes))
+        with db.transaction() as tx:
+            tx.executemany(query, [
+                (
+                    product['codigo_producto'], product['nombre_producto'], product['descripcion'],
+                    product['precio_compra_ref'], product['precio_venta'], product['stock_actual'],
+                    product['stock_minimo'], product['unidad_medida'],
+                    product['id_categoria'], product['id_proveedor'], now
+                )
+                for product in products
+            ])
+            # Los nombres se copian con un UPDATE por lote: con subconsultas en
+            # VALUES el INSERT ya no se podría enviar como una sola sentencia
+            tx.execute(f"""
+                UPDATE PRODUCTO
+                SET nombre_categoria = {cls.CATEGORY_NAME_SQL.format('PRODUCTO.id_categoria')},
+                    nombre_proveedor = {cls.PROVIDER_NAME_SQL.format('PRODUCTO.id_proveedor')}
+                WHERE codigo_producto IN ({placeholders})
+            """, tuple(codes))
+            # Los ids de un INSERT de varias filas se leen con una consulta por lote
+            rows = tx.execute(
+                f"SELECT id_producto FROM PRODUCTO WHERE codigo_producto IN ({placeholders})",
+                tuple(codes)
+            )
+        
+        product_ids = [row['id_producto'] for row in rows]
+        cls.notify_changed(product_ids)
+        return product_ids
+    
+    # Columnas que admite bulk_update() y las operaciones permitidas en cada una
+    BULK_UPDATE_COLUMNS = {
+        'precio_venta': ('set', 'percent'),
+        'precio_compra_ref': ('set', 'percent'),
+        'stock_minimo': ('set',)
+    }
+    
+    @classmethod
+    def bulk_update(cls, filters, changes):
+        """
+        Modifica con un solo UPDATE todos los productos activos que cumplen un filtro.
+        
+        Los cambios de precio se validan después del UPDATE, dentro de la misma
+        transacción y con las filas ya bloqueadas: si algún producto queda con
+        precio de venta menor al de compra (o precios en cero), se deshace todo.
+        
+        Args:
+            filters (dict): Filtros combinados con AND
+                - id_categoria (int, optional): ID de la categoría
+                - id_proveedor (int, optional): ID del proveedor
+                - codigos (list, optional): Códigos de producto
+            changes (dict): {columna: (operación, valor)}, donde la operación es
+                'set' (nuevo valor) o 'percent' (variación porcentual, solo precios)
+                
+        Returns:
+            dict: matched_rows y affected_rows, o {'error', 'status', 'codigos'}
+                si el cambio viola la regla de precios
+        """
+        conditions = ["estado = 'ACTIVO'"]
+        where_params = []
+        for column in ('id_categoria', 'id_proveedor'):
+            if filters.get(column) is not None:
+                conditions.append(f"{column} = %s")
+                where_params.append(filters[column])
+        if filters.get('codigos'):
+            conditions.append(f"codigo_producto IN ({', '.join(['%s'] * len(filters['codigos']))})")
+            where_params.extend(filters['codigos'])
+        where = ' AND '.join(conditions)
+        
+        assignments = []
+        set_params = []
+        for column, (operation, value) in changes.items():
+            if operation == 'percent':
+                assignments.append(f"{column} = ROUND({column} * %s, 2)")
+                set_params.append(1 + value / 100)
+            else:
+                assignments.append(f"{column} = %s")
+                set_params.append(value)
+        assignments.append("version = version + 1")
+        assignments.append("fecha_actualizacion = %s")
+        set_params.append(datetime.now())
+        
+        try:
+            with db.transaction() as tx:
+                result = tx.execute(
+                    f"UPDATE PRODUCTO SET {', '.join(assignments)} WHERE {where}",
+                    tuple(set_params + where_params)
+                )
+                if changes.keys() & {'precio_venta', 'precio_compra_ref'}:
+                    invalid = tx.execute(f"""
+                        SELECT codigo_producto FROM PRODUCTO
+                        WHERE {where}
+                          AND (precio_venta < precio_compra_ref OR precio_venta <= 0 OR precio_compra_ref <= 0)
+                        LIMIT 20
+                    """, tuple(where_params))
+                    if invalid:
+                        raise _RejectedUpdate([row['codigo_producto'] for row in invalid])
+                rows = tx.execute(f"SELECT id_producto FROM PRODUCTO WHERE {where}", tuple(where_params))
+        except _RejectedUpdate as e:
+            return {'error': str(e), 'status': 400, 'codigos': e.codigos}
+        
+        product_ids = [row['id_producto'] for row in rows]
+        cls.notify_changed(product_ids, columns=set(changes))
+        return {'matched_rows': len(product_ids), 'affected_rows': result['affected_rows']}
+    
+    @classmethod
+    def refresh_names(cls, id_categoria=None, id_proveedor=None):
+        """
+        Vuelve a copiar en PRODUCTO los nombres de categorías y proveedores.
+        
+        Debe llamarse después de renombrar una categoría o un proveedor, o de
+        insertar productos sin pasar por este modelo (por ejemplo seed_database.py).
+        Sin argumentos actualiza todos los productos.
+        
+        Args:
+            id_categoria (int, optional): Solo los productos de esta categoría
+            id_proveedor (int, optional): Solo los productos de este proveedor
+            
+        Returns:
+            dict: Resultado de la operación
+        """
+        conditions = []
+        params = []
+        if id_categoria is not None:
+            conditions.append("id_categoria = %s")
+            params.append(id_categoria)
+        if id_proveedor is not None:
+            conditions.append("id_proveedor = %s")
+            params.append(id_proveedor)
+        query = f"""
+            UPDATE PRODUCTO
+            SET nombre_categoria = {cls.CATEGORY_NAME_SQL.format('PRODUCTO.id_categoria')},
+                nombre_proveedor = {cls.PROVIDER_NAME_SQL.format('PRODUCTO.id_proveedor')}
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        result = db.execute_query(query, tuple(params) if params else None, fetch=False, commit=True)
+        # Un cambio de nombre afecta a muchos productos: se vacía la caché completa
+        cls.cache.clear()
+        return result
     
     @classmethod
     def get_by_codigo(cls, codigo):
-        """Obtiene un producto por su código."""
-        query = f"SELECT * FROM {cls.TABLE_NAME} WHERE codigo_producto = %s AND estado = 'ACTIVO'"
-        result = db.execute_query(query, (codigo,))
-        return result[0] if result else None
+        """Obtiene un producto activo por su código."""
+        # La caché guarda código -> id; el producto se lee de la entrada por id,
+        # que es la que invalidan las escrituras
+        product_id = cls.cache.get(('codigo', codigo))
+        if product_id is not None:
+            product = cls.get_detail(product_id)
+            if product and product['codigo_producto'] == codigo:
+                return product if product['estado'] == 'ACTIVO' else None
+        
+        generation = cls.cache.generation()
+        result = db.execute_query(cls.DETAIL_QUERY + " WHERE p.codigo_producto = %s", (codigo,))
+        if not result:
+            return None
+        product = result[0]
+        cls.cache.set(('id', product['id_producto']), product, generation)
+        cls.cache.set(('codigo', codigo), product['id_producto'], generation)
+        return product if product['estado'] == 'ACTIVO' else None
+    
+    # Productos activos con stock_actual <= stock_minimo. La columna generada
+    # bajo_stock la mantiene la base en cada escritura y está indexada junto
+    # con el stock (migración 0003), así que no se recorre la tabla.
+    LOW_STOCK_CONDITION = "p.estado = 'ACTIVO' AND p.bajo_stock = 1"
+    LOW_STOCK_ORDER = " ORDER BY p.stock_actual ASC, p.id_producto ASC"
     
     @classmethod
-    def get_low_stock(cls):
-        """Obtiene los productos con stock por debajo del mínimo."""
-        query = """
-            SELECT p.*, c.nombre_categoria, pr.nombre_comercial as proveedor
-            FROM PRODUCTO p
-            JOIN CATEGORIA c ON p.id_categoria = c.id_categoria
-            JOIN PROVEEDOR pr ON p.id_proveedor = pr.id_proveedor
-            WHERE p.stock_actual <= p.stock_minimo AND p.estado = 'ACTIVO'
-            ORDER BY p.stock_actual ASC
+    def get_low_stock(cls, limit=None):
+        """
+        Obtiene los productos con stock por debajo del mínimo, del menor stock al mayor.
+        
+        Args:
+            limit (int, optional): Máximo de productos; el límite se aplica en SQL
+            
+        Returns:
+            list: Productos con los nombres de su categoría y proveedor
         """
+        query = cls.DETAIL_QUERY + " WHERE " + cls.LOW_STOCK_CONDITION + cls.LOW_STOCK_ORDER
+        if limit:
+            return db.execute_query(query + " LIMIT %s", (limit,))
         return db.execute_query(query)
 
+# Las escrituras de productos invalidan la caché de lectura y actualizan el índice de búsqueda
+Producto.on_change(Producto.invalidate_cache)
+Producto.on_change(Producto.search_index.refresh)
+
 # Agrega aquí más modelos según sea necesario (Cliente, Venta, Categoría, etc.)
@@ -0,0 +1,238 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no se obtiene una conexión libre dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe.
+
+    Cada hilo toma su propia conexión con acquire() y la devuelve con release(),
+    de modo que las peticiones concurrentes no comparten cursores ni transacciones.
+
+    Args:
+        connect (callable): Función que abre una conexión nueva
+        validate (callable, optional): Devuelve True si una conexión sigue viva
+        reset (callable, optional): Limpia el estado de una conexión antes de reutilizarla
+        on_close (callable, optional): Se llama con cada conexión que el pool cierra
+        min_size (int): Conexiones que se mantienen abiertas aunque estén ociosas
+        max_size (int): Máximo de conexiones abiertas a la vez
+        timeout (float): Segundos de espera por una conexión libre
+        idle_timeout (float): Segundos tras los que se cierra una conexión ociosa sobrante
+        ping_interval (float): Solo se valida al prestar una conexión si estuvo ociosa
+            más de estos segundos (0 valida siempre)
+        name (str): Nombre del pool para las estadísticas
+    """
+
+    def __init__(self, connect, validate=None, reset=None, min_size=1, max_size=10,
+                 timeout=10, idle_timeout=300, ping_interval=0, name='primary', on_close=None):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError('Tamaños de pool inválidos')
+
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+
+        self._connect = connect
+        self._validate = validate
+        self._reset = reset
+        self._on_close = on_close
+        self._idle = deque()  # (conexion, instante del último uso)
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._counters = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'created': 0,
+            'closed': 0,
+            'evicted': 0,
+            'failed_health_checks': 0
+        }
+
+        for _ in range(min_size):
+            with self._cond:
+                self._size += 1
+            self._idle.append((self._open(), time.monotonic()))
+
+    def _open(self):
+        """Abre una conexión para un hueco ya reservado en el pool."""
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._counters['created'] += 1
+        return conn
+
+    def _close(self, conn):
+        """Cierra una conexión ignorando errores de red."""
+        if self._on_close is not None:
+            self._on_close(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._counters['closed'] += 1
+
+    def _is_healthy(self, conn, last_used):
+        if self._validate is None:
+            return True
+        if self.ping_interval and time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            return bool(self._validate(conn))
+        except Exception:
+            return False
+
+    def _evict_idle(self):
+        """Saca las conexiones ociosas vencidas. Debe llamarse con el lock tomado."""
+        if not self.idle_timeout:
+            return []
+        now = time.monotonic()
+        expired = []
+        # Las más antiguas quedan a la izquierda porque se reutiliza por la derecha
+        while self._idle and self._size > self.min_size:
+            conn, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._counters['evicted'] += 1
+            expired.append(conn)
+        return expired
+
+    def acquire(self):
+        """
+        Toma una conexión del pool, abriendo una nueva si hay cupo.
+
+        Returns:
+            Conexión lista para usarse
+
+        Raises:
+            PoolTimeoutError: Si no se libera ninguna conexión a tiempo
+        """
+        deadline = time.monotonic() + self.timeout
+        conn = None
+        last_used = None
+        waited = False
+
+        with self._cond:
+            if self._closed:
+                raise PoolTimeoutError(f'El pool {self.name} está cerrado')
+            expired = self._evict_idle()
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f'No hay conexiones libres en el pool {self.name} '
+                        f'({self.max_size} en uso)'
+                    )
+                if not waited:
+                    self._counters['waits'] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+        for old in expired:
+            self._close(old)
+
+        if conn is not None and not self._is_healthy(conn, last_used):
+            with self._cond:
+                self._counters['failed_health_checks'] += 1
+            self._close(conn)
+            conn = None
+
+        if conn is None:
+            conn = self._open()
+
+        with self._cond:
+            self._in_use += 1
+            self._counters['checkouts'] += 1
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Devuelve una conexión al pool.
+
+        Args:
+            conn: Conexión obtenida con acquire()
+            discard (bool): Si es True la conexión se cierra en lugar de reutilizarse
+        """
+        if not discard and self._reset is not None:
+            try:
+                self._reset(conn)
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            expired = self._evict_idle()
+            self._cond.notify()
+
+        if discard or self._closed:
+            self._close(conn)
+        for old in expired:
+            self._close(old)
+
+    @contextmanager
+    def connection(self):
+        """Context manager que presta una conexión y la devuelve al salir."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Cierra las conexiones ociosas y marca el pool como cerrado."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self):
+        """
+        Devuelve el estado actual del pool.
+
+        Returns:
+            dict: Tamaño, conexiones libres/en uso y contadores acumulados
+        """
+        with self._cond:
+            return {
+                'name': self.name,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                **self._counters
+            }
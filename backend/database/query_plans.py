@@ -0,0 +1,147 @@
+import json
+import os
+from database.instrumentation import add_listener, normalize_sql, remove_listener
+from database.schema import BASE_DIR
+
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'query_plans')
+
+# Sentencias con plan de ejecución; los INSERT no leen tablas
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE')
+
+# Peticiones de escritura que se agregan a los GET cuando la base es desechable
+WRITE_SCENARIOS = [
+    ('POST', '/api/sales', {
+        'id_cliente': 1,
+        'detalles': [
+            {'id_producto': 1, 'cantidad': 1, 'precio_unitario': 10},
+            {'id_producto': 2, 'cantidad': 1, 'precio_unitario': 5}
+        ]
+    }),
+    ('POST', '/api/sales/batch', {'ventas': [
+        {'id_cliente': 1, 'detalles': [{'id_producto': 1, 'cantidad': 1, 'precio_unitario': 10}]},
+        {'id_cliente': 2, 'tipo_comprobante': 'BOLETA', 'fecha_hora': '2024-01-15T10:30:00',
+         'detalles': [{'id_producto': 2, 'cantidad': 1, 'precio_unitario': 5}]}
+    ]}),
+    ('PUT', '/api/products/1', {'precio_venta': 20}),
+    ('POST', '/api/products/bulk-update', {
+        'filter': {'id_categoria': 1},
+        'changes': {'precio_venta': {'percent': 5}}
+    }),
+    ('POST', '/api/customers', {'nombres': 'Cliente', 'apellidos': 'Plan', 'identificacion': '0999999999'}),
+    # Va al final porque reemplaza la sesión de prueba
+    ('POST', '/api/auth/login', {'username': 'kenny.admin', 'password': 'admin123'})
+]
+
+def read_scenarios(app):
+    """
+    Arma un GET por cada ruta de la API, usando 1 en los parámetros de la URL.
+
+    Returns:
+        list: Tuplas (método, url, cuerpo JSON)
+    """
+    scenarios = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if 'GET' not in rule.methods or rule.endpoint == 'static':
+            continue
+        scenarios.append(('GET', rule.build({name: 1 for name in rule.arguments})[1], None))
+    return scenarios
+
+def collect_statements(app, scenarios, session=None):
+    """
+    Ejecuta las peticiones indicadas y captura cada sentencia que emiten.
+
+    Args:
+        app (Flask): Aplicación con los blueprints registrados
+        scenarios (list): Tuplas (método, url, cuerpo JSON)
+        session (dict, optional): Valores de sesión para las rutas protegidas
+
+    Returns:
+        dict: Por cada sentencia normalizada, la consulta original, sus
+            primeros parámetros y las rutas que la ejecutan
+    """
+    statements = {}
+    current = {}
+
+    def capture(query, params, elapsed_ms):
+        sql = normalize_sql(query)
+        if not sql.upper().startswith(EXPLAINABLE):
+            return
+        entry = statements.setdefault(sql, {'query': query, 'params': params, 'endpoints': set()})
+        entry['endpoints'].add(current['endpoint'])
+
+    client = app.test_client()
+    if session:
+        with client.session_transaction() as client_session:
+            client_session.update(session)
+
+    add_listener(capture)
+    try:
+        for method, url, body in scenarios:
+            current['endpoint'] = f'{method} {url}'
+            response = client.open(url, method=method, json=body)
+            # Consume las respuestas por bloques para que se ejecuten sus consultas
+            response.get_data()
+    finally:
+        remove_listener(capture)
+    return statements
+
+def explain_statements(db, statements):
+    """
+    Obtiene el plan de cada sentencia capturada.
+
+    Returns:
+        dict: Por sentencia, las rutas, los pasos del plan y sus problemas
+    """
+    plans = {}
+    with db.connection() as connection:
+        for sql, entry in sorted(statements.items()):
+            try:
+                steps = db.backend.explain(connection, entry['query'], entry['params'])
+            except db.backend.Error as e:
+                steps = [{'table': None, 'detail': f'Error: {e}', 'issues': []}]
+            plans[sql] = {
+                'endpoints': sorted(entry['endpoints']),
+                'plan': [step['detail'] for step in steps],
+                'issues': sorted({
+                    f"{step['table']}: {issue}" if step['table'] else issue
+                    for step in steps for issue in step['issues']
+                })
+            }
+    return plans
+
+def snapshot_path(backend_name):
+    """Ruta del archivo de planes guardado para un backend."""
+    return os.path.join(SNAPSHOT_DIR, f'{backend_name}.json')
+
+def load_snapshot(path):
+    """Lee un archivo de planes; devuelve None si todavía no existe."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as snapshot_file:
+        return json.load(snapshot_file)
+
+def save_snapshot(path, plans):
+    """Guarda los planes en un archivo JSON ordenado para que los diffs sean legibles."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as snapshot_file:
+        json.dump(plans, snapshot_file, indent=2, ensure_ascii=False, sort_keys=True)
+        snapshot_file.write('\n')
+
+def find_regressions(previous, current):
+    """
+    Compara los planes actuales con los guardados.
+
+    Es una regresión cualquier problema (escaneo completo, filesort o tabla
+    temporal) que el plan guardado no tenía, incluidas las sentencias nuevas
+    que ya nacen con alguno.
+
+    Returns:
+        list: Tuplas (sentencia, problemas nuevos, rutas)
+    """
+    regressions = []
+    for sql, plan in current.items():
+        known = set(previous.get(sql, {}).get('issues', []))
+        new_issues = [issue for issue in plan['issues'] if issue not in known]
+        if new_issues:
+            regressions.append((sql, new_issues, plan['endpoints']))
+    return regressions
@@ -0,0 +1,95 @@
+import itertools
+import threading
+import time
+from flask import g, has_request_context
+
+def _is_read_only(query):
+    """Indica si la sentencia es un SELECT que puede atender una réplica."""
+    sql = query.lstrip()
+    if sql[:6].upper() != 'SELECT':
+        return False
+    upper = sql.upper()
+    # Los SELECT con bloqueo deben ir al primario junto con la escritura
+    return 'FOR UPDATE' not in upper and 'LOCK IN SHARE MODE' not in upper
+
+def stick_to_primary():
+    """
+    Envía al primario el resto de las lecturas de la petición en curso.
+
+    Tras una escritura las réplicas pueden ir atrasadas; así la misma
+    petición siempre lee lo que acaba de escribir.
+    """
+    if has_request_context():
+        g.db_use_primary = True
+
+def sticky_primary():
+    """Indica si la petición en curso ya escribió en el primario."""
+    return has_request_context() and g.get('db_use_primary', False)
+
+class ReplicaSet:
+    """
+    Pools de las réplicas de lectura, elegidas por turnos (round-robin).
+
+    Una réplica que falla queda fuera de la rotación durante `retry_after`
+    segundos; mientras no haya ninguna disponible las lecturas van al primario.
+
+    Args:
+        pools (list): ConnectionPool de cada réplica
+        retry_after (float): Segundos que una réplica caída queda sin usarse
+    """
+
+    def __init__(self, pools, retry_after=30):
+        self.pools = list(pools)
+        self.retry_after = retry_after
+        self._turns = itertools.cycle(range(len(self.pools)))
+        self._down_until = {}
+        self._failures = {pool.name: 0 for pool in self.pools}
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.pools)
+
+    def choose(self):
+        """
+        Devuelve el pool de la siguiente réplica disponible.
+
+        Returns:
+            ConnectionPool: Réplica elegida, o None si todas están caídas
+        """
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.pools)):
+                pool = self.pools[next(self._turns)]
+                if self._down_until.get(pool.name, 0) <= now:
+                    return pool
+        return None
+
+    def mark_down(self, pool, error):
+        """Saca una réplica de la rotación tras un error de conexión."""
+        with self._lock:
+            self._down_until[pool.name] = time.monotonic() + self.retry_after
+            self._failures[pool.name] += 1
+        print(f"Réplica {pool.name} no disponible por {self.retry_after:.0f} s: {error}")
+
+    def close_all(self):
+        """Cierra las conexiones de todas las réplicas."""
+        for pool in self.pools:
+            pool.close_all()
+
+    def stats(self):
+        """
+        Devuelve el estado de cada réplica.
+
+        Returns:
+            list: Estadísticas del pool de cada réplica y si está en rotación
+        """
+        now = time.monotonic()
+        with self._lock:
+            status = {
+                pool.name: {
+                    'available': self._down_until.get(pool.name, 0) <= now,
+                    'failures': self._failures[pool.name]
+                }
+                for pool in self.pools
+            }
+        return [{**pool.stats(), **status[pool.name]} for pool in self.pools]
@@ -0,0 +1,31 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_PATH = os.path.join(BASE_DIR, 'Ferreteria_Base.sql')
+SAMPLE_DATA_PATH = os.path.join(BASE_DIR, 'datos_ejemplo.sql')
+
+def load_script(db, path):
+    """
+    Ejecuta un archivo .sql escrito para MySQL sobre el backend configurado.
+
+    En SQLite las sentencias DDL se convierten al dialecto de SQLite antes
+    de ejecutarse, así que el mismo Ferreteria_Base.sql sirve para ambos.
+
+    Args:
+        db (Database): Base de datos sobre la que se ejecuta el script
+        path (str): Ruta del archivo .sql
+
+    Returns:
+        int: Número de sentencias ejecutadas
+    """
+    with open(path, encoding='utf-8') as script_file:
+        statements = db.backend.prepare_script(script_file.read())
+
+    with db.transaction() as tx:
+        for statement in statements:
+            tx.execute(statement, fetch=False)
+    return len(statements)
+
+def load_schema(db, path=SCHEMA_PATH):
+    """Crea las tablas de Ferreteria_Base.sql si todavía no existen."""
+    return load_script(db, path)
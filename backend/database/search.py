@@ -0,0 +1,228 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+def normalize_text(text):
+    """
+    Prepara un texto para buscar: minúsculas, sin tildes ni signos.
+
+        normalize_text('Tubería PVC ½"')  ->  'tuberia pvc 1 2'
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _NON_ALNUM_RE.sub(' ', text).strip()
+
+def trigrams(text):
+    """
+    Devuelve los trigramas de las palabras de un texto ya normalizado.
+
+    Cada palabra se rellena con dos espacios al inicio y uno al final, así
+    'mar' produce '  m', ' ma', 'mar' y 'ar '; los prefijos pesan más, lo que
+    favorece la búsqueda mientras se escribe.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas sobre varios campos de texto.
+
+    Tolera errores de tipeo porque compara trigramas en lugar de palabras
+    completas: 'martilo' comparte 7 de 8 trigramas con 'martillo'. Además,
+    como el LIKE '%...%' al que reemplaza, un documento que contiene la
+    búsqueda tal cual siempre aparece, aunque comparta pocos trigramas
+    ('til' en 'martillo').
+
+    Args:
+        weights (dict): Peso de cada campo en la puntuación
+        min_similarity (float): Fracción mínima de trigramas de la búsqueda
+            que debe tener un documento para aparecer en los resultados
+    """
+
+    def __init__(self, weights, min_similarity=0.5):
+        self.weights = weights
+        self.min_similarity = min_similarity
+        self._postings = defaultdict(set)  # trigrama -> ids de documentos
+        self._documents = {}  # id -> {campo: (texto normalizado, trigramas)}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, doc_id, fields):
+        """Agrega o reemplaza un documento con sus campos de texto."""
+        document = {}
+        for field in self.weights:
+            text = normalize_text(fields.get(field))
+            document[field] = (text, trigrams(text))
+
+        with self._lock:
+            self._remove(doc_id)
+            self._documents[doc_id] = document
+            for _, grams in document.values():
+                for gram in grams:
+                    self._postings[gram].add(doc_id)
+
+    def remove(self, doc_id):
+        """Quita un documento del índice."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        for _, grams in document.values():
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(doc_id)
+                    if not postings:
+                        del self._postings[gram]
+
+    def _contains(self, doc_id, text):
+        return any(text in field_text for field_text, _ in self._documents[doc_id].values())
+
+    def search(self, query, limit=None):
+        """
+        Busca los documentos más parecidos a `query`.
+
+        La puntuación suma, por campo, la fracción de trigramas de la búsqueda
+        que contiene multiplicada por el peso del campo, más un extra cuando el
+        campo contiene la búsqueda tal cual o empieza por ella.
+
+        Returns:
+            list: Tuplas (id, puntuación) de mayor a menor puntuación
+        """
+        text = normalize_text(query)
+        if not text:
+            return []
+        query_grams = trigrams(text)
+        compact = text.replace(' ', '')
+
+        with self._lock:
+            if max(len(word) for word in text.split()) < 3:
+                # Sin palabras de tres letras no hay trigramas internos que
+                # compartir con un texto que la contenga en medio ('ti' en
+                # 'martillo'): se recorren los documentos buscando la subcadena
+                shared = Counter({doc_id: 0 for doc_id in self._documents if self._contains(doc_id, text)})
+            else:
+                shared = Counter()
+            for gram in query_grams:
+                shared.update(self._postings.get(gram, ()))
+
+            results = []
+            for doc_id, count in shared.items():
+                if count / len(query_grams) < self.min_similarity and not self._contains(doc_id, text):
+                    continue
+                score = 0.0
+                for field, weight in self.weights.items():
+                    field_text, grams = self._documents[doc_id][field]
+                    score += weight * len(query_grams & grams) / len(query_grams)
+                    if field_text.startswith(text) or field_text.replace(' ', '') == compact:
+                        score += weight
+                    elif text in field_text:
+                        score += weight / 2
+                results.append((doc_id, round(score, 4)))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit] if limit else results
+
+class ProductSearch:
+    """
+    Índice de búsqueda de productos activos por nombre, código y descripción.
+
+    Se construye en memoria al primer uso y se mantiene al día de dos formas:
+    refresh() recibe los ids que cambian en este proceso (Producto.on_change)
+    y, cada `sync_interval` segundos, se leen los productos creados o
+    modificados por otros procesos según fecha_creacion/fecha_actualizacion.
+
+    Args:
+        database (Database): Base de datos de donde se leen los productos
+        sync_interval (float): Segundos entre sincronizaciones con la base
+    """
+
+    # Columnas que afectan al índice; los cambios de stock no lo tocan
+    INDEXED_COLUMNS = {'codigo_producto', 'nombre_producto', 'descripcion', 'estado'}
+
+    COLUMNS = """
+        SELECT id_producto, codigo_producto, nombre_producto, descripcion, estado,
+               fecha_creacion, fecha_actualizacion
+        FROM PRODUCTO
+    """
+
+    def __init__(self, database, sync_interval=30):
+        self.database = database
+        self.sync_interval = sync_interval
+        self.index = TrigramIndex({'nombre': 3.0, 'codigo': 2.0, 'descripcion': 1.0})
+        self._loaded = False
+        self._watermark = None
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+    def _apply(self, rows):
+        for row in rows:
+            if row['estado'] == 'ACTIVO':
+                self.index.add(row['id_producto'], {
+                    'nombre': row['nombre_producto'],
+                    'codigo': row['codigo_producto'],
+                    'descripcion': row['descripcion']
+                })
+            else:
+                self.index.remove(row['id_producto'])
+            for column in ('fecha_creacion', 'fecha_actualizacion'):
+                if row[column] is not None and (self._watermark is None or row[column] > self._watermark):
+                    self._watermark = row[column]
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._loaded and now - self._last_sync < self.sync_interval:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._apply(self.database.execute_query(self.COLUMNS + " WHERE estado = 'ACTIVO'"))
+                self._loaded = True
+                print(f"Índice de búsqueda de productos listo ({len(self.index)} productos)")
+            elif now - self._last_sync >= self.sync_interval and self._watermark is not None:
+                # >= vuelve a leer los del mismo segundo; aplicarlos dos veces no tiene efecto
+                self._apply(self.database.execute_query(
+                    self.COLUMNS + " WHERE fecha_creacion >= %s OR fecha_actualizacion >= %s",
+                    (self._watermark, self._watermark)
+                ))
+            self._last_sync = now
+
+    def refresh(self, product_ids, columns=None):
+        """Vuelve a leer los productos indicados; se registra en Producto.on_change."""
+        if not self._loaded or not product_ids:
+            return
+        if columns is not None and not columns & self.INDEXED_COLUMNS:
+            return
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        rows = self.database.execute_query(
+            self.COLUMNS + f" WHERE id_producto IN ({placeholders})", tuple(product_ids)
+        )
+        with self._lock:
+            self._apply(rows)
+            for product_id in set(product_ids) - {row['id_producto'] for row in rows}:
+                self.index.remove(product_id)
+
+    def search(self, query, limit=None):
+        """
+        Busca productos activos.
+
+        Returns:
+            list: Tuplas (id_producto, puntuación) de mayor a menor puntuación
+        """
+        self._ensure_current()
+        return self.index.search(query, limit)
+
+    def stats(self):
+        """Devuelve el tamaño del índice."""
+        return {'loaded': self._loaded, 'products': len(self.index)}
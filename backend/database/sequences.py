@@ -0,0 +1,115 @@
+import threading
+
+class DocumentNumbers:
+    """
+    Números de comprobante por tipo y serie, tomados de SECUENCIA_COMPROBANTE.
+
+    Con block_size = 1 cada número se toma con un UPDATE dentro de la
+    transacción de la venta: el bloqueo de la fila de la serie ordena las
+    ventas y, si una venta se deshace, su número también, así que la
+    numeración no tiene huecos.
+
+    Con block_size > 1 cada proceso reserva bloques de números en una
+    transacción propia y los reparte desde memoria con preallocated(), que
+    se llama antes de abrir la transacción de la venta. La fila de la serie
+    se bloquea una vez por bloque en lugar de una vez por venta, a cambio de
+    que los números de ventas fallidas o de bloques sin terminar queden sin
+    usar y de que procesos distintos no numeren en orden de fecha.
+
+    Args:
+        database (Database): Base de datos con la tabla SECUENCIA_COMPROBANTE
+        block_size (int): Números que se reservan cada vez
+    """
+
+    def __init__(self, database, block_size=1):
+        self.database = database
+        self.block_size = max(1, block_size)
+        self._blocks = {}  # (tipo, serie) -> [siguiente número, último reservado]
+        self._lock = threading.Lock()
+
+    def preallocated(self, tipo_comprobante, serie):
+        """
+        Toma un número del bloque reservado por este proceso.
+
+        Debe llamarse fuera de la transacción de la venta: cuando el bloque se
+        agota, el siguiente se reserva y se confirma en una transacción propia.
+
+        Args:
+            tipo_comprobante (str): 'FACTURA' o 'BOLETA'
+            serie (str): Serie del comprobante, por ejemplo 'F001'
+
+        Returns:
+            int: Número asignado, o None si block_size es 1 y el número se
+                debe tomar con next() dentro de la transacción
+        """
+        if self.block_size == 1:
+            return None
+
+        key = (tipo_comprobante, serie)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                with self.database.transaction() as tx:
+                    last = self._increment(tx, tipo_comprobante, serie, self.block_size)
+                block = [last - self.block_size + 1, last]
+                self._blocks[key] = block
+            number = block[0]
+            block[0] += 1
+            return number
+
+    def next(self, tx, tipo_comprobante, serie, count=1):
+        """
+        Incrementa el contador de la serie dentro de la transacción de la venta.
+
+        Los números quedan bloqueados hasta que la venta se confirma y vuelven
+        atrás si se deshace, así que no quedan huecos.
+
+        Args:
+            tx (Transaction): Transacción de la venta
+            tipo_comprobante (str): 'FACTURA' o 'BOLETA'
+            serie (str): Serie del comprobante, por ejemplo 'F001'
+            count (int, optional): Números consecutivos a tomar (ventas por lotes)
+
+        Returns:
+            int: Primer número asignado
+        """
+        return self._increment(tx, tipo_comprobante, serie, count) - count + 1
+
+    def _increment(self, tx, tipo_comprobante, serie, count):
+        """Suma `count` al contador de la serie y devuelve el nuevo último número."""
+        update_query = """
+        UPDATE SECUENCIA_COMPROBANTE SET ultimo_numero = ultimo_numero + %s
+        WHERE tipo_comprobante = %s AND serie = %s
+        """
+        params = (count, tipo_comprobante, serie)
+        if tx.execute(update_query, params)['affected_rows'] == 0:
+            self._create(tx, tipo_comprobante, serie)
+            tx.execute(update_query, params)
+
+        result = tx.execute(
+            "SELECT ultimo_numero FROM SECUENCIA_COMPROBANTE WHERE tipo_comprobante = %s AND serie = %s",
+            (tipo_comprobante, serie)
+        )
+        return result[0]['ultimo_numero']
+
+    def _create(self, tx, tipo_comprobante, serie):
+        """
+        Crea el contador de una serie nueva a partir del último número en VENTA.
+
+        Es la única vez que se recorren las ventas de la serie. El último
+        número se lee con un SELECT simple (sin los bloqueos que tomaría un
+        INSERT ... SELECT sobre VENTA) y, si otra venta creó la fila al mismo
+        tiempo, el INSERT no hace nada y basta con incrementarla. Cualquier
+        otro error se propaga y deshace la venta completa.
+        """
+        rows = tx.execute("""
+        SELECT COALESCE(MAX(CAST(SUBSTR(numero_comprobante, %s) AS SIGNED)), 0) as ultimo
+        FROM VENTA
+        WHERE tipo_comprobante = %s AND numero_comprobante LIKE %s
+        """, (len(serie) + 2, tipo_comprobante, f'{serie}-%'))
+        columns = ['tipo_comprobante', 'serie']
+        tx.execute(
+            "INSERT INTO SECUENCIA_COMPROBANTE (tipo_comprobante, serie, ultimo_numero) VALUES (%s, %s, %s)"
+            + self.database.backend.ignore_duplicate_clause(columns),
+            (tipo_comprobante, serie, rows[0]['ultimo'])
+        )
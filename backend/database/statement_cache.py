@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+
+class StatementCache:
+    """
+    Caché LRU de sentencias preparadas de una conexión, indexada por el texto SQL.
+
+    Cada entrada es un cursor ya preparado en el servidor; reutilizarlo evita
+    que MySQL vuelva a analizar la misma sentencia. Al desalojar una entrada
+    se cierra el cursor y con ello la sentencia preparada.
+
+    Args:
+        connection: Conexión dueña de las sentencias
+        capacity (int): Número máximo de sentencias por conexión
+        registry (StatementCacheRegistry): Registro que lleva los contadores comunes
+    """
+
+    def __init__(self, connection, capacity, registry):
+        self.connection = connection
+        self.capacity = capacity
+        self._registry = registry
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, sql, prepare):
+        """
+        Devuelve el cursor preparado para `sql`, creándolo con prepare() si no existe.
+
+        Args:
+            sql (str): Texto de la sentencia
+            prepare (callable): Crea un cursor preparado nuevo
+
+        Returns:
+            Cursor preparado listo para execute()
+        """
+        cursor = self._entries.get(sql)
+        if cursor is not None:
+            self._entries.move_to_end(sql)
+            self._registry.count('hits')
+            return cursor
+
+        self._registry.count('misses')
+        cursor = prepare()
+        self._entries[sql] = cursor
+        while len(self._entries) > self.capacity:
+            _, evicted = self._entries.popitem(last=False)
+            self._registry.count('evictions')
+            self._close(evicted)
+        return cursor
+
+    def discard(self, sql):
+        """Quita una sentencia de la caché, por ejemplo tras un error al ejecutarla."""
+        cursor = self._entries.pop(sql, None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def clear(self):
+        """Cierra todas las sentencias de la caché."""
+        while self._entries:
+            _, cursor = self._entries.popitem()
+            self._close(cursor)
+
+    @staticmethod
+    def _close(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+class StatementCacheRegistry:
+    """Cachés de sentencias de todas las conexiones del pool, con contadores comunes."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._caches = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def for_connection(self, connection):
+        """Devuelve la caché de una conexión, creándola la primera vez."""
+        with self._lock:
+            cache = self._caches.get(id(connection))
+            if cache is None or cache.connection is not connection:
+                cache = StatementCache(connection, self.capacity, self)
+                self._caches[id(connection)] = cache
+            return cache
+
+    def count(self, counter):
+        """Incrementa uno de los contadores comunes."""
+        with self._lock:
+            self._counters[counter] += 1
+
+    def forget(self, connection):
+        """Olvida la caché de una conexión que se cerró."""
+        with self._lock:
+            cache = self._caches.get(id(connection))
+            if cache is not None and cache.connection is connection:
+                del self._caches[id(connection)]
+
+    def stats(self):
+        """
+        Devuelve los contadores de la caché de sentencias.
+
+        Returns:
+            dict: Aciertos, fallos, desalojos y sentencias cacheadas
+        """
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'capacity': self.capacity,
+                'connections': len(self._caches),
+                'statements': sum(len(cache) for cache in self._caches.values()),
+                'hit_ratio': round(self._counters['hits'] / lookups, 4) if lookups else None,
+                **self._counters
+            }
@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+
+class ThreadOffloadDatabase:
+    """
+    Ejecuta consultas de Database en un pool de hilos para las vistas async de Flask.
+
+    No es un pool asíncrono: mysql-connector no tiene driver asíncrono en
+    esta versión, así que cada consulta sigue siendo bloqueante y corre en
+    un hilo de un executor con una conexión del pool síncrono. Con el
+    servidor WSGI cada vista async tiene su propio event loop, así que lo
+    único que se gana es esperar a la vez varias consultas independientes de
+    una misma petición con gather(), como en las estadísticas del dashboard.
+    Las vistas de productos, ventas y búsqueda hacen una o dos consultas
+    dependientes entre sí y siguen siendo síncronas.
+
+    El executor es compartido por todo el proceso y tiene como máximo
+    Config.DB_OFFLOAD_WORKERS hilos, y siempre al menos una conexión menos
+    que el pool: una petición con muchas consultas en gather() las ejecuta
+    por turnos en lugar de tomar todas las conexiones.
+
+    Args:
+        database (Database): Base de datos síncrona que ejecuta las consultas
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def max_workers(self):
+        """Hilos del executor: DB_OFFLOAD_WORKERS, dejando libre al menos una conexión del pool."""
+        return max(1, min(Config.DB_OFFLOAD_WORKERS, self.database.pool.max_size - 1))
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers(),
+                        thread_name_prefix='db-offload'
+                    )
+        return self._executor
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Ejecuta una función bloqueante en el executor.
+
+        Se copia el contexto actual para que la función vea la misma petición
+        de Flask (estadísticas de consultas y lecturas en el primario tras
+        una escritura).
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, function, *args, **kwargs)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    async def execute_query(self, query, params=None, fetch=True, commit=False):
+        """Database.execute_query() ejecutado en un hilo del executor."""
+        return await self.run(self.database.execute_query, query, params, fetch, commit)
+
+    async def gather(self, *queries):
+        """
+        Ejecuta varios SELECT independientes a la vez.
+
+            productos, usuarios = await db_offload.gather(
+                "SELECT COUNT(*) as total FROM PRODUCTO",
+                ("SELECT * FROM USUARIO WHERE estado = %s", ('ACTIVO',))
+            )
+
+        Args:
+            *queries: Cada consulta como texto SQL o como tupla (query, params)
+
+        Returns:
+            list: Resultados en el mismo orden de las consultas
+        """
+        calls = []
+        for query in queries:
+            if isinstance(query, str):
+                query = (query, None)
+            calls.append(self.execute_query(*query))
+        return await asyncio.gather(*calls)
+
+    async def transaction(self, work):
+        """
+        Ejecuta `work(tx)` dentro de db.transaction() en un hilo del executor.
+
+        Las sentencias de una transacción comparten conexión y se ejecutan en
+        orden, así que el bloque completo corre en un solo hilo.
+
+        Args:
+            work (callable): Función que recibe el objeto Transaction
+
+        Returns:
+            Lo que devuelva `work`
+        """
+        def run_transaction():
+            with self.database.transaction() as tx:
+                return work(tx)
+        return await self.run(run_transaction)
+
+    def shutdown(self):
+        """Detiene el executor esperando las consultas en curso."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,35 @@
+import argparse
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+from database import db
+from database.migrations import status, upgrade
+
+
+def main():
+    """Aplica o muestra las migraciones de esquema de la carpeta migrations/."""
+    parser = argparse.ArgumentParser(description='Migraciones del esquema de la base de datos')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    upgrade_parser = commands.add_parser('upgrade', help='Aplica las migraciones pendientes')
+    upgrade_parser.add_argument('--to', type=int, dest='target',
+                                help='Última versión a aplicar (por defecto todas)')
+    commands.add_parser('status', help='Muestra qué migraciones están aplicadas')
+
+    args = parser.parse_args()
+
+    if args.command == 'upgrade':
+        applied = upgrade(db, target=args.target)
+        if not applied:
+            print("No hay migraciones pendientes")
+    else:
+        for migration in status(db):
+            applied_at = migration['fecha_aplicacion'] or ''
+            print(f"{migration['version']:04d}  {migration['estado']:<10}  "
+                  f"{migration['nombre']}  {applied_at}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+-- Índices para los filtros más usados por la API.
+--
+-- PRODUCTO.codigo_producto, CLIENTE.identificacion y USUARIO.usuario_login
+-- ya tienen índice por su restricción UNIQUE en Ferreteria_Base.sql, por lo
+-- que no se duplican aquí.
+
+-- Listado de productos activos ordenado por nombre
+CREATE INDEX idx_producto_estado_nombre ON PRODUCTO (estado, nombre_producto);
+
+-- Historial de ventas y ventas del día en el dashboard
+CREATE INDEX idx_venta_fecha ON VENTA (fecha_hora);
+
+-- Búsqueda del último número de comprobante por tipo al crear una venta
+CREATE INDEX idx_venta_comprobante ON VENTA (tipo_comprobante, numero_comprobante);
@@ -0,0 +1,6 @@
+-- Versión de fila para el control de concurrencia optimista de productos.
+--
+-- Cada escritura sobre PRODUCTO incrementa la versión; PUT /api/products/<id>
+-- solo se aplica si la versión enviada en If-Match sigue siendo la actual.
+
+ALTER TABLE PRODUCTO ADD COLUMN version INT NOT NULL DEFAULT 1;
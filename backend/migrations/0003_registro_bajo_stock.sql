@@ -0,0 +1,10 @@
+-- Registro de productos con bajo stock mantenido por la base de datos.
+--
+-- bajo_stock es una columna generada: vale 1 cuando stock_actual <= stock_minimo
+-- y la base la recalcula en cada escritura (ventas, ediciones, importaciones,
+-- compras o cambios hechos fuera de la API). Con el índice, listar o contar
+-- los productos con bajo stock lee solo esas filas, ya ordenadas por stock.
+
+ALTER TABLE PRODUCTO ADD COLUMN bajo_stock TINYINT GENERATED ALWAYS AS (stock_actual <= stock_minimo) VIRTUAL;
+
+CREATE INDEX idx_producto_bajo_stock ON PRODUCTO (estado, bajo_stock, stock_actual);
@@ -0,0 +1,15 @@
+-- Modelo de lectura de productos sin JOIN.
+--
+-- Los listados y detalles de productos mostraban el nombre de la categoría y
+-- del proveedor con un JOIN en cada consulta. Esos nombres se copian ahora en
+-- PRODUCTO: Producto.create/update/import_batch los escriben junto con
+-- id_categoria/id_proveedor y Producto.refresh_names() los vuelve a copiar
+-- cuando cambia una categoría o un proveedor.
+
+ALTER TABLE PRODUCTO ADD COLUMN nombre_categoria VARCHAR(100) NULL;
+
+ALTER TABLE PRODUCTO ADD COLUMN nombre_proveedor VARCHAR(150) NULL;
+
+UPDATE PRODUCTO
+SET nombre_categoria = (SELECT c.nombre_categoria FROM CATEGORIA c WHERE c.id_categoria = PRODUCTO.id_categoria),
+    nombre_proveedor = (SELECT pr.nombre_comercial FROM PROVEEDOR pr WHERE pr.id_proveedor = PRODUCTO.id_proveedor);
@@ -0,0 +1,13 @@
+-- Contador de números de comprobante por tipo y serie.
+--
+-- Reemplaza la búsqueda de MAX(numero_comprobante) en VENTA al crear cada
+-- venta: el contador se incrementa con un UPDATE dentro de la transacción de
+-- la venta, que bloquea solo la fila de su serie. La primera vez que se usa
+-- una serie, su fila se crea a partir del último número guardado en VENTA.
+
+CREATE TABLE IF NOT EXISTS SECUENCIA_COMPROBANTE (
+    tipo_comprobante VARCHAR(20) NOT NULL,
+    serie VARCHAR(10) NOT NULL,
+    ultimo_numero INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (tipo_comprobante, serie)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,13 @@
+-- Índices para el historial de ventas paginado (GET /api/sales).
+--
+-- El listado se ordena por (fecha_hora, id_venta) descendente. idx_venta_fecha
+-- (0001) ya sirve al listado sin filtros y a los rangos de fechas, porque el
+-- índice incluye la clave primaria. Cada filtro por igualdad tiene su índice
+-- (columna, fecha_hora): la página se lee en orden desde el índice, sin
+-- ordenar todas las ventas del cliente, vendedor o tipo de comprobante.
+
+CREATE INDEX idx_venta_cliente_fecha ON VENTA (id_cliente, fecha_hora);
+
+CREATE INDEX idx_venta_usuario_fecha ON VENTA (id_usuario, fecha_hora);
+
+CREATE INDEX idx_venta_tipo_fecha ON VENTA (tipo_comprobante, fecha_hora);
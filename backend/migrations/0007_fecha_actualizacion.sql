@@ -0,0 +1,9 @@
+-- Fecha de la última modificación de usuarios y productos.
+--
+-- Usuario.update, Producto.update, bulk_update, las bajas lógicas y la
+-- sincronización del índice de búsqueda escriben o leen esta columna. Las
+-- bases creadas con Ferreteria_Base.sql no la tienen, así que se agrega aquí.
+
+ALTER TABLE USUARIO ADD COLUMN fecha_actualizacion TIMESTAMP NULL DEFAULT NULL;
+
+ALTER TABLE PRODUCTO ADD COLUMN fecha_actualizacion TIMESTAMP NULL DEFAULT NULL;
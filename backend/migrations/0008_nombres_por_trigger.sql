@@ -0,0 +1,24 @@
+-- Los nombres copiados en PRODUCTO (0004) siguen a su categoría y proveedor.
+--
+-- Al renombrar una categoría o un proveedor (por la API o con SQL directo) un
+-- trigger copia el nombre nuevo a sus productos. Solo se tocan las filas cuyo
+-- nombre difiere, así que los cambios de estado no reescriben productos.
+-- Los productos insertados sin pasar por Producto (por ejemplo, los datos de
+-- ejemplo) quedan con los nombres en NULL; las consultas de lectura usan
+-- entonces el nombre de la tabla relacionada.
+
+CREATE TRIGGER trg_categoria_nombre AFTER UPDATE ON CATEGORIA FOR EACH ROW
+UPDATE PRODUCTO SET nombre_categoria = NEW.nombre_categoria
+WHERE id_categoria = NEW.id_categoria
+  AND (nombre_categoria IS NULL OR nombre_categoria <> NEW.nombre_categoria);
+
+CREATE TRIGGER trg_proveedor_nombre AFTER UPDATE ON PROVEEDOR FOR EACH ROW
+UPDATE PRODUCTO SET nombre_proveedor = NEW.nombre_comercial
+WHERE id_proveedor = NEW.id_proveedor
+  AND (nombre_proveedor IS NULL OR nombre_proveedor <> NEW.nombre_comercial);
+
+-- Productos insertados con SQL directo antes de esta migración
+UPDATE PRODUCTO
+SET nombre_categoria = (SELECT c.nombre_categoria FROM CATEGORIA c WHERE c.id_categoria = PRODUCTO.id_categoria),
+    nombre_proveedor = (SELECT pr.nombre_comercial FROM PROVEEDOR pr WHERE pr.id_proveedor = PRODUCTO.id_proveedor)
+WHERE nombre_categoria IS NULL OR nombre_proveedor IS NULL;
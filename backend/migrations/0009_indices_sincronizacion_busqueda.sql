@@ -0,0 +1,10 @@
+-- Índices para la sincronización del índice de búsqueda de productos.
+--
+-- Cada proceso relee cada 30 segundos los productos creados o modificados
+-- desde la última lectura (fecha_creacion >= x OR fecha_actualizacion >= x).
+-- Con un índice en cada columna la base combina los dos rangos (index merge
+-- en MySQL, MULTI-INDEX OR en SQLite) en lugar de recorrer toda la tabla.
+
+CREATE INDEX idx_producto_fecha_creacion ON PRODUCTO (fecha_creacion);
+
+CREATE INDEX idx_producto_fecha_actualizacion ON PRODUCTO (fecha_actualizacion);
@@ -0,0 +1,108 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+from config import Config
+from app import app
+from database import db
+from database.models import Producto
+from database.query_plans import (
+    WRITE_SCENARIOS, collect_statements, explain_statements, find_regressions,
+    load_snapshot, read_scenarios, save_snapshot, snapshot_path
+)
+from database.schema import SAMPLE_DATA_PATH, load_script
+from utils.pagination import encode_cursor
+
+# Sesión con la que se recorren las rutas protegidas
+ADVISOR_SESSION = {'user_id': 1, 'username': 'kenny.admin', 'role': 'ADMIN'}
+
+
+def scratch_database():
+    """Indica si la base es una SQLite en memoria que se puede modificar sin riesgo."""
+    return Config.DB_BACKEND == 'sqlite' and Config.SQLITE_PATH == ':memory:'
+
+
+def advisor_scenarios(include_writes):
+    """
+    Arma las peticiones que recorre el analizador.
+
+    Args:
+        include_writes (bool): Agrega las peticiones de escritura (solo en una base desechable)
+
+    Returns:
+        list: Tuplas (método, url, cuerpo JSON)
+    """
+    scenarios = read_scenarios(app)
+    # Páginas siguientes de los listados paginados por cursor
+    scenarios.append(('GET', f"/api/products?include_total=1&after={encode_cursor(['A', 0])}", None))
+    scenarios.append(('GET', f"/api/sales?after={encode_cursor(['2024-01-16 09:15:00', 3])}", None))
+    # Historial de ventas con cada filtro que tiene índice propio
+    for filters in ('id_cliente=1', 'id_usuario=1', 'tipo_comprobante=BOLETA', 'from=2024-01-01&to=2024-01-31'):
+        scenarios.append(('GET', f"/api/sales?{filters}", None))
+    if include_writes:
+        scenarios += WRITE_SCENARIOS
+    return scenarios
+
+
+def collect_plans(scenarios):
+    """Ejecuta las peticiones y devuelve el plan de cada sentencia que emiten."""
+    statements = collect_statements(app, scenarios, session=ADVISOR_SESSION)
+    return explain_statements(db, statements)
+
+
+def main():
+    """Revisa el plan de ejecución de cada sentencia que emiten las rutas de la API."""
+    parser = argparse.ArgumentParser(description='Analiza los planes de ejecución de las consultas de la API')
+    parser.add_argument('--update', action='store_true',
+                        help='Guarda los planes actuales como referencia')
+    parser.add_argument('--check', action='store_true',
+                        help='Termina con error si algún plan empeoró respecto a la referencia')
+    args = parser.parse_args()
+
+    if scratch_database():
+        load_script(db, SAMPLE_DATA_PATH)
+        # Los datos de ejemplo se insertan con SQL directo
+        Producto.refresh_names()
+    else:
+        # Contra una base real solo se ejecutan lecturas
+        print("Base de datos persistente: solo se analizan las rutas GET")
+
+    plans = collect_plans(advisor_scenarios(include_writes=scratch_database()))
+
+    for sql, plan in plans.items():
+        if plan['issues']:
+            print(f"\n{', '.join(plan['issues'])}")
+            print(f"  Rutas: {', '.join(plan['endpoints'])}")
+            print(f"  SQL: {sql[:300]}")
+    with_issues = sum(1 for plan in plans.values() if plan['issues'])
+    print(f"\n{len(plans)} sentencias analizadas, {with_issues} con escaneos completos, "
+          f"filesort o tablas temporales")
+
+    path = snapshot_path(db.backend.name)
+    if args.update:
+        save_snapshot(path, plans)
+        print(f"Planes guardados en {path}")
+        return 0
+
+    if args.check:
+        previous = load_snapshot(path)
+        if previous is None:
+            print(f"No existe {path}; ejecuta primero con --update")
+            return 1
+        regressions = find_regressions(previous, plans)
+        for sql, issues, endpoints in regressions:
+            print(f"\nRegresión: {', '.join(issues)}")
+            print(f"  Rutas: {', '.join(endpoints)}")
+            print(f"  SQL: {sql[:300]}")
+        if regressions:
+            print(f"\n{len(regressions)} planes empeoraron respecto a {path}")
+            return 1
+        print("Ningún plan empeoró")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
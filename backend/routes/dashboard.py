@@ -1,44 +1,47 @@
+from datetime import datetime, time, timedelta
 from flask import Blueprint, jsonify
-from database import db
+from database import db_offload
+from database.models import Producto
 from utils.decorators import login_required
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
 @dashboard_bp.route('/stats', methods=['GET'])
 @login_required
-def get_dashboard_stats():
+async def get_dashboard_stats():
     try:
-        stats = {}
+        # Ventas de hoy (por rango para que use el índice de VENTA.fecha_hora)
+        today = datetime.combine(datetime.now().date(), time.min)
         
-        # Total de productos
-        result = db.execute_query("SELECT COUNT(*) as total FROM PRODUCTO WHERE estado = 'ACTIVO'")
-        stats['total_products'] = result[0]['total'] if result else 0
-        
-        # Productos con bajo stock
-        result = db.execute_query("""
-            SELECT COUNT(*) as total FROM PRODUCTO 
-            WHERE estado = 'ACTIVO' AND stock_actual <= stock_minimo
-        """)
-        stats['low_stock_products'] = result[0]['total'] if result else 0
-        
-        # Total de usuarios activos
-        result = db.execute_query("SELECT COUNT(*) as total FROM USUARIO WHERE estado = 'ACTIVO'")
-        stats['total_users'] = result[0]['total'] if result else 0
-        
-        # Ventas de hoy
-        result = db.execute_query("""
+        # Las consultas son independientes: se ejecutan a la vez en hilos, cada una
+        # con su propia conexión del pool
+        products, low_stock, users, sales, inventory = await db_offload.gather(
+            # Total de productos
+            "SELECT COUNT(*) as total FROM PRODUCTO WHERE estado = 'ACTIVO'",
+            # Productos con bajo stock (índice de bajo stock)
+            "SELECT COUNT(*) as total FROM PRODUCTO p WHERE " + Producto.LOW_STOCK_CONDITION,
+            # Total de usuarios activos
+            "SELECT COUNT(*) as total FROM USUARIO WHERE estado = 'ACTIVO'",
+            # Ventas de hoy
+            ("""
             SELECT COUNT(*) as total, IFNULL(SUM(total), 0) as sum_total 
-            FROM VENTA WHERE DATE(fecha_hora) = CURDATE()
-        """)
-        stats['today_sales_count'] = result[0]['total'] if result else 0
-        stats['today_sales_amount'] = float(result[0]['sum_total']) if result and result[0]['sum_total'] else 0
-        
-        # Valor del inventario
-        result = db.execute_query("""
+            FROM VENTA WHERE fecha_hora >= %s AND fecha_hora < %s
+            """, (today, today + timedelta(days=1))),
+            # Valor del inventario
+            """
             SELECT SUM(stock_actual * precio_compra_ref) as total_value 
             FROM PRODUCTO WHERE estado = 'ACTIVO'
-        """)
-        stats['inventory_value'] = float(result[0]['total_value']) if result and result[0]['total_value'] else 0
+            """
+        )
+        
+        stats = {
+            'total_products': products[0]['total'] if products else 0,
+            'low_stock_products': low_stock[0]['total'] if low_stock else 0,
+            'total_users': users[0]['total'] if users else 0,
+            'today_sales_count': sales[0]['total'] if sales else 0,
+            'today_sales_amount': float(sales[0]['sum_total']) if sales and sales[0]['sum_total'] else 0,
+            'inventory_value': float(inventory[0]['total_value']) if inventory and inventory[0]['total_value'] else 0
+        }
         
         return jsonify({'stats': stats})
     
@@ -49,16 +52,7 @@ def get_dashboard_stats():
 @login_required
 def get_low_stock_products():
     try:
-        query = """
-        SELECT p.*, c.nombre_categoria
-        FROM PRODUCTO p
-        JOIN CATEGORIA c ON p.id_categoria = c.id_categoria
-        WHERE p.estado = 'ACTIVO' AND p.stock_actual <= p.stock_minimo
-        ORDER BY p.stock_actual ASC
-        LIMIT 10
-        """
-        
-        result = db.execute_query(query)
+        result = Producto.get_low_stock(limit=10)
         return jsonify({'products': result})
     
     except Exception as e:
@@ -1,24 +1,174 @@
+import math
 from flask import Blueprint, request, jsonify
+from config import Config
 from database.models import Producto
 from utils.decorators import login_required, roles_required
+from utils.fieldsets import parse_fields
+from utils.imports import FORMATS_BY_MIMETYPE, batched, iter_records
+from utils.pagination import decode_cursor, encode_cursor, page_size
+from utils.streaming import EXPORT_MIMETYPES, stream_export, stream_json_list
 
 # Crear un Blueprint para las rutas de productos
 products_bp = Blueprint('products', __name__, url_prefix='/api/products')
 
+# Coincidencias máximas del índice de búsqueda que se usan como filtro del listado
+SEARCH_MAX_MATCHES = 1000
+
+# Columnas de las exportaciones CSV/NDJSON, en el orden del archivo
+EXPORT_COLUMNS = [
+    'codigo_producto', 'nombre_producto', 'descripcion', 'nombre_categoria', 'proveedor',
+    'precio_compra_ref', 'precio_venta', 'stock_actual', 'stock_minimo', 'unidad_medida'
+]
+
+EXPORT_QUERY = f"""
+    SELECT p.codigo_producto, p.nombre_producto, p.descripcion,
+           {Producto.CATEGORY_NAME_COLUMN} as nombre_categoria,
+           {Producto.PROVIDER_NAME_COLUMN} as proveedor, p.precio_compra_ref, p.precio_venta,
+           p.stock_actual, p.stock_minimo, p.unidad_medida
+    FROM PRODUCTO p
+    WHERE p.estado = 'ACTIVO'
+"""
+
+REQUIRED_PRODUCT_FIELDS = [
+    'codigo_producto', 'nombre_producto', 'precio_compra_ref',
+    'precio_venta', 'id_categoria', 'id_proveedor'
+]
+
+def optional_value(data, field, default):
+    """Valor de un campo opcional; solo None o '' (celda CSV vacía) toman el valor por defecto."""
+    value = data.get(field)
+    return default if value in (None, '') else value
+
+def validate_product(data):
+    """
+    Valida los datos de un producto nuevo y los convierte a sus tipos.
+    
+    Lo usan la creación individual y la importación masiva, así ambas
+    aplican las mismas reglas. No revisa si el código ya existe.
+    
+    Args:
+        data (dict): Datos recibidos (JSON o una fila de CSV)
+        
+    Returns:
+        tuple: (datos del producto, None) o (None, mensaje de error)
+    """
+    missing_fields = [field for field in REQUIRED_PRODUCT_FIELDS if data.get(field) in (None, '')]
+    if missing_fields:
+        return None, f'Campos requeridos faltantes: {", ".join(missing_fields)}'
+    
+    try:
+        product_data = {
+            'codigo_producto': str(data['codigo_producto']).strip(),
+            'nombre_producto': str(data['nombre_producto']).strip(),
+            'descripcion': str(optional_value(data, 'descripcion', '')).strip(),
+            'precio_compra_ref': float(data['precio_compra_ref']),
+            'precio_venta': float(data['precio_venta']),
+            'stock_actual': int(optional_value(data, 'stock_actual', 0)),
+            'stock_minimo': int(optional_value(data, 'stock_minimo', 5)),
+            'unidad_medida': str(optional_value(data, 'unidad_medida', 'UNIDAD')).strip(),
+            'id_categoria': int(data['id_categoria']),
+            'id_proveedor': int(data['id_proveedor'])
+        }
+    except (TypeError, ValueError):
+        return None, 'Los precios, cantidades e IDs deben ser numéricos'
+    
+    # float() acepta 'nan' e 'inf', que la base no puede guardar
+    if not all(math.isfinite(product_data[field]) for field in ('precio_compra_ref', 'precio_venta')):
+        return None, 'Los precios deben ser números finitos'
+    
+    if product_data['stock_actual'] < 0 or product_data['stock_minimo'] < 0:
+        return None, 'El stock no puede ser negativo'
+    
+    # Validar precios
+    if product_data['precio_venta'] <= 0 or product_data['precio_compra_ref'] <= 0:
+        return None, 'Los precios deben ser mayores a cero'
+    
+    if product_data['precio_venta'] < product_data['precio_compra_ref']:
+        return None, 'El precio de venta no puede ser menor al precio de compra'
+    
+    return product_data, None
+
+# Campos numéricos que se pueden editar: conversión y valor mínimo permitido
+NUMERIC_PRODUCT_FIELDS = {
+    'precio_compra_ref': (float, 0),
+    'precio_venta': (float, 0),
+    'stock_actual': (int, 0),
+    'stock_minimo': (int, 0),
+    'id_categoria': (int, 1),
+    'id_proveedor': (int, 1)
+}
+
+# Campos de texto que se pueden editar: valor si llegan vacíos (None = obligatorio)
+TEXT_PRODUCT_FIELDS = {
+    'codigo_producto': None,
+    'nombre_producto': None,
+    'descripcion': '',
+    'unidad_medida': 'UNIDAD'
+}
+
+def validate_product_changes(data):
+    """
+    Convierte a sus tipos los campos de una edición parcial.
+    
+    Solo revisa los campos enviados; los precios deben ser mayores a cero,
+    el stock no puede ser negativo, los IDs deben ser enteros positivos y
+    el código y el nombre no pueden quedar vacíos. Los textos se convierten
+    igual que en validate_product.
+    
+    Args:
+        data (dict): Campos recibidos en PUT /api/products/<id>
+        
+    Returns:
+        tuple: (campos convertidos, None) o (None, mensaje de error)
+    """
+    changes = {}
+    for field, default in TEXT_PRODUCT_FIELDS.items():
+        if field not in data:
+            continue
+        value = str(optional_value(data, field, '')).strip()
+        if not value:
+            if default is None:
+                return None, f'El campo {field} no puede estar vacío'
+            value = default
+        changes[field] = value
+    for field, (convert, minimum) in NUMERIC_PRODUCT_FIELDS.items():
+        if field not in data:
+            continue
+        try:
+            value = convert(data[field])
+        except (TypeError, ValueError):
+            return None, f'El campo {field} debe ser numérico'
+        if not math.isfinite(value) or value < minimum or (convert is float and value == 0):
+            return None, f'Valor fuera de rango para {field}'
+        changes[field] = value
+    return changes, None
+
 @products_bp.route('', methods=['GET'])
 @login_required
 def get_products():
     """
-    Obtiene todos los productos activos con información de categoría y proveedor.
+    Obtiene los productos activos con información de categoría y proveedor.
+    
+    Sin `limit` ni `after` devuelve el catálogo completo, como siempre. Con
+    ellos la lista se pagina por cursor ordenando por (nombre_producto,
+    id_producto): cada página se lee desde el índice a partir de la última
+    fila de la anterior, así que su costo no depende del tamaño del catálogo.
     
     Query Parameters:
         - categoria (int, optional): Filtrar por ID de categoría
         - proveedor (int, optional): Filtrar por ID de proveedor
         - stock_min (int, optional): Filtrar productos con stock menor o igual a este valor
-        - search (str, optional): Buscar por nombre o descripción
+        - search (str, optional): Buscar por nombre, código o descripción (índice de trigramas)
+        - limit (int, optional): Productos por página (máximo Config.PAGE_SIZE_MAX); activa la paginación
+        - after (str, optional): Token next_cursor de la página anterior; activa la paginación
+          con Config.PAGE_SIZE_DEFAULT productos por página si no se envía `limit`
+        - include_total (bool, optional): Si es true, agrega el total de productos del filtro
+        - stream (bool, optional): Si es true, envía la lista completa en streaming sin cargarla en memoria
+        - fields (str, optional): Campos a devolver separados por comas (ver Producto.FIELDS);
+          id_producto y nombre_producto se incluyen siempre porque forman el cursor
         
     Returns:
-        JSON: Lista de productos con información relacionada
+        JSON: Productos (o una página de ellos) con información relacionada y el cursor de la siguiente
     """
     try:
         # Obtener parámetros de consulta
@@ -26,43 +176,141 @@ def get_products():
         proveedor_id = request.args.get('proveedor', type=int)
         stock_min = request.args.get('stock_min', type=int)
         search = request.args.get('search', '').strip()
-        
-        # Construir consulta base
-        query = """
-        SELECT p.*, c.nombre_categoria, pr.nombre_comercial as proveedor
-        FROM PRODUCTO p
-        JOIN CATEGORIA c ON p.id_categoria = c.id_categoria
-        JOIN PROVEEDOR pr ON p.id_proveedor = pr.id_proveedor
-        WHERE p.estado = 'ACTIVO'
-        """
-        
+        after = request.args.get('after')
+        # La paginación es opcional: los clientes que no la piden reciben todo el catálogo
+        paginate = 'limit' in request.args or bool(after)
+        limit = page_size(request.args.get('limit', type=int)) if paginate else None
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true')
+        
+        try:
+            cursor = decode_cursor(after, 2) if after else None
+            fields = parse_fields(request.args.get('fields'), Producto.FIELDS,
+                                  always=('id_producto', 'nombre_producto'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Filtros comunes a la página y al total
+        filters = " WHERE p.estado = 'ACTIVO'"
         params = []
         
-        # Aplicar filtros
         if categoria_id:
-            query += " AND p.id_categoria = %s"
+            filters += " AND p.id_categoria = %s"
             params.append(categoria_id)
             
         if proveedor_id:
-            query += " AND p.id_proveedor = %s"
+            filters += " AND p.id_proveedor = %s"
             params.append(proveedor_id)
             
         if stock_min is not None:
-            query += " AND p.stock_actual <= %s"
+            filters += " AND p.stock_actual <= %s"
             params.append(stock_min)
             
         if search:
-            query += " AND (p.nombre_producto LIKE %s OR p.descripcion LIKE %s)"
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term])
+            # El índice de búsqueda da los ids; un LIKE '%...%' recorrería toda la tabla
+            matches = [product_id for product_id, _ in Producto.search_index.search(search, SEARCH_MAX_MATCHES)]
+            if not matches:
+                return jsonify({'success': True, 'data': [], 'count': 0, 'has_more': False, 'next_cursor': None})
+            filters += f" AND p.id_producto IN ({', '.join(['%s'] * len(matches))})"
+            params.extend(matches)
+        
+        # Construir consulta base
+        query = Producto.select_query(fields) + filters
+        
+        # Orden estable: el id desempata productos con el mismo nombre
+        order_by = " ORDER BY p.nombre_producto, p.id_producto"
+        
+        # En modo streaming las filas se envían por bloques a medida que llegan
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            chunks = Producto.db.execute_stream(query + order_by, tuple(params) if params else None)
+            return stream_json_list(chunks, 'data', envelope={'success': True}, count_key='count')
+        
+        page_params = list(params)
+        if cursor:
+            # El >= inicial permite buscar el punto de partida en el índice
+            # (estado, nombre_producto); el resto descarta los ya enviados
+            query += " AND p.nombre_producto >= %s AND (p.nombre_producto > %s OR p.id_producto > %s)"
+            page_params.extend([cursor[0], cursor[0], cursor[1]])
+        
+        query += order_by
+        if paginate:
+            # Se pide una fila de más para saber si hay otra página
+            query += " LIMIT %s"
+            page_params.append(limit + 1)
+        
+        products = Producto.db.execute_query(query, tuple(page_params) if page_params else None)
+        has_more = paginate and len(products) > limit
+        products = products[:limit]
+        
+        response = {
+            'success': True, 
+            'data': products,
+            'count': len(products),
+            'has_more': has_more,
+            'next_cursor': encode_cursor(
+                [products[-1]['nombre_producto'], products[-1]['id_producto']]
+            ) if has_more else None
+        }
         
-        # Ordenar por nombre por defecto
-        query += " ORDER BY p.nombre_producto"
+        if include_total:
+            total = Producto.db.execute_query(
+                "SELECT COUNT(*) as total FROM PRODUCTO p" + filters,
+                tuple(params) if params else None
+            )
+            response['total'] = total[0]['total'] if total else 0
+        
+        return jsonify(response)
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@products_bp.route('/search', methods=['GET'])
+@login_required
+def search_products():
+    """
+    Busca productos activos por nombre, código o descripción.
+    
+    No distingue mayúsculas ni tildes y tolera errores de tipeo; los
+    resultados vienen ordenados por relevancia.
+    
+    Query Parameters:
+        - q (str): Texto a buscar
+        - limit (int, optional): Máximo de resultados (por defecto 10)
+        - fields (str, optional): Campos a devolver separados por comas (ver Producto.FIELDS)
+        
+    Returns:
+        JSON: Productos encontrados con su puntuación
+    """
+    try:
+        q = request.args.get('q', '').strip()
+        limit = max(1, min(request.args.get('limit', 10, type=int), Config.PAGE_SIZE_MAX))
+        
+        if not q:
+            return jsonify({'success': False, 'error': 'El parámetro q es requerido'}), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields'), Producto.FIELDS, always=('id_producto',))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        matches = Producto.search_index.search(q, limit)
+        if not matches:
+            return jsonify({'success': True, 'data': [], 'count': 0})
+        
+        # Un solo SELECT por clave primaria para los resultados de la página
+        placeholders = ', '.join(['%s'] * len(matches))
+        rows = Producto.db.execute_query(
+            Producto.select_query(fields) + f" WHERE p.id_producto IN ({placeholders}) AND p.estado = 'ACTIVO'",
+            tuple(product_id for product_id, _ in matches)
+        )
+        by_id = {row['id_producto']: row for row in rows}
+        
+        products = []
+        for product_id, score in matches:
+            if product_id in by_id:
+                products.append({**by_id[product_id], 'score': score})
         
-        # Ejecutar consulta
-        products = Producto.db.execute_query(query, tuple(params) if params else None)
         return jsonify({
-            'success': True, 
+            'success': True,
             'data': products,
             'count': len(products)
         })
@@ -95,71 +343,33 @@ def create_product():
     try:
         data = request.get_json()
         
-        # Validar datos requeridos
-        required_fields = [
-            'codigo_producto', 'nombre_producto', 'precio_compra_ref',
-            'precio_venta', 'id_categoria', 'id_proveedor'
-        ]
-        missing_fields = [field for field in required_fields if field not in data]
-        
-        if missing_fields:
+        # Validar campos requeridos y precios
+        product_data, error = validate_product(data)
+        if error:
             return jsonify({
                 'success': False, 
-                'error': f'Campos requeridos faltantes: {", ".join(missing_fields)}'
+                'error': error
             }), 400
         
         # Validar que el código no esté en uso
-        existing = Producto.get_by_codigo(data['codigo_producto'])
+        existing = Producto.get_by_codigo(product_data['codigo_producto'])
         if existing:
             return jsonify({
                 'success': False, 
                 'error': 'Ya existe un producto con este código'
             }), 400
         
-        # Validar precios
-        if float(data['precio_venta']) <= 0 or float(data['precio_compra_ref']) <= 0:
-            return jsonify({
-                'success': False,
-                'error': 'Los precios deben ser mayores a cero'
-            }), 400
-            
-        if float(data['precio_venta']) < float(data['precio_compra_ref']):
-            return jsonify({
-                'success': False,
-                'error': 'El precio de venta no puede ser menor al precio de compra'
-            }), 400
-        
         # Crear el producto
-        product_data = {
-            'codigo_producto': data['codigo_producto'].strip(),
-            'nombre_producto': data['nombre_producto'].strip(),
-            'descripcion': data.get('descripcion', '').strip(),
-            'precio_compra_ref': float(data['precio_compra_ref']),
-            'precio_venta': float(data['precio_venta']),
-            'stock_actual': int(data.get('stock_actual', 0)),
-            'stock_minimo': int(data.get('stock_minimo', 5)),
-            'unidad_medida': data.get('unidad_medida', 'UNIDAD').strip(),
-            'id_categoria': int(data['id_categoria']),
-            'id_proveedor': int(data['id_proveedor'])
-        }
-        
         result = Producto.create(product_data)
         
         if result and 'lastrowid' in result:
             # Obtener el producto creado con información de relaciones
-            query = """
-            SELECT p.*, c.nombre_categoria, pr.nombre_comercial as proveedor
-            FROM PRODUCTO p
-            JOIN CATEGORIA c ON p.id_categoria = c.id_categoria
-            JOIN PROVEEDOR pr ON p.id_proveedor = pr.id_proveedor
-            WHERE p.id_producto = %s
-            """
-            new_product = Producto.db.execute_query(query, (result['lastrowid'],))
+            new_product = Producto.get_detail(result['lastrowid'])
             
             return jsonify({
                 'success': True, 
                 'message': 'Producto creado correctamente',
-                'data': new_product[0] if new_product else None
+                'data': new_product
             }), 201
         else:
             return jsonify({
@@ -170,6 +380,200 @@ def create_product():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@products_bp.route('/import', methods=['POST'])
+@login_required
+@roles_required('ADMIN', 'INVENTARIO')
+def import_products():
+    """
+    Importa productos en masa desde un archivo CSV o NDJSON.
+    
+    El cuerpo se lee en streaming y se procesa por lotes de
+    Config.IMPORT_BATCH_SIZE filas: cada lote se valida con las mismas reglas
+    que la creación individual, busca los códigos existentes con una sola
+    consulta y se escribe con un INSERT de varias filas en una transacción.
+    
+    Query Parameters:
+        - format (str, optional): 'csv' o 'ndjson'; por defecto según el Content-Type
+        - on_duplicate (str, optional): 'error' (por defecto) rechaza los códigos
+          existentes; 'update' los actualiza sin tocar su stock
+        
+    Body:
+        CSV con encabezados o un objeto JSON por línea, con los mismos campos
+        que POST /api/products
+        
+    Returns:
+        JSON: Productos creados y actualizados, y el error de cada fila rechazada
+    """
+    try:
+        fmt = request.args.get('format') or FORMATS_BY_MIMETYPE.get(request.mimetype)
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({
+                'success': False,
+                'error': 'Formato no soportado: envíe text/csv o application/x-ndjson'
+            }), 400
+        update_existing = request.args.get('on_duplicate', 'error') == 'update'
+        
+        # Las categorías y proveedores son pocos: se validan en memoria
+        categorias = {row['id_categoria'] for row in Producto.db.execute_query(
+            "SELECT id_categoria FROM CATEGORIA WHERE estado = 'ACTIVO'")}
+        proveedores = {row['id_proveedor'] for row in Producto.db.execute_query(
+            "SELECT id_proveedor FROM PROVEEDOR WHERE estado = 'ACTIVO'")}
+        
+        seen_codes = set()
+        errors = []
+        created = updated = total = 0
+        
+        for batch in batched(iter_records(request.stream, fmt), Config.IMPORT_BATCH_SIZE):
+            valid = []
+            for row_number, data, error in batch:
+                total += 1
+                product = None
+                if error is None:
+                    product, error = validate_product(data)
+                if error is None and product['id_categoria'] not in categorias:
+                    error = 'Categoría no encontrada'
+                if error is None and product['id_proveedor'] not in proveedores:
+                    error = 'Proveedor no encontrado'
+                if error is None and product['codigo_producto'] in seen_codes:
+                    error = 'Código repetido en el archivo'
+                
+                if error:
+                    errors.append({
+                        'row': row_number,
+                        'codigo_producto': (data or {}).get('codigo_producto'),
+                        'error': error
+                    })
+                    continue
+                seen_codes.add(product['codigo_producto'])
+                valid.append((row_number, product))
+            
+            # Una consulta por lote para saber qué códigos ya existen
+            existing = Producto.existing_codes([product['codigo_producto'] for _, product in valid])
+            to_write = []
+            for row_number, product in valid:
+                if product['codigo_producto'] in existing and not update_existing:
+                    errors.append({
+                        'row': row_number,
+                        'codigo_producto': product['codigo_producto'],
+                        'error': 'Ya existe un producto con este código'
+                    })
+                else:
+                    to_write.append((row_number, product))
+            
+            try:
+                Producto.import_batch([product for _, product in to_write], update_existing)
+            except Exception as e:
+                # Un error de la base rechaza el lote completo
+                errors.extend({
+                    'row': row_number,
+                    'codigo_producto': product['codigo_producto'],
+                    'error': f'Error al guardar el lote: {str(e)}'
+                } for row_number, product in to_write)
+                continue
+            
+            batch_updated = sum(1 for _, product in to_write if product['codigo_producto'] in existing)
+            updated += batch_updated
+            created += len(to_write) - batch_updated
+        
+        errors.sort(key=lambda error: error['row'])
+        return jsonify({
+            'success': True,
+            'total': total,
+            'created': created,
+            'updated': updated,
+            'failed': len(errors),
+            'errors': errors
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@products_bp.route('/bulk-update', methods=['POST'])
+@login_required
+@roles_required('ADMIN', 'INVENTARIO')
+def bulk_update_products():
+    """
+    Modifica precios o stock mínimo de un grupo de productos en una sola operación.
+    
+    Se ejecuta como un único UPDATE en una transacción: si algún producto
+    quedara con precio de venta menor al de compra no se modifica ninguno.
+    
+    Body (JSON):
+        - filter (dict): Al menos uno de id_categoria, id_proveedor o codigos (lista)
+        - changes (dict): Columna -> operación, por ejemplo
+              {"precio_venta": {"percent": 10}, "stock_minimo": {"set": 8}}
+          precio_venta y precio_compra_ref admiten set o percent; stock_minimo solo set
+          
+    Returns:
+        JSON: Productos que cumplen el filtro y productos modificados
+    """
+    try:
+        data = request.get_json() or {}
+        filters = data.get('filter') or {}
+        changes = data.get('changes') or {}
+        
+        if not isinstance(filters, dict) or not any(
+            filters.get(field) not in (None, '', []) for field in ('id_categoria', 'id_proveedor', 'codigos')
+        ):
+            return jsonify({
+                'success': False,
+                'error': 'Debe indicar un filtro: id_categoria, id_proveedor o codigos'
+            }), 400
+        if filters.get('codigos') is not None and not isinstance(filters['codigos'], list):
+            return jsonify({'success': False, 'error': 'codigos debe ser una lista de códigos'}), 400
+        if not isinstance(changes, dict) or not changes:
+            return jsonify({'success': False, 'error': 'No se proporcionaron cambios'}), 400
+
+        try:
+            product_filters = {
+                'id_categoria': int(filters['id_categoria']) if filters.get('id_categoria') not in (None, '') else None,
+                'id_proveedor': int(filters['id_proveedor']) if filters.get('id_proveedor') not in (None, '') else None,
+                'codigos': [str(codigo).strip() for codigo in filters.get('codigos') or []]
+            }
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Los IDs del filtro deben ser numéricos'}), 400
+        
+        product_changes = {}
+        for column, operation in changes.items():
+            allowed = Producto.BULK_UPDATE_COLUMNS.get(column)
+            if allowed is None:
+                return jsonify({'success': False, 'error': f'No se puede modificar en masa: {column}'}), 400
+            if not isinstance(operation, dict) or len(operation) != 1 or next(iter(operation)) not in allowed:
+                return jsonify({
+                    'success': False,
+                    'error': f'Operación inválida para {column}: use {" o ".join(allowed)}'
+                }), 400
+            kind, value = next(iter(operation.items()))
+            try:
+                if isinstance(value, bool):
+                    raise TypeError(value)
+                value = int(value) if column == 'stock_minimo' else float(value)
+            except (TypeError, ValueError, OverflowError):
+                return jsonify({'success': False, 'error': f'El valor para {column} debe ser numérico'}), 400
+            if not math.isfinite(value) or (kind == 'percent' and value <= -100) or (kind == 'set' and value < 0) \
+                    or (kind == 'set' and column != 'stock_minimo' and value == 0):
+                return jsonify({'success': False, 'error': f'Valor fuera de rango para {column}'}), 400
+            product_changes[column] = (kind, value)
+        
+        result = Producto.bulk_update(product_filters, product_changes)
+        
+        if 'error' in result:
+            return jsonify({
+                'success': False,
+                'error': result['error'],
+                'codigos': result['codigos']
+            }), result['status']
+        
+        return jsonify({
+            'success': True,
+            'message': 'Productos actualizados correctamente',
+            'matched': result['matched_rows'],
+            'count': result['affected_rows']
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @products_bp.route('/<int:product_id>', methods=['GET'])
 @login_required
 def get_product(product_id):
@@ -179,25 +583,29 @@ def get_product(product_id):
     Args:
         product_id (int): ID del producto a buscar
         
+    Query Parameters:
+        - fields (str, optional): Campos a devolver separados por comas (ver Producto.FIELDS)
+        
     Returns:
         JSON: Datos del producto con información relacionada
     """
     try:
-        query = """
-        SELECT p.*, c.nombre_categoria, pr.nombre_comercial as proveedor
-        FROM PRODUCTO p
-        JOIN CATEGORIA c ON p.id_categoria = c.id_categoria
-        JOIN PROVEEDOR pr ON p.id_proveedor = pr.id_proveedor
-        WHERE p.id_producto = %s AND p.estado = 'ACTIVO'
-        """
+        try:
+            fields = parse_fields(request.args.get('fields'), Producto.FIELDS)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        product = Producto.db.execute_query(query, (product_id,))
+        # El detalle sale de la caché completo; aquí solo se recorta la respuesta
+        product = Producto.get_detail(product_id)
         
-        if product:
-            return jsonify({
+        if product and product['estado'] == 'ACTIVO':
+            response = jsonify({
                 'success': True, 
-                'data': product[0]
+                'data': {field: product[field] for field in fields} if fields else product
             })
+            # La versión sirve como ETag para actualizar con If-Match
+            response.headers['ETag'] = f'"{product["version"]}"'
+            return response
         else:
             return jsonify({
                 'success': False, 
@@ -232,9 +640,14 @@ def update_product(product_id):
         - unidad_medida (str): Nueva unidad de medida
         - id_categoria (int): Nueva categoría
         - id_proveedor (int): Nuevo proveedor
+        - version (int, optional): Versión leída; alternativa a la cabecera If-Match
+        
+    Headers:
+        - If-Match (optional): ETag devuelto por GET /api/products/<id>. Si el
+          producto cambió desde entonces se responde 409 sin modificarlo
         
     Returns:
-        JSON: Producto actualizado con información relacionada
+        JSON: Producto actualizado con información relacionada (y su nuevo ETag)
     """
     try:
         data = request.get_json()
@@ -245,26 +658,36 @@ def update_product(product_id):
                 'error': 'No se proporcionaron datos para actualizar'
             }), 400
         
+        changes, error = validate_product_changes(data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
         # Verificar si se está intentando actualizar el código
-        if 'codigo_producto' in data:
-            existing = Producto.get_by_codigo(data['codigo_producto'])
+        if 'codigo_producto' in changes:
+            existing = Producto.get_by_codigo(changes['codigo_producto'])
             if existing and existing['id_producto'] != product_id:
                 return jsonify({
                     'success': False, 
                     'error': 'El código ya está en uso por otro producto'
                 }), 400
         
-        # Validar precios si se están actualizando
-        if 'precio_venta' in data or 'precio_compra_ref' in data:
-            precio_venta = float(data.get('precio_venta', 0))
-            precio_compra = float(data.get('precio_compra_ref', 0))
-            
-            if precio_venta < precio_compra:
+        # Validar precios si se envían los dos; si se envía uno solo, el
+        # modelo lo compara con el valor guardado dentro del mismo UPDATE
+        if 'precio_venta' in changes and 'precio_compra_ref' in changes:
+            if changes['precio_venta'] < changes['precio_compra_ref']:
                 return jsonify({
                     'success': False,
                     'error': 'El precio de venta no puede ser menor al precio de compra'
                 }), 400
         
+        # Versión leída por el cliente: cabecera If-Match (ETag de GET) o campo version
+        version = request.headers.get('If-Match') or data.get('version')
+        if version is not None:
+            try:
+                version = int(str(version).removeprefix('W/').strip('"'))
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Versión inválida en If-Match'}), 400
+        
         # Preparar datos para actualización
         update_data = {}
         
@@ -285,33 +708,31 @@ def update_product(product_id):
         # Solo incluir los campos que se están actualizando
         for field, db_field in field_mapping.items():
             if field in data:
-                update_data[db_field] = data[field]
+                update_data[db_field] = changes[field]
         
         # Realizar la actualización
-        result = Producto.update(product_id, update_data)
+        result = Producto.update(product_id, update_data, version)
         
         if isinstance(result, dict) and 'error' in result:
-            return jsonify({
+            response = jsonify({
                 'success': False,
                 'error': result['error']
-            }), result.get('status', 500)
+            })
+            if 'version' in result:
+                response.headers['ETag'] = f'"{result["version"]}"'
+            return response, result.get('status', 500)
         
         if result and result.get('affected_rows', 0) > 0:
             # Obtener el producto actualizado con información de relaciones
-            query = """
-            SELECT p.*, c.nombre_categoria, pr.nombre_comercial as proveedor
-            FROM PRODUCTO p
-            JOIN CATEGORIA c ON p.id_categoria = c.id_categoria
-            JOIN PROVEEDOR pr ON p.id_proveedor = pr.id_proveedor
-            WHERE p.id_producto = %s
-            """
-            updated_product = Producto.db.execute_query(query, (product_id,))
+            updated_product = Producto.get_detail(product_id)
             
-            return jsonify({
+            response = jsonify({
                 'success': True, 
                 'message': 'Producto actualizado correctamente',
-                'data': updated_product[0] if updated_product else None
+                'data': updated_product
             })
+            response.headers['ETag'] = f'"{updated_product["version"]}"'
+            return response
         else:
             return jsonify({
                 'success': False, 
@@ -382,12 +803,8 @@ def get_low_stock_products():
     try:
         limit = request.args.get('limit', type=int)
         
-        # Usar el método del modelo para obtener productos con stock bajo
-        products = Producto.get_low_stock()
-        
-        # Aplicar límite si se especificó
-        if limit and limit > 0:
-            products = products[:limit]
+        # El límite se aplica en SQL sobre el índice de bajo stock
+        products = Producto.get_low_stock(limit if limit and limit > 0 else None)
         
         return jsonify({
             'success': True, 
@@ -400,3 +817,83 @@ def get_low_stock_products():
             'success': False, 
             'error': f'Error al obtener productos con bajo stock: {str(e)}'
         }), 500
+
+def export_response(query, params, filename):
+    """
+    Valida ?format y ?gzip y envía el resultado de `query` como descarga en streaming.
+    
+    Args:
+        query (str): SELECT con las columnas de EXPORT_COLUMNS
+        params (tuple): Parámetros de la consulta
+        filename (str): Nombre del archivo sin extensión
+        
+    Returns:
+        Response: Descarga CSV/NDJSON, o error 400 si el formato no es válido
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({'success': False, 'error': 'Formato no soportado: use csv o ndjson'}), 400
+    compress = request.args.get('gzip', '').lower() in ('1', 'true')
+    
+    chunks = Producto.db.execute_stream(query, params or None)
+    return stream_export(chunks, fmt, EXPORT_COLUMNS, filename, compress=compress)
+
+@products_bp.route('/export', methods=['GET'])
+@login_required
+def export_products():
+    """
+    Exporta el catálogo de productos activos en CSV o NDJSON.
+    
+    Las filas se leen de la base por bloques y se envían a medida que llegan,
+    así la descarga empieza de inmediato y no se arma la lista en memoria.
+    
+    Query Parameters:
+        - format (str, optional): 'csv' (por defecto) o 'ndjson'
+        - gzip (bool, optional): Si es true, la respuesta va comprimida (Content-Encoding: gzip)
+        - categoria (int, optional): Filtrar por ID de categoría
+        - proveedor (int, optional): Filtrar por ID de proveedor
+        
+    Returns:
+        Response: Archivo productos.csv o productos.ndjson
+    """
+    try:
+        query = EXPORT_QUERY
+        params = []
+        
+        categoria_id = request.args.get('categoria', type=int)
+        if categoria_id:
+            query += " AND p.id_categoria = %s"
+            params.append(categoria_id)
+        
+        proveedor_id = request.args.get('proveedor', type=int)
+        if proveedor_id:
+            query += " AND p.id_proveedor = %s"
+            params.append(proveedor_id)
+        
+        return export_response(query + " ORDER BY p.nombre_producto, p.id_producto", tuple(params), 'productos')
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@products_bp.route('/low-stock/export', methods=['GET'])
+@login_required
+def export_low_stock_products():
+    """
+    Exporta los productos con stock por debajo del mínimo en CSV o NDJSON.
+    
+    Query Parameters:
+        - format (str, optional): 'csv' (por defecto) o 'ndjson'
+        - gzip (bool, optional): Si es true, la respuesta va comprimida (Content-Encoding: gzip)
+        
+    Returns:
+        Response: Archivo productos_bajo_stock.csv o .ndjson
+    """
+    try:
+        query = EXPORT_QUERY + " AND p.bajo_stock = 1" + Producto.LOW_STOCK_ORDER
+        return export_response(query, (), 'productos_bajo_stock')
+    
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': f'Error al exportar productos con bajo stock: {str(e)}'
+        }), 500
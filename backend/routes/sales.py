@@ -1,121 +1,397 @@
+import math
+from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, session
+from config import Config
 from database import db
+from database.models import Producto
+from database.sequences import DocumentNumbers
 from utils.decorators import login_required
+from utils.fieldsets import parse_fields, select_list
+from utils.idempotency import IdempotencyStore, idempotent
+from utils.pagination import decode_cursor, encode_cursor, page_size
+from utils.streaming import stream_json_list
 
 sales_bp = Blueprint('sales', __name__, url_prefix='/api/sales')
 
+# Contador de números de comprobante por tipo y serie
+comprobantes = DocumentNumbers(db, block_size=Config.COMPROBANTE_BLOCK_SIZE)
+
+# Respuestas de las ventas creadas con Idempotency-Key, para repetirlas en los reintentos
+idempotency = IdempotencyStore(Config.IDEMPOTENCY_CACHE_SIZE, Config.IDEMPOTENCY_TTL)
+
+# Campos que se pueden pedir con ?fields= y su expresión SQL
+SALE_FIELDS = {
+    'id_venta': 'v.id_venta',
+    'fecha_hora': 'v.fecha_hora',
+    'total': 'v.total',
+    'estado': 'v.estado',
+    'tipo_comprobante': 'v.tipo_comprobante',
+    'numero_comprobante': 'v.numero_comprobante',
+    'id_cliente': 'v.id_cliente',
+    'id_usuario': 'v.id_usuario',
+    'cliente_nombre': 'c.nombres',
+    'cliente_apellido': 'c.apellidos',
+    'vendedor_nombre': 'u.nombres',
+    'vendedor_apellido': 'u.apellidos'
+}
+
+TIPOS_COMPROBANTE = ('FACTURA', 'BOLETA')
+
+def parse_date_bound(value, name, end=False):
+    """
+    Convierte el límite de un rango de fechas recibido en la URL.
+    
+    Args:
+        value (str): Fecha u hora ISO 8601, por ejemplo '2024-01-15' o '2024-01-15T10:30:00'
+        name (str): Nombre del parámetro, para el mensaje de error
+        end (bool, optional): Si es True y value es solo una fecha, el límite
+            es el inicio del día siguiente (el día completo queda incluido)
+        
+    Returns:
+        tuple: (operador SQL, fecha en formato 'YYYY-MM-DD HH:MM:SS')
+        
+    Raises:
+        ValueError: Si la fecha no es válida
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} debe ser una fecha ISO 8601')
+    if not end:
+        return '>=', moment.strftime('%Y-%m-%d %H:%M:%S')
+    if len(value) == 10:
+        return '<', (moment + timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+    return '<=', moment.strftime('%Y-%m-%d %H:%M:%S')
+
 @sales_bp.route('', methods=['GET'])
 @login_required
 def get_sales():
+    """
+    Obtiene las ventas, de la más reciente a la más antigua.
+    
+    La lista se pagina por cursor ordenando por (fecha_hora, id_venta) de
+    forma descendente: cada página se lee desde el índice de la fecha (o el
+    del filtro usado) a partir de la última fila de la anterior, así que
+    recorrer meses de historial cuesta lo mismo en cada página.
+    
+    Query Parameters:
+        - from (str, optional): Ventas desde esta fecha u hora ISO 8601 (incluida)
+        - to (str, optional): Ventas hasta esta fecha u hora; una fecha sola incluye todo el día
+        - id_cliente (int, optional): Filtrar por cliente
+        - id_usuario (int, optional): Filtrar por vendedor
+        - tipo_comprobante (str, optional): FACTURA o BOLETA
+        - limit (int, optional): Ventas por página (por defecto Config.PAGE_SIZE_DEFAULT)
+        - after (str, optional): Token next_cursor de la página anterior
+        - stream (bool, optional): Si es true, envía todas las ventas del filtro en streaming
+        - fields (str, optional): Campos a devolver separados por comas (ver SALE_FIELDS);
+          id_venta y fecha_hora se incluyen siempre porque forman el cursor
+        
+    Returns:
+        JSON: Página de ventas y el cursor de la siguiente
+    """
     try:
-        query = """
-        SELECT v.*, c.nombres as cliente_nombre, c.apellidos as cliente_apellido,
-               u.nombres as vendedor_nombre, u.apellidos as vendedor_apellido
-        FROM VENTA v
-        JOIN CLIENTE c ON v.id_cliente = c.id_cliente
-        JOIN USUARIO u ON v.id_usuario = u.id_usuario
-        ORDER BY v.fecha_hora DESC
-        LIMIT 50
-        """
-        
-        result = db.execute_query(query)
-        return jsonify({'sales': result})
+        id_cliente = request.args.get('id_cliente', type=int)
+        id_usuario = request.args.get('id_usuario', type=int)
+        tipo_comprobante = request.args.get('tipo_comprobante')
+        limit = page_size(request.args.get('limit', type=int))
+        after = request.args.get('after')
+        
+        # ?fields=id_venta,total,... limita las columnas y evita los JOIN que no se usan
+        try:
+            cursor = decode_cursor(after, 2) if after else None
+            fields = parse_fields(request.args.get('fields'), SALE_FIELDS,
+                                  always=('id_venta', 'fecha_hora'))
+            desde = parse_date_bound(request.args['from'], 'from') if request.args.get('from') else None
+            hasta = parse_date_bound(request.args['to'], 'to', end=True) if request.args.get('to') else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if tipo_comprobante and tipo_comprobante not in TIPOS_COMPROBANTE:
+            return jsonify({'error': 'El tipo de comprobante debe ser FACTURA o BOLETA'}), 400
+        
+        if fields is None:
+            query = """
+            SELECT v.*, c.nombres as cliente_nombre, c.apellidos as cliente_apellido,
+                   u.nombres as vendedor_nombre, u.apellidos as vendedor_apellido
+            FROM VENTA v
+            JOIN CLIENTE c ON v.id_cliente = c.id_cliente
+            JOIN USUARIO u ON v.id_usuario = u.id_usuario
+            """
+        else:
+            query = f"SELECT {select_list(fields, SALE_FIELDS)} FROM VENTA v"
+            if {'cliente_nombre', 'cliente_apellido'} & set(fields):
+                query += " JOIN CLIENTE c ON v.id_cliente = c.id_cliente"
+            if {'vendedor_nombre', 'vendedor_apellido'} & set(fields):
+                query += " JOIN USUARIO u ON v.id_usuario = u.id_usuario"
+        
+        # Cada filtro tiene un índice (columna, fecha_hora) que ya entrega las filas en orden
+        conditions = []
+        params = []
+        if id_cliente:
+            conditions.append("v.id_cliente = %s")
+            params.append(id_cliente)
+        if id_usuario:
+            conditions.append("v.id_usuario = %s")
+            params.append(id_usuario)
+        if tipo_comprobante:
+            conditions.append("v.tipo_comprobante = %s")
+            params.append(tipo_comprobante)
+        if desde:
+            conditions.append(f"v.fecha_hora {desde[0]} %s")
+            params.append(desde[1])
+        if hasta:
+            conditions.append(f"v.fecha_hora {hasta[0]} %s")
+            params.append(hasta[1])
+        
+        # Orden estable: el id desempata ventas registradas en el mismo segundo
+        order_by = " ORDER BY v.fecha_hora DESC, v.id_venta DESC"
+        
+        # ?stream=1 envía todas las ventas del filtro por bloques en lugar de una página
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
+            return stream_json_list(db.execute_stream(query + where + order_by, tuple(params) if params else None), 'sales')
+        
+        if cursor:
+            # El <= inicial permite buscar el punto de partida en el índice;
+            # el resto descarta las ventas ya enviadas
+            conditions.append("v.fecha_hora <= %s AND (v.fecha_hora < %s OR v.id_venta < %s)")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        # Se pide una fila de más para saber si hay otra página
+        query += order_by + " LIMIT %s"
+        params.append(limit + 1)
+        
+        sales = db.execute_query(query, tuple(params))
+        has_more = len(sales) > limit
+        sales = sales[:limit]
+        
+        return jsonify({
+            'sales': sales,
+            'count': len(sales),
+            'has_more': has_more,
+            'next_cursor': encode_cursor(
+                [sales[-1]['fecha_hora'], sales[-1]['id_venta']]
+            ) if has_more else None
+        })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def positive_id(value):
+    """Convierte un ID recibido en JSON (número o texto) a entero; None si no es válido."""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+def validate_sale(data):
+    """
+    Valida los datos de una venta y calcula su total.
+    
+    Lo usan la venta individual y la carga por lotes, así ambas aplican las
+    mismas reglas. No revisa el stock ni si el cliente existe.
+    
+    Args:
+        data (dict): Venta recibida (id_cliente, detalles, tipo_comprobante)
+        
+    Returns:
+        tuple: (venta con 'cantidades' y 'total', None) o (None, mensaje de error)
+    """
+    # Validar datos requeridos
+    if not isinstance(data, dict) or not data.get('id_cliente') or not data.get('detalles'):
+        return None, 'Cliente y detalles son requeridos'
+    
+    detalles = data['detalles']
+    if not isinstance(detalles, list) or len(detalles) == 0:
+        return None, 'Los detalles deben ser una lista no vacía'
+    
+    # Los IDs pueden llegar como texto ("1"); se comparan siempre como enteros
+    id_cliente = positive_id(data['id_cliente'])
+    if id_cliente is None:
+        return None, 'El id_cliente debe ser un número entero'
+    
+    # Calcular total y la cantidad pedida de cada producto
+    total = 0
+    cantidades = {}
+    lineas = []
+    for detalle in detalles:
+        if not isinstance(detalle, dict) or not detalle.get('id_producto') \
+                or not detalle.get('cantidad') or not detalle.get('precio_unitario'):
+            return None, 'Cada detalle debe tener id_producto, cantidad y precio_unitario'
+        id_producto = positive_id(detalle['id_producto'])
+        if id_producto is None:
+            return None, 'El id_producto debe ser un número entero'
+        # bool es subclase de int: true/false no son cantidades ni precios
+        cantidad, precio = detalle['cantidad'], detalle['precio_unitario']
+        if isinstance(cantidad, bool) or not isinstance(cantidad, int) or cantidad <= 0:
+            return None, 'La cantidad debe ser un número entero mayor a cero'
+        if isinstance(precio, bool) or not isinstance(precio, (int, float)) \
+                or not math.isfinite(precio) or precio <= 0:
+            return None, 'El precio unitario debe ser un número mayor a cero'
+        # DETALLE_VENTA admite una sola línea por producto
+        if id_producto in cantidades:
+            return None, f'El producto {id_producto} está repetido en la venta'
+        
+        cantidades[id_producto] = cantidad
+        total += cantidad * precio
+        lineas.append({
+            'id_producto': id_producto,
+            'cantidad': cantidad,
+            'precio_unitario': precio
+        })
+    
+    tipo_comprobante = data.get('tipo_comprobante', 'FACTURA')
+    if tipo_comprobante not in TIPOS_COMPROBANTE:
+        return None, 'El tipo de comprobante debe ser FACTURA o BOLETA'
+    
+    return {
+        'id_cliente': id_cliente,
+        'tipo_comprobante': tipo_comprobante,
+        'detalles': lineas,
+        'cantidades': cantidades,
+        'total': total
+    }, None
+
+class InsufficientStock(Exception):
+    """Algún producto de la venta no tiene stock suficiente o no está activo."""
+
+def decrement_stock(tx, cantidades, ids):
+    """
+    Descuenta el stock de varios productos dentro de una transacción.
+    
+    Un único UPDATE resta la cantidad de cada producto solo si su stock
+    alcanza (stock_actual >= cantidad). Si alguna fila no cambia se lanza
+    InsufficientStock y la transacción completa se deshace.
+    
+    Args:
+        tx (Transaction): Transacción de la venta
+        cantidades (dict): {id_producto: cantidad total pedida}
+        ids (list): IDs de los productos en orden ascendente
+        
+    Returns:
+        dict: {id_producto: stock antes de la venta}
+        
+    Raises:
+        InsufficientStock: Si a algún producto no le alcanza el stock
+    """
+    placeholders = ', '.join(['%s'] * len(ids))
+    case_cantidad = f"CASE id_producto {' '.join(['WHEN %s THEN %s'] * len(ids))} END"
+    case_params = [value for id_producto in ids for value in (id_producto, cantidades[id_producto])]
+    
+    update_query = f"""
+    UPDATE PRODUCTO 
+    SET stock_actual = stock_actual - {case_cantidad},
+        version = version + 1
+    WHERE id_producto IN ({placeholders}) AND estado = 'ACTIVO'
+      AND stock_actual >= {case_cantidad}
+    """
+    result = tx.execute(update_query, tuple(case_params + ids + case_params))
+    if result['affected_rows'] != len(ids):
+        raise InsufficientStock()
+    
+    # Las filas ya están bloqueadas por el UPDATE: esta lectura no compite con otras ventas
+    stock_query = f"SELECT id_producto, stock_actual FROM PRODUCTO WHERE id_producto IN ({placeholders})"
+    rows = tx.execute(stock_query, tuple(ids))
+    return {row['id_producto']: row['stock_actual'] + cantidades[row['id_producto']] for row in rows}
+
+def short_product(cantidades, ids):
+    """
+    Busca el primer producto al que no le alcanza el stock.
+    
+    Solo se usa para el mensaje de error, después de deshacer la venta.
+    
+    Returns:
+        int: ID del producto
+    """
+    placeholders = ', '.join(['%s'] * len(ids))
+    rows = db.execute_query(
+        f"SELECT id_producto, stock_actual FROM PRODUCTO WHERE id_producto IN ({placeholders}) AND estado = 'ACTIVO'",
+        tuple(ids)
+    )
+    stock = {row['id_producto']: row['stock_actual'] for row in rows}
+    for id_producto in ids:
+        if stock.get(id_producto, 0) < cantidades[id_producto]:
+            return id_producto
+    return ids[0]
+
 @sales_bp.route('', methods=['POST'])
 @login_required
+@idempotent(idempotency)
 def create_sale():
     try:
-        data = request.get_json()
-        
-        # Validar datos requeridos
-        if not data.get('id_cliente') or not data.get('detalles'):
-            return jsonify({'error': 'Cliente y detalles son requeridos'}), 400
-        
-        detalles = data['detalles']
-        if not isinstance(detalles, list) or len(detalles) == 0:
-            return jsonify({'error': 'Los detalles deben ser una lista no vacía'}), 400
-        
-        # Calcular total y verificar stock
-        total = 0
-        for detalle in detalles:
-            if not detalle.get('id_producto') or not detalle.get('cantidad') or not detalle.get('precio_unitario'):
-                return jsonify({'error': 'Cada detalle debe tener id_producto, cantidad y precio_unitario'}), 400
-            
-            # Verificar stock disponible
-            product_query = "SELECT stock_actual FROM PRODUCTO WHERE id_producto = %s AND estado = 'ACTIVO'"
-            product_result = db.execute_query(product_query, (detalle['id_producto'],))
-            
-            if not product_result or product_result[0]['stock_actual'] < detalle['cantidad']:
-                return jsonify({'error': f'Stock insuficiente para el producto {detalle["id_producto"]}'}), 400
-            
-            total += detalle['cantidad'] * detalle['precio_unitario']
-        
-        # Generar número de comprobante
-        tipo_comprobante = data.get('tipo_comprobante', 'FACTURA')
-        prefix = 'F' if tipo_comprobante == 'FACTURA' else 'B'
-        
-        # Obtener el último número de comprobante
-        last_query = """
-        SELECT MAX(numero_comprobante) as last_num 
-        FROM VENTA 
-        WHERE tipo_comprobante = %s AND numero_comprobante LIKE %s
-        """
-        last_result = db.execute_query(last_query, (tipo_comprobante, f'{prefix}%'))
-        
-        if last_result and last_result[0]['last_num']:
-            last_num = int(last_result[0]['last_num'].split('-')[1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
+        venta, error = validate_sale(request.get_json())
+        if error:
+            return jsonify({'error': error}), 400
         
-        numero_comprobante = f'{prefix}001-{new_num:03d}'
+        detalles = venta['detalles']
+        cantidades = venta['cantidades']
+        total = venta['total']
+        tipo_comprobante = venta['tipo_comprobante']
+        serie = ('F' if tipo_comprobante == 'FACTURA' else 'B') + Config.COMPROBANTE_SERIE
+        ids = sorted(cantidades)
         
-        # Crear la venta
-        venta_query = """
-        INSERT INTO VENTA (total, estado, tipo_comprobante, numero_comprobante, id_cliente, id_usuario)
-        VALUES (%s, 'COMPLETADA', %s, %s, %s, %s)
-        """
+        # Con COMPROBANTE_BLOCK_SIZE > 1 el número sale del bloque del proceso,
+        # reservado antes de abrir la transacción de la venta
+        numero = comprobantes.preallocated(tipo_comprobante, serie)
         
-        venta_params = (total, tipo_comprobante, numero_comprobante, data['id_cliente'], session['user_id'])
-        venta_result = db.execute_query(venta_query, venta_params)
+        try:
+            with db.transaction() as tx:
+                # Descontar el stock con un solo UPDATE condicionado: cada fila solo
+                # cambia si le alcanza el stock, así dos ventas simultáneas no
+                # pueden dejarlo negativo. Los ids van ordenados para que todas
+                # las ventas bloqueen las filas en el mismo orden (sin deadlocks).
+                stock = decrement_stock(tx, cantidades, ids)
+                
+                # Siguiente número de la serie desde su contador (sin recorrer VENTA)
+                if numero is None:
+                    numero = comprobantes.next(tx, tipo_comprobante, serie)
+                numero_comprobante = f'{serie}-{numero:03d}'
+                
+                # Crear la venta
+                venta_query = """
+                INSERT INTO VENTA (total, estado, tipo_comprobante, numero_comprobante, id_cliente, id_usuario)
+                VALUES (%s, 'COMPLETADA', %s, %s, %s, %s)
+                """
+                venta_params = (total, tipo_comprobante, numero_comprobante, venta['id_cliente'], session['user_id'])
+                id_venta = tx.execute(venta_query, venta_params)['lastrowid']
+                
+                # Insertar todos los detalles en un único INSERT de varias filas
+                detalle_query = """
+                INSERT INTO DETALLE_VENTA (cantidad, precio_unitario, id_venta, id_producto)
+                VALUES (%s, %s, %s, %s)
+                """
+                tx.executemany(detalle_query, [
+                    (detalle['cantidad'], detalle['precio_unitario'], id_venta, detalle['id_producto'])
+                    for detalle in detalles
+                ])
+                
+                # Registrar los movimientos de inventario a partir del stock previo a la venta
+                movimientos = []
+                for detalle in detalles:
+                    stock_anterior = stock[detalle['id_producto']]
+                    stock[detalle['id_producto']] = stock_anterior - detalle['cantidad']
+                    movimientos.append((
+                        detalle['cantidad'], stock_anterior, stock[detalle['id_producto']],
+                        numero_comprobante, detalle['id_producto'], session['user_id']
+                    ))
+                
+                movimiento_query = """
+                INSERT INTO MOVIMIENTO_INVENTARIO 
+                (tipo_movimiento, cantidad, motivo, stock_anterior, stock_nuevo, referencia, id_producto, id_usuario)
+                VALUES ('SALIDA', %s, 'VENTA', %s, %s, %s, %s, %s)
+                """
+                tx.executemany(movimiento_query, movimientos)
         
-        if not venta_result:
-            return jsonify({'error': 'Error al crear la venta'}), 500
+        except InsufficientStock:
+            # La transacción ya se deshizo: no queda ningún descuento parcial
+            return jsonify({'error': f'Stock insuficiente para el producto {short_product(cantidades, ids)}'}), 400
         
-        id_venta = venta_result['lastrowid']
-        
-        # Crear detalles de venta y actualizar stock
-        for detalle in detalles:
-            # Insertar detalle
-            detalle_query = """
-            INSERT INTO DETALLE_VENTA (cantidad, precio_unitario, id_venta, id_producto)
-            VALUES (%s, %s, %s, %s)
-            """
-            db.execute_query(detalle_query, (detalle['cantidad'], detalle['precio_unitario'], id_venta, detalle['id_producto']))
-            
-            # Actualizar stock
-            update_query = """
-            UPDATE PRODUCTO 
-            SET stock_actual = stock_actual - %s 
-            WHERE id_producto = %s
-            """
-            db.execute_query(update_query, (detalle['cantidad'], detalle['id_producto']))
-            
-            # Registrar movimiento de inventario
-            movimiento_query = """
-            INSERT INTO MOVIMIENTO_INVENTARIO 
-            (tipo_movimiento, cantidad, motivo, stock_anterior, stock_nuevo, referencia, id_producto, id_usuario)
-            VALUES ('SALIDA', %s, 'VENTA', 
-                   (SELECT stock_actual + %s FROM PRODUCTO WHERE id_producto = %s),
-                   (SELECT stock_actual FROM PRODUCTO WHERE id_producto = %s),
-                   %s, %s, %s)
-            """
-            db.execute_query(movimiento_query, 
-                           (detalle['cantidad'], detalle['cantidad'], detalle['id_producto'], 
-                            detalle['id_producto'], numero_comprobante, detalle['id_producto'], session['user_id']))
+        # El stock cambió: se avisa a las cachés de productos
+        Producto.notify_changed(ids, columns={'stock_actual'})
         
         return jsonify({
             'success': True, 
@@ -127,3 +403,182 @@ def create_sale():
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+def parse_sale_time(value):
+    """
+    Convierte la fecha ISO de una venta registrada sin conexión.
+    
+    Returns:
+        str: Fecha en formato 'YYYY-MM-DD HH:MM:SS'
+        
+    Raises:
+        ValueError: Si la fecha no es válida
+    """
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S')
+
+@sales_bp.route('/batch', methods=['POST'])
+@login_required
+@idempotent(idempotency)
+def create_sales_batch():
+    """
+    Registra varias ventas en una sola petición, por ejemplo las que los
+    terminales guardaron mientras no tenían conexión.
+    
+    Cada venta se valida por separado: las que fallan se informan y no
+    impiden que se registren las demás. El stock de todos los productos se
+    lee y bloquea con una sola consulta, y las ventas, detalles y movimientos
+    se insertan con un INSERT de varias filas cada uno.
+    
+    Body: {"ventas": [{"id_cliente", "detalles", "tipo_comprobante", "fecha_hora"}, ...]}
+    fecha_hora es opcional (ISO 8601); si falta se usa la hora del servidor.
+    """
+    try:
+        data = request.get_json() or {}
+        ventas = data.get('ventas')
+        if not isinstance(ventas, list) or len(ventas) == 0:
+            return jsonify({'error': 'Se requiere una lista de ventas'}), 400
+        if len(ventas) > Config.SALES_BATCH_MAX:
+            return jsonify({'error': f'Máximo {Config.SALES_BATCH_MAX} ventas por lote'}), 400
+        
+        results = [None] * len(ventas)
+        accepted = []
+        for index, raw in enumerate(ventas):
+            venta, error = validate_sale(raw)
+            if error is None and raw.get('fecha_hora'):
+                try:
+                    venta['fecha_hora'] = parse_sale_time(raw['fecha_hora'])
+                except ValueError:
+                    error = 'La fecha_hora debe estar en formato ISO 8601'
+            if error:
+                results[index] = {'index': index, 'success': False, 'error': error}
+            else:
+                accepted.append((index, venta))
+        
+        # Clientes existentes, con una sola consulta
+        if accepted:
+            client_ids = sorted({venta['id_cliente'] for _, venta in accepted})
+            rows = db.execute_query(
+                f"SELECT id_cliente FROM CLIENTE WHERE id_cliente IN ({', '.join(['%s'] * len(client_ids))})",
+                tuple(client_ids)
+            )
+            clientes = {row['id_cliente'] for row in rows}
+            for index, venta in accepted:
+                if venta['id_cliente'] not in clientes:
+                    results[index] = {'index': index, 'success': False, 'error': 'Cliente no encontrado'}
+            accepted = [(index, venta) for index, venta in accepted if results[index] is None]
+        
+        created = []
+        sold_ids = []
+        if accepted:
+            with db.transaction() as tx:
+                # Stock de todos los productos del lote en una consulta; las filas
+                # quedan bloqueadas en orden de id, como en la venta individual
+                ids = sorted({id_producto for _, venta in accepted for id_producto in venta['cantidades']})
+                placeholders = ', '.join(['%s'] * len(ids))
+                rows = tx.execute(f"""
+                SELECT id_producto, stock_actual FROM PRODUCTO
+                WHERE id_producto IN ({placeholders}) AND estado = 'ACTIVO'
+                ORDER BY id_producto FOR UPDATE
+                """, tuple(ids))
+                disponible = {row['id_producto']: row['stock_actual'] for row in rows}
+                
+                # Aplicar las ventas en orden: una venta sin stock falla sola
+                for index, venta in accepted:
+                    short = next((id_producto for id_producto in sorted(venta['cantidades'])
+                                  if disponible.get(id_producto, 0) < venta['cantidades'][id_producto]), None)
+                    if short is not None:
+                        results[index] = {'index': index, 'success': False,
+                                          'error': f'Stock insuficiente para el producto {short}'}
+                        continue
+                    for id_producto, cantidad in venta['cantidades'].items():
+                        disponible[id_producto] -= cantidad
+                    created.append((index, venta))
+                
+                if created:
+                    # Misma hora local que el DEFAULT de fecha_hora en la venta individual
+                    # (en SQLite CURRENT_TIMESTAMP es UTC; NOW() es la hora local)
+                    ahora = tx.execute("SELECT NOW() AS ahora")[0]['ahora']
+                    
+                    # Un rango de números consecutivos por serie
+                    por_serie = {}
+                    for _, venta in created:
+                        serie = ('F' if venta['tipo_comprobante'] == 'FACTURA' else 'B') + Config.COMPROBANTE_SERIE
+                        por_serie.setdefault((venta['tipo_comprobante'], serie), []).append(venta)
+                    for (tipo_comprobante, serie), grupo in por_serie.items():
+                        numero = comprobantes.next(tx, tipo_comprobante, serie, len(grupo))
+                        for offset, venta in enumerate(grupo):
+                            venta['numero_comprobante'] = f'{serie}-{numero + offset:03d}'
+                    
+                    tx.executemany("""
+                    INSERT INTO VENTA (fecha_hora, total, estado, tipo_comprobante, numero_comprobante, id_cliente, id_usuario)
+                    VALUES (%s, %s, 'COMPLETADA', %s, %s, %s, %s)
+                    """, [
+                        (venta.get('fecha_hora', ahora), venta['total'], venta['tipo_comprobante'],
+                         venta['numero_comprobante'], venta['id_cliente'], session['user_id'])
+                        for _, venta in created
+                    ])
+                    
+                    # IDs asignados, recuperados por el número de comprobante (único)
+                    numeros = [venta['numero_comprobante'] for _, venta in created]
+                    rows = tx.execute(
+                        f"SELECT id_venta, numero_comprobante FROM VENTA WHERE numero_comprobante IN ({', '.join(['%s'] * len(numeros))})",
+                        tuple(numeros)
+                    )
+                    id_por_numero = {row['numero_comprobante']: row['id_venta'] for row in rows}
+                    
+                    tx.executemany("""
+                    INSERT INTO DETALLE_VENTA (cantidad, precio_unitario, id_venta, id_producto)
+                    VALUES (%s, %s, %s, %s)
+                    """, [
+                        (detalle['cantidad'], detalle['precio_unitario'],
+                         id_por_numero[venta['numero_comprobante']], detalle['id_producto'])
+                        for _, venta in created for detalle in venta['detalles']
+                    ])
+                    
+                    # Descontar el total del lote con el mismo UPDATE condicionado de la
+                    # venta individual; las filas están bloqueadas, así que no puede fallar
+                    totales = {}
+                    for _, venta in created:
+                        for id_producto, cantidad in venta['cantidades'].items():
+                            totales[id_producto] = totales.get(id_producto, 0) + cantidad
+                    sold_ids = sorted(totales)
+                    stock = decrement_stock(tx, totales, sold_ids)
+                    
+                    movimientos = []
+                    for _, venta in created:
+                        for detalle in venta['detalles']:
+                            stock_anterior = stock[detalle['id_producto']]
+                            stock[detalle['id_producto']] = stock_anterior - detalle['cantidad']
+                            movimientos.append((
+                                detalle['cantidad'], stock_anterior, stock[detalle['id_producto']],
+                                venta['numero_comprobante'], detalle['id_producto'], session['user_id']
+                            ))
+                    tx.executemany("""
+                    INSERT INTO MOVIMIENTO_INVENTARIO 
+                    (tipo_movimiento, cantidad, motivo, stock_anterior, stock_nuevo, referencia, id_producto, id_usuario)
+                    VALUES ('SALIDA', %s, 'VENTA', %s, %s, %s, %s, %s)
+                    """, movimientos)
+                    
+                    for index, venta in created:
+                        results[index] = {
+                            'index': index,
+                            'success': True,
+                            'id_venta': id_por_numero[venta['numero_comprobante']],
+                            'numero_comprobante': venta['numero_comprobante'],
+                            'total': venta['total']
+                        }
+        
+        if sold_ids:
+            Producto.notify_changed(sold_ids, columns={'stock_actual'})
+        
+        return jsonify({
+            'success': True,
+            'created': len(created),
+            'failed': len(ventas) - len(created),
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
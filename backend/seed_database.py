@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from utils.security import hash_password
 from database.database import db
+from database.models import Producto
 from decimal import Decimal
 
 # Cargar variables de entorno
@@ -479,6 +480,9 @@ def main():
         # Insertar productos
         productos = insert_productos(categorias, proveedores)
         
+        # Copiar en PRODUCTO los nombres de categoría y proveedor
+        Producto.refresh_names()
+        
         # Insertar clientes
         clientes = insert_clientes()
         
@@ -0,0 +1,62 @@
+import itertools
+import os
+import sys
+
+# Las pruebas usan una SQLite en memoria con el esquema, las migraciones y
+# los datos de ejemplo; se configura antes de importar la aplicación
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = ':memory:'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app import app as flask_app
+from database import db
+from database.models import Producto
+from database.schema import SAMPLE_DATA_PATH, load_script
+
+# La base es compartida por todas las pruebas: los datos de ejemplo se cargan
+# una vez, después de las migraciones (sin copiar los nombres a PRODUCTO)
+load_script(db, SAMPLE_DATA_PATH)
+
+ADMIN_SESSION = {'user_id': 1, 'username': 'kenny.admin', 'role': 'ADMIN'}
+
+_product_codes = itertools.count(1)
+
+
+@pytest.fixture
+def app():
+    """Aplicación Flask sobre la base de pruebas."""
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """Cliente con la sesión de un administrador."""
+    test_client = app.test_client()
+    with test_client.session_transaction() as session:
+        session.update(ADMIN_SESSION)
+    return test_client
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    """Cada prueba empieza con la caché de productos vacía."""
+    Producto.cache.clear()
+    yield
+
+
+def stock_of(id_producto):
+    """Stock actual de un producto leído directamente de la base."""
+    return db.execute_query(
+        "SELECT stock_actual FROM PRODUCTO WHERE id_producto = %s", (id_producto,)
+    )[0]['stock_actual']
+
+
+def create_product(stock=1000, precio_venta=10, **extra):
+    """Crea un producto propio de la prueba y devuelve su ID."""
+    data = {
+        'codigo_producto': f'TEST-{next(_product_codes)}', 'nombre_producto': 'Producto de prueba',
+        'precio_compra_ref': 5, 'precio_venta': precio_venta, 'stock_actual': stock,
+        'stock_minimo': 0, 'id_categoria': 1, 'id_proveedor': 1, **extra
+    }
+    return Producto.create(data)['lastrowid']
@@ -0,0 +1,96 @@
+import json
+from database import db
+
+
+def create_products(client, *rows):
+    body = ''.join(json.dumps({
+        'codigo_producto': codigo, 'nombre_producto': codigo, 'precio_compra_ref': compra,
+        'precio_venta': venta, 'id_categoria': 1, 'id_proveedor': 1
+    }) + '\n' for codigo, compra, venta in rows)
+    client.post('/api/products/import', data=body, content_type='application/x-ndjson')
+
+
+def prices(*codigos):
+    rows = db.execute_query(
+        f"SELECT codigo_producto, precio_venta FROM PRODUCTO WHERE codigo_producto IN ({', '.join(['%s'] * len(codigos))})",
+        codigos
+    )
+    return {row['codigo_producto']: float(row['precio_venta']) for row in rows}
+
+
+def test_percent_change_applies_to_every_matched_product(client):
+    create_products(client, ('BULK-1', 5, 10), ('BULK-2', 10, 20))
+
+    response = client.post('/api/products/bulk-update', json={
+        'filter': {'codigos': ['BULK-1', 'BULK-2']},
+        'changes': {'precio_venta': {'percent': 10}}
+    })
+
+    assert response.get_json()['count'] == 2
+    assert prices('BULK-1', 'BULK-2') == {'BULK-1': 11.0, 'BULK-2': 22.0}
+
+
+def test_price_rule_violation_rolls_back_the_whole_update(client):
+    create_products(client, ('BULK-3', 5, 10), ('BULK-4', 9, 10))
+
+    response = client.post('/api/products/bulk-update', json={
+        'filter': {'codigos': ['BULK-3', 'BULK-4']},
+        'changes': {'precio_venta': {'percent': -15}}
+    })
+
+    assert response.status_code == 400
+    assert response.get_json()['codigos'] == ['BULK-4']
+    assert prices('BULK-3', 'BULK-4') == {'BULK-3': 10.0, 'BULK-4': 10.0}
+
+
+def test_codigos_must_be_a_list(client):
+    response = client.post('/api/products/bulk-update', json={
+        'filter': {'codigos': 'HM001'},
+        'changes': {'stock_minimo': {'set': 3}}
+    })
+
+    assert response.status_code == 400
+
+
+def test_zero_percent_matches_without_changing_prices(client):
+    create_products(client, ('BULK-5', 5, 10))
+
+    response = client.post('/api/products/bulk-update', json={
+        'filter': {'codigos': ['BULK-5']},
+        'changes': {'precio_venta': {'percent': 0}}
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()['matched'] == 1
+    assert prices('BULK-5') == {'BULK-5': 10.0}
+
+
+def test_zero_stock_minimo_is_a_valid_set(client):
+    create_products(client, ('BULK-6', 5, 10))
+
+    response = client.post('/api/products/bulk-update', json={
+        'filter': {'codigos': ['BULK-6']},
+        'changes': {'stock_minimo': {'set': 0}}
+    })
+
+    assert response.status_code == 200
+    row = db.execute_query("SELECT stock_minimo FROM PRODUCTO WHERE codigo_producto = 'BULK-6'")[0]
+    assert row['stock_minimo'] == 0
+
+
+def test_non_numeric_and_non_finite_values_are_rejected(client):
+    create_products(client, ('BULK-7', 5, 10))
+
+    for changes in (
+        {'precio_venta': {'percent': 'nan'}},
+        {'precio_venta': {'set': 'inf'}},
+        {'precio_venta': {'percent': True}},
+        {'stock_minimo': {'set': float('inf')}},
+        {'precio_venta': {'set': 0}},
+    ):
+        response = client.post('/api/products/bulk-update', json={
+            'filter': {'codigos': ['BULK-7']}, 'changes': changes
+        })
+        assert response.status_code == 400, changes
+
+    assert prices('BULK-7') == {'BULK-7': 10.0}
@@ -0,0 +1,37 @@
+ORIGIN = 'http://localhost:5173'
+
+
+def preflight(client, header):
+    return client.options('/api/products/1', headers={
+        'Origin': ORIGIN,
+        'Access-Control-Request-Method': 'PUT',
+        'Access-Control-Request-Headers': header
+    })
+
+
+def test_preflight_allows_if_match(client):
+    response = preflight(client, 'If-Match')
+
+    assert 'if-match' in response.headers['Access-Control-Allow-Headers'].lower()
+
+
+def test_etag_is_exposed_to_the_browser(client):
+    response = client.get('/api/products/1', headers={'Origin': ORIGIN})
+
+    assert 'etag' in response.headers['Access-Control-Expose-Headers'].lower()
+
+
+def test_preflight_allows_idempotency_key(client):
+    response = client.options('/api/sales', headers={
+        'Origin': ORIGIN,
+        'Access-Control-Request-Method': 'POST',
+        'Access-Control-Request-Headers': 'Idempotency-Key'
+    })
+
+    assert 'idempotency-key' in response.headers['Access-Control-Allow-Headers'].lower()
+
+
+def test_idempotent_replayed_is_exposed_to_the_browser(client):
+    response = client.get('/api/health', headers={'Origin': ORIGIN})
+
+    assert 'idempotent-replayed' in response.headers['Access-Control-Expose-Headers'].lower()
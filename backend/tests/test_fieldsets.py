@@ -0,0 +1,35 @@
+import pytest
+from database.models import Producto
+from utils.fieldsets import parse_fields, select_list
+
+
+def test_select_list_aliases_only_renamed_fields():
+    assert select_list(['id_producto', 'stock_actual'], Producto.FIELDS) == 'p.id_producto, p.stock_actual'
+    assert select_list(['proveedor'], Producto.FIELDS).endswith(' as proveedor')
+
+
+def test_parse_fields_adds_cursor_columns_and_rejects_unknown():
+    assert parse_fields('precio_venta', Producto.FIELDS, always=('id_producto',)) == ['precio_venta', 'id_producto']
+    with pytest.raises(ValueError):
+        parse_fields('clave_hash', Producto.FIELDS)
+
+
+def test_products_endpoint_returns_only_requested_fields(client):
+    response = client.get('/api/products?fields=precio_venta&limit=2')
+
+    assert response.status_code == 200
+    assert set(response.get_json()['data'][0]) == {'precio_venta', 'id_producto', 'nombre_producto'}
+
+
+def test_empty_or_unknown_fields_are_rejected(client):
+    for fields in ('', ' , ', 'precio_venta,clave_hash'):
+        assert client.get(f'/api/products?fields={fields}').status_code == 400
+        assert client.get(f'/api/sales?fields={fields}').status_code == 400
+
+
+def test_sales_endpoint_returns_only_requested_fields(client):
+    response = client.get('/api/sales?fields=total')
+
+    sales = response.get_json()['sales']
+    assert response.status_code == 200 and sales
+    assert all(set(sale) == {'total', 'id_venta', 'fecha_hora'} for sale in sales)
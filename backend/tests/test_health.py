@@ -0,0 +1,22 @@
+from conftest import ADMIN_SESSION
+
+
+def test_db_health_requires_an_admin_session(app):
+    anonymous = app.test_client()
+    seller = app.test_client()
+    with seller.session_transaction() as session:
+        session.update({**ADMIN_SESSION, 'role': 'VENDEDOR'})
+
+    assert anonymous.get('/api/health/db').status_code == 401
+    assert seller.get('/api/health/db').status_code == 403
+
+
+def test_db_health_reports_pool_stats_to_admins(client):
+    body = client.get('/api/health/db').get_json()
+
+    assert body['status'] == 'ok'
+    assert body['pool']['max_size'] >= 1 and body['pool']['in_use'] >= 0
+
+
+def test_basic_health_stays_public(app):
+    assert app.test_client().get('/api/health').status_code == 200
@@ -0,0 +1,86 @@
+import threading
+import pytest
+from conftest import ADMIN_SESSION, create_product
+from database import db
+from routes.sales import idempotency
+from utils.idempotency import MAX_KEY_LENGTH
+
+
+@pytest.fixture(scope='module')
+def sale():
+    return {'id_cliente': 1, 'detalles': [{'id_producto': create_product(), 'cantidad': 1, 'precio_unitario': 1}]}
+
+
+def sale_count():
+    return db.execute_query("SELECT COUNT(*) as total FROM VENTA")[0]['total']
+
+
+def test_retry_replays_the_first_response(client, sale):
+    before = sale_count()
+
+    first = client.post('/api/sales', json=sale, headers={'Idempotency-Key': 'retry-1'})
+    second = client.post('/api/sales', json=sale, headers={'Idempotency-Key': 'retry-1'})
+
+    assert first.status_code == second.status_code == 200
+    assert second.data == first.data
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert sale_count() == before + 1
+
+
+def test_key_reused_with_another_body_is_rejected(client, sale):
+    client.post('/api/sales', json=sale, headers={'Idempotency-Key': 'retry-2'})
+
+    response = client.post('/api/sales', json={**sale, 'tipo_comprobante': 'BOLETA'},
+                           headers={'Idempotency-Key': 'retry-2'})
+
+    assert response.status_code == 422
+
+
+def test_concurrent_duplicates_create_one_sale(app, sale):
+    before = sale_count()
+    ids = []
+
+    def post():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session.update(ADMIN_SESSION)
+        ids.append(client.post('/api/sales', json=sale, headers={'Idempotency-Key': 'race-1'}).get_json()['id_venta'])
+
+    threads = [threading.Thread(target=post) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(ids) == 8 and len(set(ids)) == 1
+    assert sale_count() == before + 1
+
+
+def test_requests_without_key_are_not_deduplicated(client, sale):
+    before = sale_count()
+
+    client.post('/api/sales', json=sale)
+    client.post('/api/sales', json=sale)
+
+    assert sale_count() == before + 2
+
+
+def test_empty_or_oversized_key_is_rejected(client, sale):
+    before = sale_count()
+
+    for key in ('', 'k' * (MAX_KEY_LENGTH + 1)):
+        response = client.post('/api/sales', json=sale, headers={'Idempotency-Key': key})
+        assert response.status_code == 400
+
+    assert sale_count() == before
+
+
+def test_zero_size_store_executes_every_retry(client, sale, monkeypatch):
+    monkeypatch.setattr(idempotency.cache, 'maxsize', 0)
+    before = sale_count()
+
+    client.post('/api/sales', json=sale, headers={'Idempotency-Key': 'retry-disabled'})
+    second = client.post('/api/sales', json=sale, headers={'Idempotency-Key': 'retry-disabled'})
+
+    assert 'Idempotent-Replayed' not in second.headers
+    assert sale_count() == before + 2
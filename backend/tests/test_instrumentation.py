@@ -0,0 +1,39 @@
+from config import Config
+from database.instrumentation import QueryStats
+
+
+def test_server_timing_reports_query_count_without_sql(client):
+    response = client.get('/api/products/low-stock')
+
+    header = response.headers['Server-Timing']
+    assert header.startswith('db;dur=')
+    assert 'consultas' in header
+    assert 'SELECT' not in header
+
+
+def test_sql_text_is_only_sent_when_enabled(client, monkeypatch):
+    monkeypatch.setattr(Config, 'SERVER_TIMING_SQL', True)
+
+    response = client.get('/api/products/low-stock')
+
+    assert 'db-1;dur=' in response.headers['Server-Timing']
+    assert 'SELECT' in response.headers['Server-Timing']
+
+
+def test_repeated_statements_are_reported_as_n_plus_one():
+    stats = QueryStats()
+    for _ in range(4):
+        stats.record("SELECT * FROM PRODUCTO\n  WHERE id_producto = %s", 1.0)
+    stats.record("SELECT COUNT(*) FROM VENTA", 2.0)
+
+    assert stats.count == 5 and stats.total_ms == 6.0
+    assert stats.repeated(3) == [("SELECT * FROM PRODUCTO WHERE id_producto = %s", 4)]
+    assert stats.slowest[0] == (2.0, "SELECT COUNT(*) FROM VENTA")
+
+
+def test_zero_threshold_disables_n_plus_one_detection():
+    stats = QueryStats()
+    stats.record("SELECT COUNT(*) FROM VENTA", 2.0)
+
+    assert stats.repeated(0) == []
+    assert stats.repeated(1) == [("SELECT COUNT(*) FROM VENTA", 1)]
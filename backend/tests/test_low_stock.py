@@ -0,0 +1,53 @@
+from conftest import create_product
+from database import db
+from database.models import Producto
+
+
+def low_stock_ids():
+    return {product['id_producto'] for product in Producto.get_low_stock()}
+
+
+def test_low_stock_follows_stock_changes():
+    id_producto = create_product(stock=2, stock_minimo=5)
+    assert id_producto in low_stock_ids()
+
+    Producto.update(id_producto, {'stock_actual': 10})
+    assert id_producto not in low_stock_ids()
+
+    db.execute_query("UPDATE PRODUCTO SET stock_actual = 5 WHERE id_producto = %s",
+                     (id_producto,), fetch=False, commit=True)
+    assert id_producto in low_stock_ids()
+
+
+def test_inactive_products_are_not_listed():
+    id_producto = create_product(stock=0, stock_minimo=5)
+
+    Producto.delete(id_producto)
+
+    assert id_producto not in low_stock_ids()
+
+
+def test_low_stock_is_ordered_by_stock_and_limited(client):
+    create_product(stock=0, stock_minimo=5)
+
+    body = client.get('/api/products/low-stock?limit=3').get_json()
+
+    stocks = [product['stock_actual'] for product in body['data']]
+    assert body['count'] == len(stocks) <= 3
+    assert stocks == sorted(stocks)
+
+
+def test_zero_minimum_lists_products_without_stock():
+    empty = create_product(stock=0, stock_minimo=0)
+    stocked = create_product(stock=1, stock_minimo=0)
+
+    assert empty in low_stock_ids()
+    assert stocked not in low_stock_ids()
+
+
+def test_zero_or_negative_limit_returns_the_whole_list(client):
+    create_product(stock=0, stock_minimo=5)
+    everything = client.get('/api/products/low-stock').get_json()['count']
+
+    for limit in (0, -1):
+        assert client.get(f'/api/products/low-stock?limit={limit}').get_json()['count'] == everything
@@ -0,0 +1,71 @@
+import pytest
+from database import db
+from database import migrations
+
+
+def write(directory, filename, script):
+    (directory / filename).write_text(script, encoding='utf-8')
+
+
+def test_project_migrations_are_all_applied():
+    assert migrations.upgrade(db) == []
+    assert {row['estado'] for row in migrations.status(db)} == {'aplicada'}
+
+
+def test_pending_migrations_are_applied_in_order_up_to_target(tmp_path):
+    write(tmp_path, '9002_segunda.sql', "ALTER TABLE PRUEBA_MIGRACION ADD COLUMN nota VARCHAR(20);")
+    write(tmp_path, '9001_primera.sql', "CREATE TABLE PRUEBA_MIGRACION (id INT PRIMARY KEY AUTO_INCREMENT);")
+    write(tmp_path, 'LEAME.txt', "no es una migración")
+
+    applied = migrations.upgrade(db, target=9001, directory=tmp_path)
+    assert [migration.version for migration in applied] == [9001]
+    assert [row['estado'] for row in migrations.status(db, tmp_path)] == ['aplicada', 'pendiente']
+
+    applied = migrations.upgrade(db, directory=tmp_path)
+    assert [migration.version for migration in applied] == [9002]
+    db.execute_query("INSERT INTO PRUEBA_MIGRACION (nota) VALUES ('ok')", fetch=False, commit=True)
+
+
+def test_failed_migration_is_not_recorded(tmp_path):
+    write(tmp_path, '9101_rota.sql', "CREATE TABLE PRUEBA_ROTA (id INT PRIMARY KEY);\nESTO NO ES SQL;")
+
+    with pytest.raises(Exception):
+        migrations.upgrade(db, directory=tmp_path)
+
+    assert [row['estado'] for row in migrations.status(db, tmp_path)] == ['pendiente']
+
+
+def test_edited_migration_is_reported_as_modified(tmp_path):
+    write(tmp_path, '9201_indice.sql', "CREATE INDEX idx_prueba_nombre ON CLIENTE (nombres);")
+    migrations.upgrade(db, directory=tmp_path)
+
+    write(tmp_path, '9201_indice.sql', "CREATE INDEX idx_prueba_nombre ON CLIENTE (apellidos);")
+
+    assert [row['estado'] for row in migrations.status(db, tmp_path)] == ['modificada']
+
+
+def test_repeated_version_is_rejected(tmp_path):
+    write(tmp_path, '9301_a.sql', "")
+    write(tmp_path, '9301_b.sql', "")
+
+    with pytest.raises(ValueError):
+        migrations.discover(tmp_path)
+
+
+def test_existing_column_is_not_added_again(tmp_path):
+    # Bases en producción que ya tenían la columna agregada a mano (migración 0007)
+    write(tmp_path, '9401_columna.sql',
+          "ALTER TABLE CLIENTE ADD COLUMN nota_migracion VARCHAR(20);\n"
+          "ALTER TABLE CLIENTE ADD COLUMN nota_migracion VARCHAR(20);")
+
+    assert [migration.version for migration in migrations.upgrade(db, directory=tmp_path)] == [9401]
+    with db.connection() as connection:
+        assert db.backend.column_exists(connection, 'CLIENTE', 'nota_migracion')
+
+
+def test_startup_check_reports_pending_migrations(tmp_path):
+    migrations.ensure_current(db)
+    write(tmp_path, '9501_pendiente.sql', "CREATE INDEX idx_prueba_pendiente ON CLIENTE (email);")
+
+    with pytest.raises(migrations.SchemaOutdatedError, match='9501_pendiente'):
+        migrations.ensure_current(db, tmp_path)
@@ -0,0 +1,107 @@
+import threading
+import pytest
+from database.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    return ConnectionPool(connect, **kwargs), opened
+
+
+def test_released_connection_is_reused():
+    pool, opened = make_pool(min_size=0, max_size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(opened) == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool, _ = make_pool(min_size=0, max_size=1, timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_waiting_thread_gets_the_released_connection():
+    pool, _ = make_pool(min_size=0, max_size=1, timeout=5)
+    conn = pool.acquire()
+    got = []
+
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    pool.release(conn)
+    waiter.join(5)
+
+    assert got == [conn]
+
+
+def test_concurrent_use_never_exceeds_max_size():
+    pool, opened = make_pool(min_size=0, max_size=3, timeout=5)
+    in_use = set()
+    peak = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            with pool.connection() as conn:
+                with lock:
+                    assert conn not in in_use
+                    in_use.add(conn)
+                    peak.append(len(in_use))
+                with lock:
+                    in_use.discard(conn)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(opened) <= 3
+    assert max(peak) <= 3
+    stats = pool.stats()
+    assert stats['in_use'] == 0 and stats['checkouts'] == 400
+
+
+def test_unhealthy_and_discarded_connections_are_replaced():
+    pool, opened = make_pool(min_size=0, max_size=1, validate=lambda conn: False)
+    first = pool.acquire()
+    pool.release(first)
+
+    second = pool.acquire()
+    assert second is not first and first.closed
+    pool.release(second, discard=True)
+    assert second.closed
+    assert pool.stats()['size'] == 0
+
+
+def test_invalid_sizes_are_rejected():
+    for sizes in ({'min_size': 0, 'max_size': 0}, {'min_size': -1, 'max_size': 2}, {'min_size': 3, 'max_size': 2}):
+        with pytest.raises(ValueError):
+            make_pool(**sizes)
+
+
+def test_zero_min_size_opens_connections_on_demand():
+    pool, opened = make_pool(min_size=0, max_size=2)
+    assert opened == []
+
+    pool.release(pool.acquire())
+    assert len(opened) == 1
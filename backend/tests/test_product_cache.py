@@ -0,0 +1,74 @@
+from conftest import create_product
+from database.cache import TTLCache
+from database.models import Producto
+
+
+def test_update_invalidates_the_cached_product():
+    id_producto = create_product(precio_venta=10)
+    assert Producto.get_detail(id_producto)['precio_venta'] == 10
+
+    Producto.update(id_producto, {'precio_venta': 15})
+
+    assert Producto.get_detail(id_producto)['precio_venta'] == 15
+
+
+def test_sale_invalidates_the_cached_stock(client):
+    id_producto = create_product(stock=10)
+    assert Producto.get_detail(id_producto)['stock_actual'] == 10
+
+    response = client.post('/api/sales', json={
+        'id_cliente': 1,
+        'detalles': [{'id_producto': id_producto, 'cantidad': 4, 'precio_unitario': 10}]
+    })
+
+    assert response.status_code == 200
+    assert Producto.get_detail(id_producto)['stock_actual'] == 6
+
+
+def test_code_lookup_follows_the_invalidated_id_entry():
+    id_producto = create_product(precio_venta=10)
+    codigo = Producto.get_detail(id_producto)['codigo_producto']
+    assert Producto.get_by_codigo(codigo)['precio_venta'] == 10
+
+    Producto.update(id_producto, {'precio_venta': 20})
+
+    assert Producto.get_by_codigo(codigo)['precio_venta'] == 20
+
+
+def test_value_read_before_an_invalidation_is_not_stored():
+    cache = TTLCache(10, 60)
+    generation = cache.generation()
+    cache.delete('producto')
+
+    cache.set('producto', 'valor viejo', generation)
+
+    assert cache.get('producto') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(2, 60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+
+    cache.set('c', 3)
+
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+
+def test_expired_entry_is_not_returned():
+    cache = TTLCache(10, 0)
+    cache.set('a', 1)
+
+    assert cache.get('a') is None
+
+
+def test_zero_size_disables_the_cache():
+    cache = TTLCache(0, 60)
+    loads = []
+    cache.set('a', 1)
+
+    assert cache.get('a') is None
+    assert cache.get_or_load('b', lambda: loads.append('b') or 2) == 2
+    assert cache.get_or_load('b', lambda: loads.append('b') or 2) == 2
+    assert loads == ['b', 'b']
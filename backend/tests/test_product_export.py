@@ -0,0 +1,53 @@
+import csv
+import gzip
+import io
+import json
+from conftest import create_product
+from database.models import Producto
+from routes.products import EXPORT_COLUMNS
+
+
+def test_csv_export_lists_active_products(client):
+    create_product(nombre_producto='Producto "exportado", con coma')
+
+    response = client.get('/api/products/export')
+
+    assert response.status_code == 200
+    assert 'productos.csv' in response.headers['Content-Disposition']
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True).lstrip('﻿'))))
+    assert rows[0] == EXPORT_COLUMNS
+    assert 'Producto "exportado", con coma' in [row[1] for row in rows[1:]]
+
+
+def test_ndjson_export_can_be_gzipped(client):
+    plain = client.get('/api/products/export?format=ndjson').get_data()
+    compressed = client.get('/api/products/export?format=ndjson&gzip=true')
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain
+    first = json.loads(plain.decode('utf-8').splitlines()[0])
+    assert set(first) == set(EXPORT_COLUMNS)
+
+
+def test_unknown_format_is_rejected(client):
+    response = client.get('/api/products/export?format=xlsx')
+
+    assert response.status_code == 400
+
+
+def test_export_without_matching_rows_has_only_the_header(client):
+    response = client.get('/api/products/export?categoria=999999')
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True).lstrip('﻿'))))
+    assert rows == [EXPORT_COLUMNS]
+    assert client.get('/api/products/export?format=ndjson&categoria=999999').get_data() == b''
+
+
+def test_low_stock_export_keeps_zero_quantities(client):
+    codigo = Producto.get_by_id(create_product(stock=0, stock_minimo=0))['codigo_producto']
+
+    response = client.get('/api/products/low-stock/export?format=ndjson')
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    row = next(row for row in rows if row['codigo_producto'] == codigo)
+    assert (row['stock_actual'], row['stock_minimo']) == (0, 0)
@@ -0,0 +1,76 @@
+import json
+from database import db
+
+
+def ndjson(*rows):
+    return '\n'.join(json.dumps(row) for row in rows) + '\n'
+
+
+def product_row(codigo, **extra):
+    return {
+        'codigo_producto': codigo, 'nombre_producto': f'Producto {codigo}',
+        'precio_compra_ref': 2, 'precio_venta': 3, 'id_categoria': 1, 'id_proveedor': 1,
+        **extra
+    }
+
+
+def test_import_creates_valid_rows_and_reports_bad_ones(client):
+    """Las filas inválidas se informan por número de fila y no detienen la importación."""
+    body = ndjson(
+        product_row('IMP-001'),
+        product_row('IMP-002', precio_venta='abc'),
+        product_row('IMP-003', descripcion=5, unidad_medida=10),
+        product_row('IMP-001')
+    )
+
+    response = client.post('/api/products/import', data=body, content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result['total'], result['created'], result['failed']) == (4, 2, 2)
+    assert [error['row'] for error in result['errors']] == [2, 4]
+    row = db.execute_query("SELECT descripcion, unidad_medida FROM PRODUCTO WHERE codigo_producto = 'IMP-003'")[0]
+    assert (row['descripcion'], row['unidad_medida']) == ('5', '10')
+
+
+def test_import_csv_updates_existing_codes(client):
+    client.post('/api/products/import', data=ndjson(product_row('IMP-CSV')),
+                content_type='application/x-ndjson')
+    body = ('codigo_producto,nombre_producto,precio_compra_ref,precio_venta,id_categoria,id_proveedor\n'
+            'IMP-CSV,Renombrado,2,4,1,1\n')
+
+    response = client.post('/api/products/import?on_duplicate=update', data=body, content_type='text/csv')
+
+    assert response.get_json()['updated'] == 1
+    row = db.execute_query("SELECT nombre_producto, precio_venta FROM PRODUCTO WHERE codigo_producto = 'IMP-CSV'")[0]
+    assert (row['nombre_producto'], float(row['precio_venta'])) == ('Renombrado', 4.0)
+
+
+def test_zero_stock_minimo_is_kept_on_create_and_import(client):
+    """Un stock_minimo de 0 explícito no se reemplaza por el valor por defecto."""
+    created = client.post('/api/products', json=product_row('IMP-CERO-1', stock_minimo=0, stock_actual=3))
+    imported = client.post('/api/products/import', data=ndjson(product_row('IMP-CERO-2', stock_minimo=0, stock_actual=3)),
+                           content_type='application/x-ndjson')
+    csv_body = ('codigo_producto,nombre_producto,precio_compra_ref,precio_venta,id_categoria,id_proveedor,stock_actual,stock_minimo\n'
+                'IMP-CERO-3,Cero,2,3,1,1,3,0\n'
+                'IMP-CERO-4,Vacio,2,3,1,1,3,\n')
+    from_csv = client.post('/api/products/import', data=csv_body, content_type='text/csv')
+
+    assert created.status_code == 201
+    assert imported.get_json()['created'] == 1 and from_csv.get_json()['created'] == 2
+    rows = db.execute_query(
+        "SELECT codigo_producto, stock_minimo, bajo_stock FROM PRODUCTO "
+        "WHERE codigo_producto LIKE 'IMP-CERO-%' ORDER BY codigo_producto"
+    )
+    assert [(row['stock_minimo'], row['bajo_stock']) for row in rows] == [(0, 0), (0, 0), (0, 0), (5, 1)]
+
+
+def test_non_finite_and_negative_values_are_rejected(client):
+    for codigo, extra in [('IMP-NAN', {'precio_venta': 'nan'}), ('IMP-INF', {'precio_compra_ref': 'inf'}),
+                          ('IMP-NEG', {'stock_minimo': -1})]:
+        response = client.post('/api/products', json=product_row(codigo, **extra))
+        assert response.status_code == 400, codigo
+
+    result = client.post('/api/products/import', data=ndjson(product_row('IMP-NAN', precio_venta='NaN')),
+                         content_type='application/x-ndjson').get_json()
+    assert (result['created'], result['failed']) == (0, 1)
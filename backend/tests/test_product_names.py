@@ -0,0 +1,51 @@
+from conftest import create_product
+from database import db
+from database.models import Producto
+
+
+def product(client, product_id):
+    return client.get(f'/api/products/{product_id}').get_json()['data']
+
+
+def test_products_inserted_with_sql_show_their_names(client):
+    """Un producto insertado sin pasar por Producto no tiene los nombres copiados."""
+    db.execute_query("""
+        INSERT INTO PRODUCTO (codigo_producto, nombre_producto, precio_compra_ref, precio_venta,
+                              id_categoria, id_proveedor)
+        VALUES ('SQL-001', 'Insertado con SQL', 1, 2, 1, 2)
+    """, fetch=False, commit=True)
+    row = db.execute_query("SELECT id_producto, nombre_categoria FROM PRODUCTO WHERE codigo_producto = 'SQL-001'")[0]
+    assert row['nombre_categoria'] is None
+
+    data = product(client, row['id_producto'])
+    assert data['nombre_categoria'] == 'Herramientas Manuales'
+    assert data['proveedor'] == 'Herramientas del Ecuador'
+
+    export = client.get('/api/products/export?format=ndjson').get_data(as_text=True)
+    assert '"nombre_categoria": "Herramientas Manuales"' in next(line for line in export.splitlines() if 'SQL-001' in line)
+
+
+def test_renaming_a_category_or_provider_updates_its_products(client):
+    product_id = create_product(id_categoria=3, id_proveedor=4)
+
+    db.execute_query("UPDATE CATEGORIA SET nombre_categoria = 'Electricidad' WHERE id_categoria = 3",
+                     fetch=False, commit=True)
+    db.execute_query("UPDATE PROVEEDOR SET nombre_comercial = 'Proveedor Renombrado' WHERE id_proveedor = 4",
+                     fetch=False, commit=True)
+    row = db.execute_query("SELECT nombre_categoria, nombre_proveedor FROM PRODUCTO WHERE id_producto = %s", (product_id,))[0]
+
+    assert (row['nombre_categoria'], row['nombre_proveedor']) == ('Electricidad', 'Proveedor Renombrado')
+    assert product(client, product_id)['nombre_categoria'] == 'Electricidad'
+
+
+def test_moving_a_product_copies_the_new_names():
+    product_id = create_product(id_categoria=1, id_proveedor=1)
+
+    Producto.update(product_id, {'id_categoria': 2, 'id_proveedor': 2})
+
+    row = db.execute_query("SELECT nombre_categoria, nombre_proveedor FROM PRODUCTO WHERE id_producto = %s", (product_id,))[0]
+    names = db.execute_query("""
+        SELECT c.nombre_categoria, pr.nombre_comercial FROM CATEGORIA c, PROVEEDOR pr
+        WHERE c.id_categoria = 2 AND pr.id_proveedor = 2
+    """)[0]
+    assert (row['nombre_categoria'], row['nombre_proveedor']) == (names['nombre_categoria'], names['nombre_comercial'])
@@ -0,0 +1,66 @@
+from config import Config
+from conftest import create_product
+from database import db
+
+
+def test_cursor_pages_cover_every_product_once(client):
+    # Varios productos con el mismo nombre: el id debe desempatar entre páginas
+    for _ in range(5):
+        create_product()
+    expected = [row['id_producto'] for row in db.execute_query(
+        "SELECT id_producto FROM PRODUCTO WHERE estado = 'ACTIVO' ORDER BY nombre_producto, id_producto"
+    )]
+
+    seen = []
+    after = None
+    while True:
+        params = {'limit': 3, 'fields': 'id_producto'}
+        if after:
+            params['after'] = after
+        body = client.get('/api/products', query_string=params).get_json()
+        assert body['count'] <= 3
+        seen.extend(product['id_producto'] for product in body['data'])
+        if not body['has_more']:
+            assert body['next_cursor'] is None
+            break
+        after = body['next_cursor']
+
+    assert seen == expected
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/api/products?after=no-es-un-cursor')
+
+    assert response.status_code == 400
+
+
+def test_without_limit_the_whole_catalog_is_returned(client, monkeypatch):
+    monkeypatch.setattr(Config, 'PAGE_SIZE_DEFAULT', 2)
+    for _ in range(3):
+        create_product()
+    total = db.execute_query("SELECT COUNT(*) as total FROM PRODUCTO WHERE estado = 'ACTIVO'")[0]['total']
+
+    body = client.get('/api/products').get_json()
+
+    assert body['count'] == total > 2
+    assert (body['has_more'], body['next_cursor']) == (False, None)
+
+
+def test_cursor_without_limit_uses_the_default_page_size(client, monkeypatch):
+    monkeypatch.setattr(Config, 'PAGE_SIZE_DEFAULT', 2)
+    for _ in range(4):
+        create_product()
+    first = client.get('/api/products?limit=1').get_json()
+
+    body = client.get('/api/products', query_string={'after': first['next_cursor']}).get_json()
+
+    assert body['count'] == 2 and body['has_more']
+
+
+def test_limit_is_clamped_to_the_allowed_range(client, monkeypatch):
+    monkeypatch.setattr(Config, 'PAGE_SIZE_MAX', 3)
+    for _ in range(4):
+        create_product()
+
+    assert client.get('/api/products?limit=0').get_json()['count'] == 1
+    assert client.get('/api/products?limit=1000').get_json()['count'] == 3
@@ -0,0 +1,73 @@
+from conftest import create_product
+from database import db
+from database.models import Producto
+from database.search import ProductSearch, TrigramIndex
+
+
+def test_search_tolerates_typos_and_accents():
+    index = TrigramIndex({'nombre': 1.0})
+    index.add(1, {'nombre': 'Martillo de uña'})
+    index.add(2, {'nombre': 'Destornillador plano'})
+
+    assert [doc_id for doc_id, _ in index.search('martilo')] == [1]
+    assert [doc_id for doc_id, _ in index.search('UNA')] == [1]
+
+
+def test_prefix_match_ranks_first():
+    index = TrigramIndex({'nombre': 1.0})
+    index.add(1, {'nombre': 'Llave para tubo'})
+    index.add(2, {'nombre': 'Tubo PVC'})
+
+    assert index.search('tubo')[0][0] == 2
+
+
+def test_endpoint_returns_active_matches(client):
+    id_producto = create_product(nombre_producto='Escalera telescópica Qzx')
+
+    response = client.get('/api/products/search', query_string={'q': 'escalera telescopica qzx'})
+
+    assert response.status_code == 200
+    assert response.get_json()['data'][0]['id_producto'] == id_producto
+
+
+def test_index_follows_renames_and_deactivation(client):
+    id_producto = create_product(nombre_producto='Carretilla Wqv')
+    client.get('/api/products/search', query_string={'q': 'carretilla wqv'})
+
+    Producto.update(id_producto, {'nombre_producto': 'Lijadora Wqv'})
+    found = client.get('/api/products/search', query_string={'q': 'lijadora wqv'}).get_json()['data']
+    assert [product['id_producto'] for product in found][:1] == [id_producto]
+
+    Producto.delete(id_producto)
+    found = client.get('/api/products/search', query_string={'q': 'lijadora wqv'}).get_json()['data']
+    assert id_producto not in [product['id_producto'] for product in found]
+
+
+def test_substrings_match_like_the_old_like_search():
+    index = TrigramIndex({'nombre': 3.0, 'descripcion': 1.0})
+    index.add(1, {'nombre': 'Martillo de uña', 'descripcion': ''})
+    index.add(2, {'nombre': 'Pintura', 'descripcion': 'Látex lavable'})
+
+    assert [doc_id for doc_id, _ in index.search('ti')] == [1]
+    assert [doc_id for doc_id, _ in index.search('nt')] == [2]
+    assert [doc_id for doc_id, _ in index.search('tillo')] == [1]
+    assert [doc_id for doc_id, _ in index.search('vab')] == [2]
+    assert [doc_id for doc_id, _ in index.search('m')] == [1]
+
+
+def test_listing_search_keeps_short_partial_queries(client):
+    id_producto = create_product(nombre_producto='Brocha Xq')
+
+    found = client.get('/api/products', query_string={'search': 'xq'}).get_json()['data']
+
+    assert [product['id_producto'] for product in found] == [id_producto]
+
+
+def test_index_sync_reads_changes_through_an_index():
+    with db.connection() as connection:
+        plan = db.backend.explain(
+            connection, ProductSearch.COLUMNS + " WHERE fecha_creacion >= %s OR fecha_actualizacion >= %s",
+            ('2024-01-01 00:00:00', '2024-01-01 00:00:00')
+        )
+
+    assert not [step for step in plan if 'full_scan' in step['issues']]
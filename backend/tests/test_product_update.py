@@ -0,0 +1,78 @@
+import itertools
+import pytest
+
+sequence = itertools.count(1)
+
+
+@pytest.fixture
+def product_id(client):
+    """Producto propio para no alterar los datos de ejemplo que usan otras pruebas."""
+    response = client.post('/api/products', json={
+        'codigo_producto': f'UPD-{next(sequence)}', 'nombre_producto': 'Producto editable',
+        'precio_compra_ref': 5, 'precio_venta': 10, 'id_categoria': 1, 'id_proveedor': 1
+    })
+    return response.get_json()['data']['id_producto']
+
+
+def test_partial_update_changes_only_sent_fields(client, product_id):
+    response = client.put(f'/api/products/{product_id}', json={'precio_venta': '12.5'})
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert float(data['precio_venta']) == 12.5
+    assert float(data['precio_compra_ref']) == 5
+    assert response.headers['ETag'] == f'"{data["version"]}"'
+
+
+def test_stale_if_match_is_rejected(client, product_id):
+    etag = client.get(f'/api/products/{product_id}').headers['ETag']
+    client.put(f'/api/products/{product_id}', json={'stock_minimo': 3}, headers={'If-Match': etag})
+
+    response = client.put(f'/api/products/{product_id}', json={'stock_minimo': 4}, headers={'If-Match': etag})
+
+    assert response.status_code == 409
+    assert response.headers['ETag'] != etag
+    assert client.get(f'/api/products/{product_id}').get_json()['data']['stock_minimo'] == 3
+
+
+@pytest.mark.parametrize('body', [
+    {'precio_venta': 'abc'},
+    {'precio_venta': 0},
+    {'precio_compra_ref': -1},
+    {'stock_minimo': 'x'},
+    {'stock_actual': -2},
+    {'id_categoria': 'uno'},
+    {'precio_venta': 'nan'},
+    {'precio_venta': 'inf'},
+    {'nombre_producto': None},
+    {'nombre_producto': '   '},
+    {'codigo_producto': None},
+])
+def test_invalid_fields_return_400(client, product_id, body):
+    response = client.put(f'/api/products/{product_id}', json=body)
+
+    assert response.status_code == 400
+    assert float(client.get(f'/api/products/{product_id}').get_json()['data']['precio_venta']) == 10
+
+
+def test_price_below_purchase_price_is_rejected(client, product_id):
+    response = client.put(f'/api/products/{product_id}', json={'precio_venta': 4})
+
+    assert response.status_code == 400
+
+
+def test_zero_values_are_accepted(client, product_id):
+    response = client.put(f'/api/products/{product_id}', json={'stock_actual': 0, 'stock_minimo': 0})
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert (data['stock_actual'], data['stock_minimo'], data['bajo_stock']) == (0, 0, 1)
+
+
+def test_optional_text_fields_are_normalized(client, product_id):
+    response = client.put(f'/api/products/{product_id}', json={
+        'nombre_producto': '  Renombrado  ', 'descripcion': None, 'unidad_medida': ''
+    })
+
+    data = response.get_json()['data']
+    assert (data['nombre_producto'], data['descripcion'], data['unidad_medida']) == ('Renombrado', '', 'UNIDAD')
@@ -0,0 +1,40 @@
+import sqlite3
+import pytest
+from database import db
+from database.models import Producto
+from database.query_plans import find_regressions, load_snapshot, snapshot_path
+from query_advisor import advisor_scenarios, collect_plans
+
+
+@pytest.fixture
+def restore_database():
+    """Deshace al terminar las escrituras de la prueba copiando antes la base completa."""
+    snapshot = sqlite3.connect(':memory:')
+    with db.connection() as connection:
+        connection.backup(snapshot)
+    yield
+    with db.connection() as connection:
+        snapshot.backup(connection)
+    snapshot.close()
+    Producto.cache.clear()
+
+
+# Se ejecuta dos veces para comprobar que las escrituras no quedan en la base
+@pytest.mark.parametrize('run', [1, 2])
+def test_no_query_plan_regressions(restore_database, run):
+    """Ninguna sentencia de la API tiene un plan peor que el de query_plans/sqlite.json."""
+    previous = load_snapshot(snapshot_path(db.backend.name))
+    assert previous is not None
+
+    plans = collect_plans(advisor_scenarios(include_writes=True))
+
+    assert plans
+    assert find_regressions(previous, plans) == []
+
+
+def test_regressions_are_detected():
+    """Un problema que el plan guardado no tenía se informa como regresión."""
+    previous = {'SELECT 1': {'issues': [], 'endpoints': ['GET /x']}}
+    current = {'SELECT 1': {'issues': ['PRODUCTO: full_scan'], 'endpoints': ['GET /x']}}
+
+    assert find_regressions(previous, current) == [('SELECT 1', ['PRODUCTO: full_scan'], ['GET /x'])]
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+from database.replicas import ReplicaSet, _is_read_only, stick_to_primary, sticky_primary
+
+
+def replicas(*names, retry_after=30):
+    return ReplicaSet([SimpleNamespace(name=name) for name in names], retry_after=retry_after)
+
+
+def test_only_plain_selects_go_to_replicas():
+    assert _is_read_only("  select * FROM PRODUCTO")
+    assert not _is_read_only("SELECT stock_actual FROM PRODUCTO WHERE id_producto = %s FOR UPDATE")
+    assert not _is_read_only("UPDATE PRODUCTO SET stock_actual = 0")
+
+
+
+def test_without_replicas_every_read_uses_the_primary():
+    replica_set = replicas()
+
+    assert not replica_set
+    assert replica_set.choose() is None
+
+def test_replicas_are_used_in_turns():
+    replica_set = replicas('r1', 'r2')
+
+    assert [replica_set.choose().name for _ in range(4)] == ['r1', 'r2', 'r1', 'r2']
+
+
+def test_failed_replica_leaves_the_rotation():
+    replica_set = replicas('r1', 'r2')
+    replica_set.mark_down(replica_set.pools[0], 'sin conexión')
+
+    assert {replica_set.choose().name for _ in range(4)} == {'r2'}
+
+    replica_set.mark_down(replica_set.pools[1], 'sin conexión')
+    assert replica_set.choose() is None
+
+
+def test_failed_replica_returns_after_the_retry_delay():
+    replica_set = replicas('r1', retry_after=0)
+    replica_set.mark_down(replica_set.pools[0], 'sin conexión')
+
+    assert replica_set.choose().name == 'r1'
+
+
+def test_reads_stick_to_primary_after_a_write(app):
+    with app.test_request_context():
+        assert not sticky_primary()
+        stick_to_primary()
+        assert sticky_primary()
+
+    with app.test_request_context():
+        assert not sticky_primary()
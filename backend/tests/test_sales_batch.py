@@ -0,0 +1,93 @@
+import time
+from datetime import datetime
+from config import Config
+from conftest import create_product, stock_of
+from database import db
+
+
+def line(id_producto, cantidad, precio=10):
+    return {'id_producto': id_producto, 'cantidad': cantidad, 'precio_unitario': precio}
+
+
+def test_batch_reports_each_sale_and_applies_the_valid_ones(client):
+    product_id = create_product(stock=5)
+
+    response = client.post('/api/sales/batch', json={'ventas': [
+        {'id_cliente': 1, 'detalles': [line(product_id, 2)]},
+        {'id_cliente': 999, 'detalles': [line(product_id, 1)]},
+        {'id_cliente': 1, 'detalles': [line(product_id, 4)]},
+        {'id_cliente': 2, 'tipo_comprobante': 'BOLETA', 'fecha_hora': '2024-03-01T08:00:00',
+         'detalles': [line(product_id, 3)]},
+        {'id_cliente': 1, 'fecha_hora': 'ayer', 'detalles': [line(product_id, 1)]}
+    ]})
+
+    assert response.status_code == 200
+    result = response.get_json()
+    assert (result['created'], result['failed']) == (2, 3)
+    assert [item['success'] for item in result['results']] == [True, False, False, True, False]
+    assert result['results'][2]['error'] == f'Stock insuficiente para el producto {product_id}'
+    assert stock_of(product_id) == 0
+
+    boleta = result['results'][3]
+    row = db.execute_query("SELECT fecha_hora, numero_comprobante FROM VENTA WHERE id_venta = %s", (boleta['id_venta'],))[0]
+    assert row['fecha_hora'] == '2024-03-01 08:00:00'
+    assert row['numero_comprobante'] == boleta['numero_comprobante']
+    assert boleta['numero_comprobante'].startswith('B')
+    movements = db.execute_query(
+        "SELECT stock_anterior, stock_nuevo FROM MOVIMIENTO_INVENTARIO WHERE id_producto = %s ORDER BY id_movimiento",
+        (product_id,)
+    )
+    assert [(row['stock_anterior'], row['stock_nuevo']) for row in movements] == [(5, 3), (3, 0)]
+
+
+def test_batch_numbers_are_consecutive_per_series(client):
+    product_id = create_product(stock=10)
+
+    result = client.post('/api/sales/batch', json={'ventas': [
+        {'id_cliente': 1, 'detalles': [line(product_id, 1)]} for _ in range(4)
+    ]}).get_json()
+
+    numbers = [int(item['numero_comprobante'].split('-')[1]) for item in result['results']]
+    assert numbers == list(range(numbers[0], numbers[0] + 4))
+
+
+def test_batch_accepts_string_ids(client):
+    product_id = create_product(stock=3)
+
+    result = client.post('/api/sales/batch', json={'ventas': [
+        {'id_cliente': '1', 'detalles': [line(str(product_id), 2)]}
+    ]}).get_json()
+
+    assert result['results'][0]['success'] is True
+    assert stock_of(product_id) == 1
+
+
+def test_batch_size_is_validated(client, monkeypatch):
+    monkeypatch.setattr(Config, 'SALES_BATCH_MAX', 2)
+    venta = {'id_cliente': 1, 'detalles': [line(1, 1)]}
+
+    assert client.post('/api/sales/batch', json={'ventas': [venta] * 3}).status_code == 400
+    assert client.post('/api/sales/batch', json={'ventas': []}).status_code == 400
+    assert client.post('/api/sales/batch', json={'ventas': 'x'}).status_code == 400
+
+
+def test_batch_sales_use_the_same_clock_as_single_sales(client, monkeypatch):
+    # Fuera de UTC la hora de la base y la local difieren en horas
+    monkeypatch.setenv('TZ', 'America/Lima')
+    time.tzset()
+    try:
+        product_id = create_product(stock=5)
+        single = client.post('/api/sales', json={'id_cliente': 1, 'detalles': [line(product_id, 1)]}).get_json()
+        batch = client.post('/api/sales/batch', json={'ventas': [
+            {'id_cliente': 1, 'detalles': [line(product_id, 1)]}
+        ]}).get_json()
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    rows = db.execute_query(
+        "SELECT fecha_hora FROM VENTA WHERE id_venta IN (%s, %s) ORDER BY id_venta",
+        (single['id_venta'], batch['results'][0]['id_venta'])
+    )
+    first, second = (datetime.fromisoformat(row['fecha_hora']) for row in rows)
+    assert abs((second - first).total_seconds()) < 60
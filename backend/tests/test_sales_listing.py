@@ -0,0 +1,66 @@
+import itertools
+from config import Config
+from database import db
+
+_numbers = itertools.count(1)
+
+
+def insert_sale(fecha_hora, tipo='BOLETA', id_cliente=1):
+    db.execute_query("""
+        INSERT INTO VENTA (fecha_hora, total, estado, tipo_comprobante, numero_comprobante, id_cliente, id_usuario)
+        VALUES (%s, 1, 'COMPLETADA', %s, %s, %s, 1)
+    """, (fecha_hora, tipo, f'L700-{next(_numbers):06d}', id_cliente), fetch=False, commit=True)
+
+
+def test_cursor_pages_cover_every_sale_once(client):
+    # Dos ventas en el mismo segundo: el id debe desempatar entre páginas
+    insert_sale('2002-05-10 09:00:00')
+    insert_sale('2002-05-10 09:00:00')
+    expected = [row['id_venta'] for row in db.execute_query(
+        "SELECT id_venta FROM VENTA ORDER BY fecha_hora DESC, id_venta DESC"
+    )]
+
+    seen = []
+    after = None
+    while True:
+        params = {'limit': 2, 'fields': 'id_venta'}
+        if after:
+            params['after'] = after
+        body = client.get('/api/sales', query_string=params).get_json()
+        seen.extend(sale['id_venta'] for sale in body['sales'])
+        if not body['has_more']:
+            break
+        after = body['next_cursor']
+
+    assert seen == expected
+
+
+def test_date_range_includes_the_whole_last_day(client):
+    insert_sale('2001-03-01 00:00:00')
+    insert_sale('2001-03-01 23:59:59')
+    insert_sale('2001-03-02 00:00:00')
+    insert_sale('2001-02-28 23:59:59', tipo='FACTURA')
+
+    body = client.get('/api/sales', query_string={'from': '2001-03-01', 'to': '2001-03-01'}).get_json()
+    assert body['count'] == 2
+
+    body = client.get('/api/sales', query_string={
+        'from': '2001-02-28', 'to': '2001-03-02', 'tipo_comprobante': 'FACTURA'
+    }).get_json()
+    assert body['count'] == 1
+
+
+def test_invalid_filters_are_rejected(client):
+    assert client.get('/api/sales?from=ayer').status_code == 400
+    assert client.get('/api/sales?tipo_comprobante=TICKET').status_code == 400
+    assert client.get('/api/sales?after=xyz').status_code == 400
+
+
+def test_default_page_size_points_to_the_next_page(client, monkeypatch):
+    monkeypatch.setattr(Config, 'PAGE_SIZE_DEFAULT', 2)
+    for _ in range(3):
+        insert_sale('2003-01-01 10:00:00')
+
+    body = client.get('/api/sales').get_json()
+
+    assert body['count'] == 2 and body['has_more'] and body['next_cursor']
@@ -0,0 +1,89 @@
+import threading
+from conftest import ADMIN_SESSION, create_product, stock_of
+from database import db
+
+
+def sale(*lines, id_cliente=1):
+    return {
+        'id_cliente': id_cliente,
+        'detalles': [{'id_producto': id_producto, 'cantidad': cantidad, 'precio_unitario': 10}
+                     for id_producto, cantidad in lines]
+    }
+
+
+def test_sale_decrements_stock_and_records_movements(client):
+    first, second = create_product(stock=10), create_product(stock=4)
+
+    response = client.post('/api/sales', json=sale((first, 3), (second, 4)))
+
+    assert response.status_code == 200
+    assert (stock_of(first), stock_of(second)) == (7, 0)
+    movements = db.execute_query(
+        "SELECT id_producto, stock_anterior, stock_nuevo FROM MOVIMIENTO_INVENTARIO WHERE referencia = %s ORDER BY id_producto",
+        (response.get_json()['numero_comprobante'],)
+    )
+    assert [(row['stock_anterior'], row['stock_nuevo']) for row in movements] == [(10, 7), (4, 0)]
+
+
+def test_insufficient_stock_leaves_nothing_behind(client):
+    enough, short = create_product(stock=10), create_product(stock=1)
+    sales_before = db.execute_query("SELECT COUNT(*) as total FROM VENTA")[0]['total']
+
+    response = client.post('/api/sales', json=sale((enough, 2), (short, 2)))
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == f'Stock insuficiente para el producto {short}'
+    assert (stock_of(enough), stock_of(short)) == (10, 1)
+    assert db.execute_query("SELECT COUNT(*) as total FROM VENTA")[0]['total'] == sales_before
+
+
+def test_string_ids_are_accepted(client):
+    first, second = create_product(stock=5), create_product(stock=5)
+
+    response = client.post('/api/sales', json=sale((str(first), 1), (second, 2), id_cliente='1'))
+
+    assert response.status_code == 200
+    assert (stock_of(first), stock_of(second)) == (4, 3)
+
+
+def test_invalid_ids_return_400(client):
+    product_id = create_product(stock=5)
+
+    for body in (sale(('uno', 1)), sale((product_id, 1), id_cliente='x'), sale((1.5, 1))):
+        assert client.post('/api/sales', json=body).status_code == 400
+    assert stock_of(product_id) == 5
+
+
+def test_boolean_and_non_finite_amounts_return_400(client):
+    product_id = create_product(stock=5)
+    line = {'id_producto': product_id, 'cantidad': 1, 'precio_unitario': 10}
+    invalid = [{'cantidad': True}, {'precio_unitario': True}, {'cantidad': 0}, {'cantidad': 1.5}]
+
+    for change in invalid:
+        body = {'id_cliente': 1, 'detalles': [{**line, **change}]}
+        assert client.post('/api/sales', json=body).status_code == 400, change
+    for literal in ('NaN', 'Infinity'):
+        body = f'{{"id_cliente": 1, "detalles": [{{"id_producto": {product_id}, "cantidad": 1, "precio_unitario": {literal}}}]}}'
+        assert client.post('/api/sales', data=body, content_type='application/json').status_code == 400, literal
+    assert stock_of(product_id) == 5
+
+
+def test_concurrent_sales_never_oversell(app):
+    product_id = create_product(stock=5)
+    statuses = []
+
+    def buy():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session.update(ADMIN_SESSION)
+        statuses.append(client.post('/api/sales', json=sale((product_id, 1))).status_code)
+
+    threads = [threading.Thread(target=buy) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses.count(200) == 5
+    assert statuses.count(400) == 7
+    assert stock_of(product_id) == 0
@@ -0,0 +1,104 @@
+import threading
+import pytest
+from conftest import ADMIN_SESSION, create_product
+from database import db
+from database.sequences import DocumentNumbers
+
+
+def counter(tipo, serie):
+    rows = db.execute_query(
+        "SELECT ultimo_numero FROM SECUENCIA_COMPROBANTE WHERE tipo_comprobante = %s AND serie = %s",
+        (tipo, serie)
+    )
+    return rows[0]['ultimo_numero'] if rows else None
+
+
+def test_new_series_continues_after_existing_sales():
+    """El contador de una serie nueva empieza después del último número en VENTA."""
+    db.execute_query("""
+        INSERT INTO VENTA (total, estado, tipo_comprobante, numero_comprobante, id_cliente, id_usuario)
+        VALUES (1, 'COMPLETADA', 'FACTURA', 'F900-041', 1, 1)
+    """, fetch=False, commit=True)
+    numbers = DocumentNumbers(db)
+
+    with db.transaction() as tx:
+        assert numbers.next(tx, 'FACTURA', 'F900') == 42
+        assert numbers.next(tx, 'FACTURA', 'F900', count=3) == 43
+    assert counter('FACTURA', 'F900') == 45
+
+
+def test_creating_an_existing_counter_does_not_reset_it():
+    numbers = DocumentNumbers(db)
+    with db.transaction() as tx:
+        numbers.next(tx, 'BOLETA', 'B901', count=7)
+
+    with db.transaction() as tx:
+        numbers._create(tx, 'BOLETA', 'B901')
+
+    assert counter('BOLETA', 'B901') == 7
+
+
+def test_database_errors_while_creating_a_counter_propagate():
+    """Solo el duplicado se ignora: cualquier otro error deshace la transacción."""
+    class FailingTransaction:
+        def execute(self, query, params=None, fetch=None):
+            if query.lstrip().startswith('INSERT'):
+                raise db.backend.Error('deadlock')
+            return [{'ultimo': 0}]
+
+    with pytest.raises(db.backend.Error):
+        DocumentNumbers(db)._create(FailingTransaction(), 'FACTURA', 'F902')
+
+
+def test_rolled_back_sale_returns_its_number():
+    numbers = DocumentNumbers(db)
+    with db.transaction() as tx:
+        numbers.next(tx, 'FACTURA', 'F903')
+
+    with pytest.raises(RuntimeError):
+        with db.transaction() as tx:
+            numbers.next(tx, 'FACTURA', 'F903')
+            raise RuntimeError('venta fallida')
+
+    assert counter('FACTURA', 'F903') == 1
+
+
+def test_block_mode_hands_out_unique_numbers():
+    numbers = DocumentNumbers(db, block_size=5)
+
+    taken = [numbers.preallocated('BOLETA', 'B904') for _ in range(12)]
+
+    assert taken == list(range(1, 13))
+    assert counter('BOLETA', 'B904') == 15
+
+
+
+def test_zero_block_size_numbers_inside_the_sale_transaction():
+    numbers = DocumentNumbers(db, block_size=0)
+
+    assert numbers.preallocated('BOLETA', 'B905') is None
+    with db.transaction() as tx:
+        assert numbers.next(tx, 'BOLETA', 'B905') == 1
+    assert counter('BOLETA', 'B905') == 1
+
+def test_concurrent_sales_get_distinct_consecutive_numbers(app):
+    product_id = create_product(stock=100)
+    numbers = []
+
+    def sell():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session.update(ADMIN_SESSION)
+        response = client.post('/api/sales', json={
+            'id_cliente': 1, 'tipo_comprobante': 'BOLETA',
+            'detalles': [{'id_producto': product_id, 'cantidad': 1, 'precio_unitario': 1}]
+        })
+        numbers.append(int(response.get_json()['numero_comprobante'].split('-')[1]))
+
+    threads = [threading.Thread(target=sell) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(numbers) == list(range(min(numbers), min(numbers) + 10))
@@ -0,0 +1,62 @@
+import sqlite3
+import pytest
+from database.backends import create_backend
+from database.backends.base import split_script
+from database.backends.sqlite import _translate, convert_ddl
+
+
+def test_split_script_respects_quotes_and_comments():
+    script = """
+        -- comentario; con punto y coma
+        INSERT INTO CLIENTE (nombres) VALUES ('a;b');
+        SELECT 1
+    """
+
+    assert split_script(script) == ["INSERT INTO CLIENTE (nombres) VALUES ('a;b')", "SELECT 1"]
+
+
+def test_translate_rewrites_placeholders_outside_strings():
+    query = "SELECT * FROM PRODUCTO WHERE nombre LIKE '%s%%' AND id = %s AND codigo LIKE %s FOR UPDATE"
+
+    assert _translate(query) == "SELECT * FROM PRODUCTO WHERE nombre LIKE '%s%%' AND id = ? AND codigo LIKE ?"
+
+
+def test_create_table_is_converted_with_separate_indexes():
+    statements = convert_ddl("""CREATE TABLE IF NOT EXISTS PRUEBA (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        estado ENUM('A', 'B') DEFAULT 'A',
+        codigo VARCHAR(20),
+        UNIQUE KEY uk_codigo (codigo),
+        INDEX idx_estado (estado)
+    ) ENGINE=InnoDB""")
+
+    connection = sqlite3.connect(':memory:')
+    for statement in statements:
+        connection.execute(statement)
+    assert 'INTEGER PRIMARY KEY AUTOINCREMENT' in statements[0]
+    assert statements[1].startswith('CREATE INDEX IF NOT EXISTS idx_estado')
+    with pytest.raises(sqlite3.IntegrityError):
+        connection.execute("INSERT INTO PRUEBA (estado) VALUES ('C')")
+
+
+def test_mysql_functions_are_available():
+    backend = create_backend('sqlite', {'path': ':memory:', 'name': 'prueba_funciones'})
+    connection = backend.connect()
+
+    row = connection.execute("SELECT CONCAT('F', LPAD(7, 3, '0')) as numero").fetchone()
+
+    assert row == {'numero': 'F007'}
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend('oracle', {})
+
+
+def test_memory_database_survives_closing_every_connection():
+    backend = create_backend('sqlite', {'path': ':memory:', 'name': 'prueba_descarte'})
+    connection = backend.connect()
+    connection.execute("CREATE TABLE PRUEBA (id INTEGER)")
+    connection.close()
+
+    assert backend.connect().execute("SELECT COUNT(*) as total FROM PRUEBA").fetchone() == {'total': 0}
@@ -0,0 +1,60 @@
+from database import db
+from database.statement_cache import StatementCacheRegistry
+
+
+class FakeCursor:
+    def __init__(self, sql):
+        self.sql = sql
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_statement_is_prepared_once_per_connection():
+    registry = StatementCacheRegistry(capacity=4)
+    cache = registry.for_connection(object())
+    prepared = []
+
+    def prepare():
+        prepared.append(FakeCursor('SELECT 1'))
+        return prepared[-1]
+
+    first = cache.get('SELECT 1', prepare)
+    assert cache.get('SELECT 1', prepare) is first
+    assert len(prepared) == 1
+    assert registry.stats()['hits'] == 1 and registry.stats()['misses'] == 1
+
+
+def test_least_recently_used_statement_is_closed():
+    registry = StatementCacheRegistry(capacity=2)
+    cache = registry.for_connection(object())
+    a = cache.get('a', lambda: FakeCursor('a'))
+    b = cache.get('b', lambda: FakeCursor('b'))
+    cache.get('a', lambda: FakeCursor('a'))
+
+    cache.get('c', lambda: FakeCursor('c'))
+
+    assert b.closed and not a.closed
+    assert len(cache) == 2 and registry.stats()['evictions'] == 1
+
+
+def test_each_connection_has_its_own_cache():
+    registry = StatementCacheRegistry(capacity=2)
+    first, second = object(), object()
+
+    assert registry.for_connection(first) is registry.for_connection(first)
+    assert registry.for_connection(first) is not registry.for_connection(second)
+
+    registry.forget(first)
+    assert registry.stats()['connections'] == 1
+
+
+def test_zero_capacity_runs_statements_without_the_cache(monkeypatch):
+    monkeypatch.setattr(db.statement_caches, 'capacity', 0)
+    before = db.statement_cache_stats()
+
+    db.execute_query("UPDATE PRODUCTO SET stock_minimo = stock_minimo WHERE id_producto = %s", (1,), fetch=False)
+
+    after = db.statement_cache_stats()
+    assert (after['hits'], after['misses']) == (before['hits'], before['misses'])
@@ -0,0 +1,32 @@
+from database import db
+
+
+def test_execute_stream_returns_every_row_in_chunks():
+    expected = db.execute_query("SELECT id_producto FROM PRODUCTO ORDER BY id_producto")
+
+    chunks = list(db.execute_stream("SELECT id_producto FROM PRODUCTO ORDER BY id_producto", chunk_size=2))
+
+    assert all(0 < len(chunk) <= 2 for chunk in chunks)
+    assert [row for chunk in chunks for row in chunk] == expected
+
+
+def test_single_connection_pool_is_freed_before_the_first_chunk():
+    rows = db.iter_query("SELECT id_producto FROM PRODUCTO", chunk_size=1)
+    next(rows)
+
+    # Con SQLite en memoria el pool tiene una conexión: otra petición puede usarla
+    assert db.pool_stats()['in_use'] == 0
+    assert db.execute_query("SELECT COUNT(*) as total FROM PRODUCTO")[0]['total'] > 0
+    rows.close()
+
+
+def test_abandoned_stream_gives_its_connection_back(monkeypatch):
+    # Con más de una conexión las filas se leen a medida que se piden
+    monkeypatch.setattr(db.pool, 'max_size', 2)
+    rows = db.iter_query("SELECT id_producto FROM PRODUCTO", chunk_size=1)
+    next(rows)
+    assert db.pool_stats()['in_use'] == 1
+
+    rows.close()
+
+    assert db.pool_stats()['in_use'] == 0
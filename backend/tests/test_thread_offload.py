@@ -0,0 +1,37 @@
+import asyncio
+from types import SimpleNamespace
+from config import Config
+from database import db_offload
+from database.thread_offload import ThreadOffloadDatabase
+
+
+def fake_database(max_size):
+    return SimpleNamespace(pool=SimpleNamespace(max_size=max_size))
+
+
+def test_executor_leaves_pool_connections_free(monkeypatch):
+    """El executor nunca tiene tantos hilos como conexiones el pool."""
+    monkeypatch.setattr(Config, 'DB_OFFLOAD_WORKERS', 50)
+    assert ThreadOffloadDatabase(fake_database(10)).max_workers() == 9
+
+    monkeypatch.setattr(Config, 'DB_OFFLOAD_WORKERS', 4)
+    assert ThreadOffloadDatabase(fake_database(10)).max_workers() == 4
+    assert ThreadOffloadDatabase(fake_database(1)).max_workers() == 1
+
+
+def test_gather_returns_results_in_query_order():
+    """gather() devuelve los resultados en el orden de las consultas."""
+    results = asyncio.run(db_offload.gather(
+        "SELECT 1 as valor",
+        ("SELECT %s as valor", (2,)),
+        "SELECT 3 as valor"
+    ))
+
+    assert [rows[0]['valor'] for rows in results] == [1, 2, 3]
+
+
+def test_dashboard_stats(client):
+    response = client.get('/api/dashboard/stats')
+
+    assert response.status_code == 200
+    assert response.get_json()['stats']['total_products'] > 0
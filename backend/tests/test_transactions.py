@@ -0,0 +1,59 @@
+import pytest
+from conftest import create_product, stock_of
+from database import db
+
+
+def test_transaction_commits_every_statement():
+    id_producto = create_product(stock=10)
+
+    with db.transaction() as tx:
+        tx.execute("UPDATE PRODUCTO SET stock_actual = stock_actual - 3 WHERE id_producto = %s", (id_producto,))
+        tx.execute("UPDATE PRODUCTO SET stock_actual = stock_actual - 2 WHERE id_producto = %s", (id_producto,))
+
+    assert stock_of(id_producto) == 5
+
+
+def test_transaction_rolls_back_when_the_block_raises():
+    id_producto = create_product(stock=10)
+
+    with pytest.raises(RuntimeError):
+        with db.transaction() as tx:
+            tx.execute("UPDATE PRODUCTO SET stock_actual = 0 WHERE id_producto = %s", (id_producto,))
+            raise RuntimeError('falla a mitad de la transacción')
+
+    assert stock_of(id_producto) == 10
+
+
+def test_transaction_sees_its_own_writes():
+    id_producto = create_product(stock=10)
+
+    with db.transaction() as tx:
+        tx.execute("UPDATE PRODUCTO SET stock_actual = 4 WHERE id_producto = %s", (id_producto,))
+        rows = tx.execute("SELECT stock_actual FROM PRODUCTO WHERE id_producto = %s", (id_producto,))
+
+    assert rows[0]['stock_actual'] == 4
+
+
+def test_executemany_inserts_every_row():
+    ids = [create_product() for _ in range(3)]
+
+    with db.transaction() as tx:
+        result = tx.executemany(
+            "INSERT INTO MOVIMIENTO_INVENTARIO (tipo_movimiento, cantidad, stock_anterior, stock_nuevo, id_producto, id_usuario) "
+            "VALUES ('AJUSTE', %s, %s, %s, %s, 1)",
+            [(1, 1000, 999, id_producto) for id_producto in ids]
+        )
+
+    assert result['affected_rows'] == 3
+    placeholders = ', '.join(['%s'] * len(ids))
+    rows = db.execute_query(
+        f"SELECT id_producto FROM MOVIMIENTO_INVENTARIO WHERE id_producto IN ({placeholders})", tuple(ids)
+    )
+    assert sorted(row['id_producto'] for row in rows) == sorted(ids)
+
+
+def test_executemany_without_rows_does_nothing():
+    with db.transaction() as tx:
+        result = tx.executemany("DELETE FROM MOVIMIENTO_INVENTARIO WHERE id_producto = %s", [])
+
+    assert result == {'affected_rows': 0}
@@ -1,5 +1,5 @@
 from functools import wraps
-from flask import jsonify, session
+from flask import current_app, jsonify, session
 
 def login_required(f):
     """
@@ -9,7 +9,8 @@ def login_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
             return jsonify({'error': 'No autorizado'}), 401
-        return f(*args, **kwargs)
+        # ensure_sync permite decorar también vistas async
+        return current_app.ensure_sync(f)(*args, **kwargs)
     return decorated_function
 
 def roles_required(*roles):
@@ -29,6 +30,6 @@ def roles_required(*roles):
             if user_role not in roles:
                 return jsonify({'error': 'Permiso denegado'}), 403
                 
-            return f(*args, **kwargs)
+            return current_app.ensure_sync(f)(*args, **kwargs)
         return decorated_function
     return decorator
@@ -0,0 +1,49 @@
+def parse_fields(requested, allowed, always=()):
+    """
+    Convierte el parámetro `fields` (nombres separados por comas) en la lista
+    de campos que debe devolver un endpoint.
+
+    Args:
+        requested (str): Valor recibido, o None si no se envió
+        allowed (dict): Campos permitidos del recurso: {nombre: expresión SQL}
+        always (tuple, optional): Campos que se agregan siempre (por ejemplo,
+            los que necesita el cursor de paginación)
+
+    Returns:
+        list: Campos pedidos en orden, o None si no se envió `fields`
+
+    Raises:
+        ValueError: Si se pide un campo que no está en la lista permitida
+    """
+    if requested is None:
+        return None
+
+    fields = []
+    for name in requested.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in allowed:
+            raise ValueError(f'Campo no permitido en fields: {name}')
+        fields.append(name)
+    if not fields:
+        raise ValueError('El parámetro fields no puede estar vacío')
+
+    fields.extend(name for name in always if name not in fields)
+    return fields
+
+def select_list(fields, allowed):
+    """
+    Arma la lista de columnas de un SELECT para los campos indicados.
+
+        select_list(['id_producto', 'stock_actual', 'version'], Producto.FIELDS)
+        ->  'p.id_producto, p.stock_actual, p.version'
+
+    Las expresiones cuyo nombre no coincide con el campo llevan alias, por
+    ejemplo 'proveedor' -> 'COALESCE(p.nombre_proveedor, ...) as proveedor'.
+    """
+    columns = []
+    for name in fields:
+        expression = allowed[name]
+        columns.append(expression if expression.split('.')[-1] == name else f'{expression} as {name}')
+    return ', '.join(columns)
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, jsonify, request, session
+from database.cache import TTLCache
+
+# Longitud máxima aceptada para la cabecera Idempotency-Key
+MAX_KEY_LENGTH = 255
+
+class IdempotencyStore:
+    """
+    Respuestas ya enviadas por clave de idempotencia, con vencimiento y desalojo LRU.
+
+    Además de la caché guarda un candado por clave en uso, así dos peticiones
+    simultáneas con la misma clave no ejecutan la operación dos veces: la
+    segunda espera a la primera y repite su respuesta.
+
+    Las respuestas se guardan en memoria del proceso; con varios procesos
+    una repetición que llega a otro proceso se vuelve a ejecutar.
+
+    Args:
+        maxsize (int): Número máximo de respuestas guardadas (0 desactiva)
+        ttl (float): Segundos durante los que se repite una respuesta
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.cache = TTLCache(maxsize, ttl, name='idempotencia')
+        self._locks = {}  # clave -> [candado, peticiones que lo usan]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        """Bloquea la clave mientras se procesa la petición que la trae."""
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def get(self, key):
+        """Devuelve la respuesta guardada para `key`, o None."""
+        return self.cache.get(key)
+
+    def set(self, key, response):
+        """Guarda la respuesta enviada para `key`."""
+        self.cache.set(key, response)
+
+    def stats(self):
+        """Uso de la caché y claves que se están procesando."""
+        with self._lock:
+            in_flight = len(self._locks)
+        return {**self.cache.stats(), 'in_flight': in_flight}
+
+def idempotent(store):
+    """
+    Decorador que hace repetible una vista POST con la cabecera Idempotency-Key.
+
+    La primera respuesta para una clave se guarda y las peticiones siguientes
+    con la misma clave la reciben sin volver a ejecutar la vista (con la
+    cabecera Idempotent-Replayed). Las claves son por usuario y ruta. Si la
+    clave se repite con otro cuerpo se responde 422, y las respuestas 5xx no
+    se guardan para que el cliente pueda reintentar. Sin la cabecera la vista
+    funciona como siempre.
+
+    Args:
+        store (IdempotencyStore): Donde se guardan las respuestas
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = request.headers.get('Idempotency-Key')
+            if key is None:
+                return current_app.ensure_sync(f)(*args, **kwargs)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return jsonify({'error': f'Idempotency-Key debe tener entre 1 y {MAX_KEY_LENGTH} caracteres'}), 400
+
+            scoped_key = (session.get('user_id'), request.path, key)
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+            with store.hold(scoped_key):
+                # Si otra petición con la misma clave terminó mientras se esperaba,
+                # su respuesta ya está guardada
+                saved = store.get(scoped_key)
+                if saved is None:
+                    response = current_app.make_response(current_app.ensure_sync(f)(*args, **kwargs))
+                    if response.status_code < 500:
+                        store.set(scoped_key, {
+                            'fingerprint': fingerprint,
+                            'status': response.status_code,
+                            'body': response.get_data(),
+                            'mimetype': response.mimetype
+                        })
+                    return response
+
+            if saved['fingerprint'] != fingerprint:
+                return jsonify({'error': 'Idempotency-Key ya se usó con otro contenido'}), 422
+            response = current_app.response_class(saved['body'], status=saved['status'], mimetype=saved['mimetype'])
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        return decorated_function
+    return decorator
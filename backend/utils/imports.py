@@ -0,0 +1,76 @@
+import codecs
+import csv
+import json
+
+# Tipos de contenido aceptados para cada formato de importación
+FORMATS_BY_MIMETYPE = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+}
+
+def iter_lines(stream, chunk_size=65536):
+    """
+    Lee un flujo binario UTF-8 por bloques y devuelve sus líneas de texto.
+
+    Las líneas conservan su salto de línea para que csv pueda reconocer los
+    campos entre comillas que ocupan varias líneas.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        lines = pending.splitlines(keepends=True)
+        if chunk and lines:
+            # La última línea puede seguir en el próximo bloque (incluso un \r\n partido)
+            pending = lines.pop()
+        else:
+            pending = ''
+        yield from lines
+        if not chunk:
+            break
+
+def iter_records(stream, fmt):
+    """
+    Convierte un archivo CSV (con encabezados) o NDJSON en diccionarios, fila a fila.
+
+    Args:
+        stream: Flujo binario del cuerpo de la petición
+        fmt (str): 'csv' o 'ndjson'
+
+    Yields:
+        tuple: (número de fila desde 1, datos o None, mensaje de error o None)
+    """
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(iter_lines(stream)), start=1):
+            yield number, {key.strip(): value for key, value in row.items() if key}, None
+        return
+
+    number = 0
+    for line in iter_lines(stream):
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield number, None, 'JSON inválido'
+            continue
+        if not isinstance(data, dict):
+            yield number, None, 'Cada línea debe ser un objeto JSON'
+            continue
+        yield number, data, None
+
+def batched(iterable, size):
+    """Agrupa los elementos de un iterable en listas de hasta `size` elementos."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
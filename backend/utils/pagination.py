@@ -0,0 +1,53 @@
+import base64
+import json
+from config import Config
+
+def encode_cursor(values):
+    """
+    Convierte la clave de orden de la última fila en un token opaco.
+
+    Args:
+        values (list): Valores de las columnas de orden, por ejemplo [nombre, id]
+
+    Returns:
+        str: Token base64 seguro para URLs
+    """
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, size):
+    """
+    Recupera la clave de orden guardada en un token de encode_cursor().
+
+    Args:
+        token (str): Token recibido en el parámetro `after`
+        size (int): Número de valores que debe tener la clave
+
+    Returns:
+        list: Valores de las columnas de orden
+
+    Raises:
+        ValueError: Si el token no es válido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Cursor de paginación inválido')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Cursor de paginación inválido')
+    return values
+
+def page_size(requested):
+    """
+    Ajusta el parámetro `limit` a los valores permitidos.
+
+    Args:
+        requested (int): Valor recibido, o None si no se envió
+
+    Returns:
+        int: Tamaño de página entre 1 y Config.PAGE_SIZE_MAX
+    """
+    if requested is None:
+        return Config.PAGE_SIZE_DEFAULT
+    return max(1, min(requested, Config.PAGE_SIZE_MAX))
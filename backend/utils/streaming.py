@@ -0,0 +1,98 @@
+import csv
+import io
+import zlib
+from flask import Response, current_app, stream_with_context
+
+def stream_json_list(chunks, list_key, envelope=None, count_key=None):
+    """
+    Construye una respuesta JSON que se envía a medida que llegan las filas.
+
+    El documento tiene la misma forma que el de jsonify(), por ejemplo
+    {"success": true, "data": [...], "count": 3}, pero nunca se arma
+    completo en memoria.
+
+    Args:
+        chunks (iterable): Bloques de filas, como los de db.execute_stream()
+        list_key (str): Clave bajo la que va la lista de filas
+        envelope (dict, optional): Claves fijas que van antes de la lista
+        count_key (str, optional): Si se indica, agrega al final el total de filas
+
+    Returns:
+        Response: Respuesta Flask en streaming
+    """
+    def generate():
+        dumps = current_app.json.dumps
+        head = dumps(envelope)[:-1] + ', ' if envelope else '{'
+        yield f'{head}{dumps(list_key)}: ['
+
+        count = 0
+        for rows in chunks:
+            if not rows:
+                continue
+            body = ', '.join(dumps(row) for row in rows)
+            yield body if count == 0 else ', ' + body
+            count += len(rows)
+
+        tail = ']'
+        if count_key:
+            tail += f', {dumps(count_key)}: {count}'
+        yield tail + '}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+def stream_export(chunks, fmt, columns, filename, compress=False):
+    """
+    Construye una descarga CSV o NDJSON que se envía a medida que llegan las filas.
+
+    Cada bloque de filas se convierte a texto y se envía de inmediato, así la
+    descarga empieza enseguida y la memoria usada no depende del número de filas.
+
+    Args:
+        chunks (iterable): Bloques de filas, como los de db.execute_stream()
+        fmt (str): 'csv' o 'ndjson'
+        columns (list): Columnas a exportar, en orden (encabezado del CSV)
+        filename (str): Nombre del archivo sin extensión
+        compress (bool, optional): Si es True, el cuerpo se envía comprimido con gzip
+
+    Returns:
+        Response: Respuesta Flask en streaming
+    """
+    def encode_rows():
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for rows in chunks:
+                writer.writerows([row[column] for column in columns] for row in rows)
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.getvalue():
+                # Sin filas solo queda el encabezado
+                yield buffer.getvalue().encode('utf-8')
+        else:
+            dumps = current_app.json.dumps
+            for rows in chunks:
+                yield ''.join(dumps({column: row[column] for column in columns}) + '\n' for row in rows).encode('utf-8')
+
+    def generate():
+        if not compress:
+            yield from encode_rows()
+            return
+        # wbits=31 produce el formato gzip (cabecera y CRC) en lugar de zlib
+        compressor = zlib.compressobj(wbits=31)
+        for data in encode_rows():
+            # Z_SYNC_FLUSH envía cada bloque apenas se comprime, sin esperar al final
+            yield compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+    response = Response(stream_with_context(generate()), mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
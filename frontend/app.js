@@ -27,6 +27,26 @@ async function apiRequest(endpoint, options = {}) {
     }
 }
 
+// Recorre una lista paginada por cursor y devuelve todas sus filas.
+// Si se pasa `predicate`, se detiene en la primera fila que lo cumple y la devuelve.
+async function apiRequestAll(endpoint, key, predicate = null) {
+    const rows = [];
+    let after = null;
+    do {
+        const separator = endpoint.includes('?') ? '&' : '?';
+        const page = await apiRequest(after ? `${endpoint}${separator}after=${encodeURIComponent(after)}` : endpoint);
+        const pageRows = page[key] || [];
+        if (predicate) {
+            const found = pageRows.find(predicate);
+            if (found) return found;
+        } else {
+            rows.push(...pageRows);
+        }
+        after = page.next_cursor;
+    } while (after);
+    return predicate ? null : rows;
+}
+
 // ============== DATOS DEL SISTEMA ==============
 const systemData = {
     currentUser: null,
@@ -802,8 +822,8 @@ async function deleteUser(id) {
 async function viewSale(id) {
     try {
         // Obtener detalles de la venta
-        const salesResponse = await apiRequest('/sales');
-        const sale = salesResponse.sales.find(s => s.id_venta === id);
+        // La venta puede estar en cualquier página del historial
+        const sale = await apiRequestAll('/sales', 'sales', s => s.id_venta === id);
         
         if (!sale) {
             alert('Venta no encontrada');
@@ -1451,8 +1471,7 @@ async function generateReport(type) {
                 title = 'Reporte de Productos';
                 break;
             case 'sales':
-                const salesResponse = await apiRequest('/sales');
-                data = salesResponse.sales;
+                data = await apiRequestAll('/sales', 'sales');
                 filename = 'reporte_ventas';
                 title = 'Reporte de Ventas';
                 break;